@@ -0,0 +1,5 @@
+@echo off
+echo Starting Tire Industry AI Demo (model server + multiple front ends)...
+cd /d "%~dp0"
+python -m tire_ai.launcher --frontends 2 --replicas auto --transport http
+pause
\ No newline at end of file
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from tire_ai.batching import MicroBatcher
+
+
+def _upper(items):
+    if "bad" in items:
+        raise ValueError("bad document")
+    return [item.upper() for item in items]
+
+
+def test_batcher_can_restart_after_stop():
+    async def run():
+        batcher = MicroBatcher(_upper)
+        for _ in range(2):
+            await batcher.start()
+            assert await batcher.submit("a") == "A"
+            await batcher.stop()
+
+    asyncio.run(run())
+
+
+def test_failing_item_does_not_fail_its_batch():
+    async def run():
+        batcher = MicroBatcher(_upper, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        results = await asyncio.gather(
+            *(batcher.submit(item) for item in ("a", "bad", "c")), return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+
+    a, bad, c = asyncio.run(run())
+    assert (a, c) == ("A", "C")
+    with pytest.raises(ValueError):
+        raise bad
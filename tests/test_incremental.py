@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from tire_ai.incremental import leaks_context, optimize_document, sentence_input, split_sentences
+
+
+def _join(parts):
+    return "".join(sentence + separator for sentence, separator in parts)
+
+
+def test_split_round_trips_multiline_text():
+    text = "一、硫化工艺\n  硫化温度150℃。时间5分钟！\n\n\t二、检查\n更换密封圈；每季度检查一次\n 记录结果。"
+    parts = split_sentences(text)
+    assert _join(parts) == text
+    assert [s for s, _ in parts] == [
+        "一、硫化工艺", "硫化温度150℃。", "时间5分钟！", "二、检查", "更换密封圈；", "每季度检查一次", "记录结果。",
+    ]
+
+
+def test_split_strips_only_document_edges():
+    parts = split_sentences("\n  第一句。 第二句。\n")
+    assert parts == [("第一句。", " "), ("第二句。", "")]
+
+
+def test_indentation_change_keeps_sentence_keys():
+    before = [s for s, _ in split_sentences("第一句。\n第二句。")]
+    after = [s for s, _ in split_sentences("第一句。\n\n    第二句。")]
+    assert before == after
+
+
+def test_sentence_input_includes_neighbours():
+    sentences = ["甲。", "乙。", "丙。"]
+    assert sentence_input(sentences, 1, context=1) == "上下文（仅供参考，不要改写）：甲。【本句】丙。\n需要改写的句子：乙。"
+    assert sentence_input(sentences, 1, context=0) == "乙。"
+
+
+class _Engine:
+    cache = None
+
+    def __init__(self, rewrite):
+        self.rewrite = rewrite
+
+    def optimize_batch(self, texts, instruction_types, few_shot=None):
+        return [
+            SimpleNamespace(optimized_text=self.rewrite(t), instruction_type=i, examples=[], cached=False,
+                            generated_tokens=1, elapsed_seconds=0.0)
+            for t, i in zip(texts, instruction_types)
+        ]
+
+
+def test_output_that_rewrites_the_context_keeps_the_original_sentence():
+    text = "硫化温度150℃。硫化时间5分钟。"
+    # 模型把整条输入（含上下文）当作原文改写
+    result = optimize_document(_Engine(lambda t: t.replace("需要改写的句子：", "")), text, rules=False)
+    assert result.fallbacks == 2
+    assert result.optimized_text == text
+
+
+def test_leaks_context_ignores_short_neighbours():
+    sentences = ["是。", "温度保持在150℃。", "硫化时间5分钟。"]
+    assert not leaks_context("是。温度应保持在150℃。", sentences, 1)
+    assert leaks_context("温度应保持在150℃。硫化时间5分钟。", sentences, 1)
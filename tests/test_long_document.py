@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from tire_ai.long_document import iter_chunks, optimize_long_document
+
+SECTION = "第三章 硫化工艺\n" + "硫化温度控制在150℃，保温时间按胎型确定。" * 20 + "\n"
+
+
+def test_chunks_never_exceed_chunk_chars():
+    text = SECTION * 5 + "没有标点的长句" * 100
+    chunks = list(iter_chunks(text, chunk_chars=300, overlap=50))
+    assert max(len(c.text) for c in chunks) <= 300
+    assert "".join(c.text + c.separator for c in chunks).replace("\n", "") == text.replace("\n", "")
+
+
+def test_heading_stays_with_its_body():
+    for chunk in iter_chunks(SECTION * 3, chunk_chars=300, overlap=0):
+        assert chunk.text.strip() != "第三章 硫化工艺"
+
+
+class _EchoEngine:
+    def optimize_batch(self, texts, instruction_types, few_shot=None):
+        return [
+            SimpleNamespace(optimized_text=t.split("\n")[-1], instruction_type=i, cached=False, generated_tokens=1)
+            for t, i in zip(texts, instruction_types)
+        ]
+
+
+def test_progress_receives_each_chunk_once():
+    received = []
+    result = optimize_long_document(
+        _EchoEngine(), SECTION * 3, chunk_chars=300, overlap=0, rules=False,
+        progress=lambda done, total, chunk_text: received.append((done, total, chunk_text)),
+    )
+    assert [done for done, _, _ in received] == list(range(1, result.chunks + 1))
+    assert "".join(text for _, _, text in received).strip() == result.optimized_text
@@ -0,0 +1,51 @@
+from tire_ai.rules import check_numbers, normalize_text
+
+
+def test_temperature_degrees_become_celsius():
+    assert normalize_text("硫化温度从150度提升到155度") == "硫化温度从150℃提升到155℃"
+    assert normalize_text("确保温度控制精度在±2度范围内") == "确保温度控制精度在±2℃范围内"
+    assert normalize_text("加热到170度") == "加热到170℃"
+
+
+def test_enumerated_temperatures_share_the_keyword():
+    assert normalize_text("温度150度、160度和170度") == "温度150℃、160℃和170℃"
+    assert normalize_text("硫化温度150至160度") == "硫化温度150至160℃"
+    assert normalize_text("温度150度、硬度65度和70度") == "温度150℃、硬度65度和70度"
+    assert normalize_text("加热、旋转30度") == "加热、旋转30度"
+
+
+def test_keyword_after_the_number():
+    assert normalize_text("150度高温下硫化") == "150℃高温下硫化"
+    assert normalize_text("160度的硬度") == "160度的硬度"
+
+
+def test_hardness_is_not_temperature():
+    assert normalize_text("邵氏硬度65度") == "邵氏硬度65度"
+    assert normalize_text("邵氏硬度65度，硫化温度150度") == "邵氏硬度65度，硫化温度150℃"
+    assert normalize_text("硬度65度时温度150度") == "硬度65度时温度150℃"
+
+
+def test_angle_is_not_temperature():
+    assert normalize_text("温度150度，夹角30度") == "温度150℃，夹角30度"
+    assert normalize_text("倾斜15度") == "倾斜15度"
+    assert normalize_text("胎面温度正常，保持30度角") == "胎面温度正常，保持30度角"
+    assert normalize_text("温度150度、夹角30度") == "温度150℃、夹角30度"
+    assert normalize_text("夹角30度、温度150度") == "夹角30度、温度150℃"
+
+
+def test_electricity_is_not_temperature():
+    assert normalize_text("温控设备每天耗电100度") == "温控设备每天耗电100度"
+    assert normalize_text("温控设备每天100度电") == "温控设备每天100度电"
+
+
+def test_spec_expansion_is_idempotent():
+    text = normalize_text("载重指数95，速度级别H")
+    assert text == "载重指数：95（690kg），速度级别：H（210km/h）"
+    assert normalize_text(text) == text
+
+
+def test_check_numbers_treats_degree_and_celsius_as_the_same_value():
+    assert check_numbers("温度150度、160度", "温度150℃、160℃") == []
+    assert check_numbers("邵氏硬度65度", "邵氏硬度65℃") == []
+    assert check_numbers("温度150度，夹角30度", "温度150℃，夹角30度") == []
+    assert check_numbers("温度150度", "温度155℃") == ["数值改动：150℃ → 155℃"]
@@ -0,0 +1,6 @@
+"""轮胎制造业技术写作AI大模型Demo的后端组件。
+
+各子模块按需导入，避免在 Streamlit 页面重跑时加载 torch/transformers 等重量级依赖。
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,141 @@
+"""多适配器推理：一份常驻的基座模型上按需挂载多个 LoRA 适配器，按请求切换。
+
+按类别训练的适配器放在 TIRE_AI_ADAPTERS_DIR（默认 ./outputs/adapters）下，
+子目录名即路由键——案例类别（工艺改进/故障排除/产品说明）或 Instruction 类型（分类型/开放型）：
+
+    outputs/adapters/故障排除/adapter_config.json
+    outputs/adapters/开放型/adapter_config.json
+
+请求先按类别、再按 Instruction 类型匹配子目录，都没有时使用默认适配器（TIRE_AI_ADAPTER）。
+LoRA 权重只有几十 MB，同时挂载的数量由 TIRE_AI_MAX_ADAPTERS 限制，超出后卸载最久未用的；
+适配器目录内容变化（重新训练）后下次使用时自动重新加载。
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+from . import metrics
+from .cache import directory_fingerprint
+from .config import DEFAULT_ADAPTERS_DIR
+
+logger = logging.getLogger(__name__)
+
+# 默认适配器（TIRE_AI_ADAPTER）的路由名，也是 PEFT 中常驻适配器的名称
+DEFAULT_ADAPTER = "default"
+
+
+def has_adapter(path):
+    return bool(path) and os.path.isfile(os.path.join(path, "adapter_config.json"))
+
+
+def discover_adapters(directory):
+    """返回 {路由名: 目录}，只包含含有 adapter_config.json 的子目录。"""
+    if not directory or not os.path.isdir(directory):
+        return {}
+    found = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name != DEFAULT_ADAPTER and has_adapter(path):
+            found[name] = path
+    return found
+
+
+def _peft_name(name):
+    # PEFT 以适配器名作为子模块键，路由名可能是中文，这里换成稳定的 ASCII 名称
+    if name == DEFAULT_ADAPTER:
+        return name
+    return "adapter_" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:10]
+
+
+class AdapterPool:
+    """管理 PeftModel 上挂载的命名适配器；调用方需持有推理引擎的生成锁。"""
+
+    def __init__(self, model, directory=DEFAULT_ADAPTERS_DIR, max_loaded=4, has_default=True):
+        self.model = model
+        self.directory = directory
+        self.max_loaded = max(max_loaded, 1)
+        # 没有默认适配器时，默认路由关闭全部 LoRA 层，即基座模型本身
+        self.has_default = has_default
+        # 路由名 -> 加载时的目录指纹，按最近使用排序；默认适配器常驻，不在其中
+        self._loaded = OrderedDict()
+        self._available = {}
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def available(self):
+        # 目录扫描每10秒最多一次，新训练的适配器无需重启服务即可使用
+        with self._lock:
+            now = time.monotonic()
+            if now - self._scanned_at > 10:
+                self._available = discover_adapters(self.directory)
+                self._scanned_at = now
+            return dict(self._available)
+
+    def route(self, category=None, instruction_type=None):
+        available = self.available()
+        for key in (category, instruction_type):
+            if key and key in available:
+                return key
+        return DEFAULT_ADAPTER
+
+    def version(self, name):
+        """适配器目录的当前指纹，用作结果缓存与前缀缓存键中的模型版本。"""
+        path = self.available().get(name)
+        return directory_fingerprint(path) if path else ""
+
+    def _ensure_loaded(self, name):
+        path = self.available().get(name)
+        if path is None:
+            raise KeyError(f"适配器不存在：{name}")
+        fingerprint = directory_fingerprint(path)
+        if self._loaded.get(name) == fingerprint:
+            self._loaded.move_to_end(name)
+            return
+        if name in self._loaded:
+            logger.info("适配器 %s 已更新，重新加载", name)
+            self._unload(name)
+        while len(self._loaded) >= self.max_loaded:
+            evicted = next(iter(self._loaded))
+            logger.info("卸载最久未用的适配器 %s", evicted)
+            self._unload(evicted)
+            self.evictions += 1
+        start = time.perf_counter()
+        self.model.load_adapter(path, adapter_name=_peft_name(name))
+        self.model.eval()
+        self._loaded[name] = fingerprint
+        self.loads += 1
+        metrics.observe("adapter_load", time.perf_counter() - start)
+        logger.info("加载适配器 %s（%s）", name, path)
+
+    def _unload(self, name):
+        del self._loaded[name]
+        # 先切回常驻的适配器，避免删除当前激活的适配器
+        self.model.set_adapter(DEFAULT_ADAPTER)
+        self.model.base_model.delete_adapter(_peft_name(name))
+
+    @contextmanager
+    def activate(self, name):
+        if name != DEFAULT_ADAPTER:
+            self._ensure_loaded(name)
+            self.model.set_adapter(_peft_name(name))
+            yield
+            return
+        self.model.set_adapter(DEFAULT_ADAPTER)
+        with nullcontext() if self.has_default else self.model.disable_adapter():
+            yield
+
+    def stats(self):
+        return {
+            "available": sorted(self.available()),
+            "loaded": list(self._loaded),
+            "max_loaded": self.max_loaded,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,307 @@
+"""文本优化 RESTful API 服务。
+
+启动：
+    python -m tire_ai.api --port 8000 --max-batch-size 8 --max-wait-ms 10
+或：
+    uvicorn tire_ai.api:create_app --factory --port 8000
+拆分部署时作为模型服务，也可以监听本机 Unix 套接字：
+    python -m tire_ai.api --uds ./outputs/run/model-0.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from . import metrics
+from .batching import MicroBatcher
+from .config import ServerConfig
+from .engine import engine_loaded, get_engine
+
+
+class TextOptimizationRequest(BaseModel):
+    text: str = Field(..., min_length=1, description="需要优化的技术文档内容")
+    instruction_type: str = Field("分类型", description="分类型 / 开放型")
+    category: Optional[str] = Field(None, description="案例类别（工艺改进/故障排除/产品说明），用于选择LoRA适配器")
+    few_shot: Optional[int] = Field(None, ge=0, description="注入的相似案例数，默认使用服务端配置")
+    use_cache: bool = Field(True, description="是否使用结果缓存")
+
+
+class TextOptimizationResponse(BaseModel):
+    optimized_text: str
+    instruction_type: str
+    prompt_tokens: int
+    generated_tokens: int
+    elapsed_seconds: float
+    tokens_per_second: float
+    cached: bool = False
+    adapter: str = "default"
+    examples: List[str] = []
+    number_issues: List[str] = []
+
+
+class BatchOptimizationRequest(BaseModel):
+    documents: List[TextOptimizationRequest]
+
+
+class BatchOptimizationResponse(BaseModel):
+    results: List[TextOptimizationResponse]
+
+
+class LabelProbabilitiesRequest(BaseModel):
+    texts: List[str]
+    labels: List[str]
+
+
+def create_app(engine=None, server_config=None):
+    """每次调用都创建独立的批处理器与指标收集器，一个进程只应创建一个应用（uvicorn 使用 --factory）。"""
+    server_config = server_config or ServerConfig.from_env()
+
+    def process_batch(requests):
+        current = engine or get_engine()
+        # few_shot、use_cache 不同的请求分开调用；同一批内使用不同适配器的请求由引擎按适配器分组生成
+        groups = {}
+        for i, r in enumerate(requests):
+            groups.setdefault((r.few_shot, r.use_cache), []).append(i)
+        results = [None] * len(requests)
+        for (few_shot, use_cache), indices in groups.items():
+            generated = current.optimize_batch(
+                [requests[i].text for i in indices],
+                [requests[i].instruction_type for i in indices],
+                use_cache=use_cache,
+                few_shot=few_shot,
+                categories=[requests[i].category for i in indices],
+            )
+            for i, result in zip(indices, generated):
+                results[i] = result.to_dict()
+        return results
+
+    batcher = MicroBatcher(
+        process_batch,
+        max_batch_size=server_config.max_batch_size,
+        max_wait_ms=server_config.max_wait_ms,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # 启动时加载模型，避免第一个请求承担加载耗时
+        if engine is None:
+            await asyncio.get_running_loop().run_in_executor(None, get_engine)
+        await batcher.start()
+        yield
+        await batcher.stop()
+
+    app = FastAPI(title="轮胎制造业技术写作AI API", version="1.0", lifespan=lifespan)
+    app.state.batcher = batcher
+    app.state.server_config = server_config
+    # video_simple.html 直接从本地文件打开，需要允许跨域调用
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=server_config.cors_origins,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    def collect_server_metrics():
+        values = {
+            "queue_depth": batcher.queue_depth,
+            "batches_processed": batcher.batches_processed,
+            "items_processed": batcher.items_processed,
+        }
+        current = engine if engine is not None else (get_engine() if engine_loaded() else None)
+        if current is not None and current.cache is not None:
+            cache_stats = current.cache.stats()
+            values.update(
+                cache_hits=cache_stats["hits"],
+                cache_misses=cache_stats["misses"],
+                cache_hit_rate=cache_stats["hit_rate"],
+            )
+        if current is not None:
+            prefix_stats = current.prefix_cache.stats()
+            values.update(
+                prefix_cache_hits=prefix_stats["hits"],
+                prefix_cache_hit_rate=prefix_stats["hit_rate"],
+                prefix_cache_mb=prefix_stats["memory_mb"],
+            )
+            if current.adapters is not None:
+                values["adapters_loaded"] = len(current.adapters.stats()["loaded"])
+        return values
+
+    metrics.register_collector("api", collect_server_metrics)
+
+    @app.middleware("http")
+    async def record_latency(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        if request.url.path != "/metrics":
+            # 流式接口只计到响应头返回为止，完整生成耗时见 generation 阶段
+            metrics.observe("api_request", time.perf_counter() - start)
+        return response
+
+    @app.get("/metrics")
+    async def prometheus_metrics():
+        return PlainTextResponse(
+            metrics.registry.render_prometheus(), media_type="text/plain; version=0.0.4"
+        )
+
+    @app.get("/health")
+    async def health():
+        loaded = engine.loaded if engine is not None else engine_loaded()
+        return {
+            "status": "ok" if loaded else "loading",
+            "pid": os.getpid(),
+            "queue_depth": batcher.queue_depth,
+            "batches_processed": batcher.batches_processed,
+            "items_processed": batcher.items_processed,
+        }
+
+    @app.get("/api/v1/engine")
+    def engine_stats():
+        # 拆分部署时前端进程据此显示模型信息与各项统计
+        loaded = engine.loaded if engine is not None else engine_loaded()
+        if not loaded:
+            raise HTTPException(status_code=503, detail="模型加载中")
+        current = engine or get_engine()
+        return {
+            "info": current.info(),
+            "generation": current.generation_stats(),
+            "cache": current.cache.stats() if current.cache is not None else None,
+            "prefix_cache": current.prefix_cache.stats(),
+            "speculative": current.speculative_stats(),
+        }
+
+    @app.post("/api/v1/label-probabilities")
+    def label_probabilities(payload: LabelProbabilitiesRequest):
+        # 低置信度文档的 Instruction 类型由大模型复核（见 classifier.InstructionClassifier）
+        probabilities = (engine or get_engine()).label_probabilities(payload.texts, payload.labels)
+        return {"probabilities": probabilities.tolist()}
+
+    @app.post("/api/v1/text-optimization", response_model=TextOptimizationResponse)
+    async def optimize_text(payload: TextOptimizationRequest):
+        return await batcher.submit(payload)
+
+    @app.post("/api/v1/text-optimization/batch", response_model=BatchOptimizationResponse)
+    async def optimize_text_batch(payload: BatchOptimizationRequest):
+        if len(payload.documents) > server_config.max_documents_per_request:
+            raise HTTPException(
+                status_code=413,
+                detail=f"单次最多提交 {server_config.max_documents_per_request} 篇文档",
+            )
+        if not payload.documents:
+            return {"results": []}
+        return {"results": await batcher.submit_many(payload.documents)}
+
+    @app.post("/api/v1/text-optimization/stream")
+    def optimize_text_stream(payload: TextOptimizationRequest):
+        # 流式请求逐个生成（batch=1），以 Server-Sent Events 推送增量文本
+        current = engine or get_engine()
+        token_stream = current.stream(
+            payload.text,
+            payload.instruction_type,
+            use_cache=payload.use_cache,
+            few_shot=payload.few_shot,
+            category=payload.category,
+        )
+
+        def events():
+            try:
+                for delta in token_stream:
+                    yield _sse({"delta": delta})
+            except Exception as exc:
+                yield _sse({"error": str(exc)}, event="error")
+                return
+            finally:
+                # 客户端断开时停止生成，不再占用模型
+                token_stream.cancel()
+            result = token_stream.result().to_dict()
+            result["time_to_first_token"] = token_stream.time_to_first_token
+            result["tokens_per_second"] = round(token_stream.tokens_per_second, 2)
+            yield _sse(result, event="done")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/api/v1/transcription")
+    async def transcribe_audio(request: Request, optimize: bool = False, instruction_type: str = "分类型"):
+        # 请求体为音频文件本身（WAV；安装了 ffmpeg 时也支持其他格式），以 SSE 逐段返回转写结果
+        from .transcription import SAMPLE_RATE, decode_audio, get_transcriber
+
+        data = await request.body()
+        if len(data) > server_config.max_audio_mb * 1024 * 1024:
+            raise HTTPException(status_code=413, detail=f"音频文件不能超过 {server_config.max_audio_mb}MB")
+        try:
+            audio = decode_audio(data)
+        except (ValueError, EOFError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        transcriber = get_transcriber()
+
+        def events():
+            start = time.perf_counter()
+            texts = []
+            try:
+                for segment in transcriber.stream(audio):
+                    texts.append(segment["text"])
+                    yield _sse(segment, event="segment")
+                text = transcriber.join(texts)
+                elapsed = time.perf_counter() - start
+                metrics.observe("transcription", elapsed)
+                result = {
+                    "text": text,
+                    "segments": len(texts),
+                    "audio_seconds": round(len(audio) / SAMPLE_RATE, 2),
+                    "elapsed_seconds": round(elapsed, 2),
+                }
+                # 转写结果直接进入文本优化流程，与转写结果一起返回
+                if optimize and text:
+                    result["optimized"] = (engine or get_engine()).optimize(text, instruction_type).to_dict()
+            except Exception as exc:
+                yield _sse({"error": str(exc)}, event="error")
+                return
+            yield _sse(result, event="done")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return prefix + "data: " + json.dumps(data, ensure_ascii=False) + "\n\n"
+
+
+def main(argv=None):
+    import uvicorn
+
+    defaults = ServerConfig.from_env()
+    parser = argparse.ArgumentParser(description="轮胎制造业技术写作AI API服务")
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--max-batch-size", type=int, default=defaults.max_batch_size)
+    parser.add_argument("--max-wait-ms", type=float, default=defaults.max_wait_ms)
+    parser.add_argument("--uds", default=None, help="监听 Unix 套接字而不是 TCP 端口")
+    args = parser.parse_args(argv)
+
+    config = ServerConfig(
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_documents_per_request=defaults.max_documents_per_request,
+        max_audio_mb=defaults.max_audio_mb,
+        cors_origins=defaults.cors_origins,
+    )
+    if args.uds:
+        uvicorn.run(create_app(server_config=config), uds=args.uds)
+    else:
+        uvicorn.run(create_app(server_config=config), host=config.host, port=config.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""批量文档模式：上传 CSV/JSONL/XLSX，后台分批优化，完成后导出结果文件。
+
+BatchJob 是 jobs.Job 的子类，与其他后台任务共用注册表与线程池（同时运行的任务数上限为 TIRE_AI_JOB_WORKERS），
+排队中取消、已结束任务的清理都由 jobs 模块处理；单个任务按批调用推理引擎，页面只保存任务ID，刷新后仍可查看进度。
+"""
+
+import io
+import os
+
+import pandas as pd
+
+from . import metrics
+from .jobs import Job, get_job, list_jobs, submit
+
+SUPPORTED_EXTENSIONS = (".csv", ".jsonl", ".json", ".xlsx")
+# 依次尝试的原文列名
+TEXT_COLUMNS = ("original_text", "text", "原始文本", "内容", "content")
+RESULT_COLUMNS = (
+    "original_text",
+    "optimized_text",
+    "instruction_type",
+    "generated_tokens",
+    "elapsed_seconds",
+    "tokens_per_second",
+    "cached",
+    "number_issues",
+)
+
+
+def read_documents(filename, data):
+    """把上传的文件内容读成 DataFrame，统一出 original_text 列。"""
+    name = filename.lower()
+    if name.endswith(".csv"):
+        frame = pd.read_csv(io.BytesIO(data), encoding="utf-8-sig", dtype=str)
+    elif name.endswith((".jsonl", ".json")):
+        frame = pd.read_json(io.BytesIO(data), lines=name.endswith(".jsonl"), dtype=False)
+    elif name.endswith(".xlsx"):
+        frame = pd.read_excel(io.BytesIO(data), dtype=str)
+    else:
+        raise ValueError(f"不支持的文件类型：{filename}（支持 {'/'.join(SUPPORTED_EXTENSIONS)}）")
+
+    column = next((c for c in TEXT_COLUMNS if c in frame.columns), None)
+    if column is None:
+        raise ValueError(f"文件中缺少原文列，可用列名：{'/'.join(TEXT_COLUMNS)}")
+    frame = frame.rename(columns={column: "original_text"})
+    frame["original_text"] = frame["original_text"].fillna("").astype(str).str.strip()
+    frame = frame[frame["original_text"] != ""].reset_index(drop=True)
+    if "instruction_type" not in frame.columns:
+        frame["instruction_type"] = ""
+    frame["instruction_type"] = frame["instruction_type"].fillna("").astype(str).str.strip()
+    return frame
+
+
+class BatchJob(Job):
+    """一次批量优化任务，在共享任务注册表中登记，取消与清理方式与其他后台任务一致。"""
+
+    def __init__(self, frame, filename="", batch_size=8):
+        super().__init__("batch_optimize")
+        self.filename = filename
+        self.frame = frame
+        self.batch_size = batch_size
+        self.total = len(frame)
+        self.done = 0
+        self.results = []
+
+    def _run_batch(self, engine, classifier, batch):
+        texts = batch["original_text"].tolist()
+        types = batch["instruction_type"].tolist()
+        # 未标注类型的文档先用分类器判断，整批一次完成
+        missing = [i for i, t in enumerate(types) if not t]
+        if missing and classifier is not None:
+            predicted = classifier.classify_batch([texts[i] for i in missing])
+            for i, result in zip(missing, predicted):
+                types[i] = result.instruction_type
+        # 文件带 category 列时按类别选择适配器
+        categories = batch["category"].tolist() if "category" in batch.columns else None
+        results = engine.optimize_batch(texts, [t or "分类型" for t in types], categories=categories)
+        for text, result in zip(texts, results):
+            self.results.append({
+                "original_text": text,
+                "optimized_text": result.optimized_text,
+                "instruction_type": result.instruction_type,
+                "generated_tokens": result.generated_tokens,
+                "elapsed_seconds": round(result.elapsed_seconds, 3),
+                "tokens_per_second": round(result.tokens_per_second, 1),
+                "cached": result.cached,
+                # 导出为表格，多个问题合为一个单元格
+                "number_issues": "；".join(result.number_issues),
+            })
+        self.done += len(texts)
+
+    def _score(self, engine):
+        # 上传文件带参考译文（optimized_text 列）时，附带逐条自动评估指标
+        if "optimized_text" not in self.frame.columns:
+            return
+        from .embeddings import make_embedder
+        from .evaluation import score_predictions
+
+        references = self.frame["optimized_text"].fillna("").astype(str).tolist()
+        predictions = [r["optimized_text"] for r in self.results]
+        scores = score_predictions(references, predictions, embedder=make_embedder(engine=engine))
+        for i, row in enumerate(self.results):
+            row["reference_text"] = references[i]
+            row.update({name: round(float(values[i]), 4) for name, values in scores.items()})
+
+    def results_frame(self):
+        frame = pd.DataFrame(self.results)
+        if frame.empty:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        return frame
+
+    def export(self, fmt="csv"):
+        """导出结果，返回 (bytes, 文件名, MIME 类型)。"""
+        frame = self.results_frame()
+        stem = os.path.splitext(self.filename or "documents")[0] + "-optimized"
+        if fmt == "csv":
+            return frame.to_csv(index=False).encode("utf-8-sig"), stem + ".csv", "text/csv"
+        if fmt == "jsonl":
+            data = frame.to_json(orient="records", lines=True, force_ascii=False)
+            return data.encode("utf-8"), stem + ".jsonl", "application/jsonl"
+        if fmt == "xlsx":
+            buffer = io.BytesIO()
+            frame.to_excel(buffer, index=False)
+            return (
+                buffer.getvalue(),
+                stem + ".xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        raise ValueError(f"不支持的导出格式：{fmt}")
+
+    def summary(self):
+        summary = super().summary()
+        summary.update(filename=self.filename, done=self.done, total=self.total)
+        return summary
+
+
+def _run_batch_job(job, engine, classifier=None):
+    if engine is None:
+        # 提交时模型尚未加载，在工作线程中加载，页面不必等待
+        from .engine import get_engine
+
+        engine = get_engine()
+    try:
+        for start in range(0, job.total, job.batch_size):
+            job.check_cancelled()
+            job._run_batch(engine, classifier, job.frame.iloc[start:start + job.batch_size])
+            job.update(progress=job.done / job.total)
+        job._score(engine)
+    finally:
+        # 结果已在 results 中，上传的原始表格不再需要，不随任务保留在内存里
+        job.frame = None
+    return len(job.results)
+
+
+def submit_batch_job(engine, frame, filename="", classifier=None, batch_size=8):
+    """提交批量任务并立即返回，engine 为 None 时使用进程级共享引擎；在共享线程池中执行，没有空闲线程时排队等待。"""
+    return submit(BatchJob(frame, filename=filename, batch_size=batch_size), _run_batch_job, engine, classifier)
+
+
+def get_batch_job(job_id):
+    job = get_job(job_id)
+    return job if isinstance(job, BatchJob) else None
+
+
+def list_batch_jobs():
+    return [job for job in list_jobs() if isinstance(job, BatchJob)]
+
+
+def _collect_job_metrics():
+    jobs = list_batch_jobs()
+    return {
+        "batch_jobs_queued": sum(1 for j in jobs if j.status == "queued"),
+        "batch_jobs_running": sum(1 for j in jobs if j.status == "running"),
+    }
+
+
+metrics.register_collector("batch_jobs", _collect_job_metrics)
@@ -0,0 +1,131 @@
+"""动态批处理调度：把并发到达的请求合并成一次前向计算。"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """收集请求直到凑满 ``max_batch_size`` 或等待超过 ``max_wait_ms``，再统一处理。
+
+    ``process_batch`` 是同步函数，接收请求列表并按相同顺序返回结果列表；
+    它在独立线程中执行，不会阻塞事件循环。整批失败时逐条重试，只有自身出错的请求返回异常。
+    start()/stop() 可以成对多次调用（同一个应用重复启动 lifespan）。
+    """
+
+    def __init__(self, process_batch, max_batch_size=8, max_wait_ms=10.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size 必须大于 0")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._task = None
+        self._executor = None
+        self.batches_processed = 0
+        self.items_processed = 0
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        if self._task is None:
+            # 模型只有一份，批次之间串行执行；stop() 会关闭线程池，每次启动时重新创建
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batch")
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def submit_many(self, items):
+        # 一次性入队，由调度循环按 max_batch_size 切分
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            futures.append(future)
+            self._queue.put_nowait((item, future))
+        return await asyncio.gather(*futures)
+
+    async def _collect(self):
+        first = await self._queue.get()
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # 队列里已有的请求直接取走，不再等待
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # 客户端已断开的请求不再计算
+            batch = [(item, fut) for item, fut in batch if not fut.cancelled()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.process_batch, items)
+            except Exception as exc:
+                if len(batch) == 1:
+                    logger.exception("请求处理失败")
+                    self._fail(batch[0][1], exc)
+                    continue
+                # 一条出错的文档不应连累同批的其他请求：逐条重试，找出真正失败的请求
+                logger.warning("批处理失败（%d 条请求），逐条重试：%s", len(items), exc)
+                await self._retry_each(loop, batch)
+                continue
+            self.batches_processed += 1
+            self.items_processed += len(items)
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    async def _retry_each(self, loop, batch):
+        for item, fut in batch:
+            if fut.cancelled():
+                continue
+            try:
+                result = (await loop.run_in_executor(self._executor, self.process_batch, [item]))[0]
+            except Exception as exc:
+                logger.exception("请求处理失败")
+                self._fail(fut, exc)
+                continue
+            self.batches_processed += 1
+            self.items_processed += 1
+            if not fut.done():
+                fut.set_result(result)
+
+    @staticmethod
+    def _fail(future, exc):
+        if not future.done():
+            future.set_exception(exc)
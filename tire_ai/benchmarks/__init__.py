@@ -0,0 +1,12 @@
+"""吞吐量/延迟基准测试：默认在 CPU 替身模型上运行，输出 JSON 报告并可与基线对比。
+
+    python -m tire_ai.benchmarks --save-baseline             # 记录基线
+    python -m tire_ai.benchmarks --baseline ./outputs/benchmarks/baseline.json
+
+套件：single（单请求延迟）、batch（批大小扫描）、cache（缓存开/关）、classifier（分类器吞吐量）、
+api（按设定 QPS 对文本优化接口施加负载）。工作负载为 tire_cases_data 原文及其按固定种子生成的变体。
+"""
+
+from .baseline import DEFAULT_BASELINE_PATH, compare_reports, load_report, save_report
+from .suites import DEFAULT_REPORT_PATH, SUITES, run_benchmarks
+from .workload import build_workload
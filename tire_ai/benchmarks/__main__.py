@@ -0,0 +1,100 @@
+"""命令行入口：python -m tire_ai.benchmarks --help"""
+
+import argparse
+import logging
+import os
+import sys
+from dataclasses import replace
+
+from .baseline import DEFAULT_BASELINE_PATH, compare_reports, load_report, save_report
+from .suites import DEFAULT_REPORT_PATH, DEFAULT_STAND_IN_PATH, SUITES, ensure_stand_in, run_benchmarks
+
+logger = logging.getLogger(__name__)
+
+
+def _print_metrics(report):
+    for name, value in report["metrics"].items():
+        print(f"  {name:<48}{value:>12}")
+
+
+def _print_comparison(comparison):
+    for warning in comparison["warnings"]:
+        print("WARN", warning)
+    for row in comparison["rows"]:
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        print(f"  {row['metric']:<48}{row['baseline']:>12}{row['current']:>12}{change:>9}  {row['status']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="吞吐量/延迟基准测试")
+    parser.add_argument("--suites", nargs="+", default=list(SUITES), choices=SUITES)
+    parser.add_argument("--base-model", default=None,
+                        help=f"默认读取 TIRE_AI_BASE_MODEL，未设置时使用替身模型 {DEFAULT_STAND_IN_PATH}")
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--workload-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--qps", type=float, nargs="+", default=[1, 2, 4], help="api 套件的目标QPS档位")
+    parser.add_argument("--api-requests", type=int, default=16, help="每个QPS档位的请求数")
+    parser.add_argument("--api-url", default=None, help="对已运行的服务施加负载；默认在本进程内启动")
+    parser.add_argument("--repeats", type=int, default=3, help="每个套件运行的遍数，指标取中位数")
+    parser.add_argument("--output", default=DEFAULT_REPORT_PATH)
+    parser.add_argument("--baseline", default=None, help="与该基线报告对比，出现回退时以状态1退出")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="允许的相对变化（默认15%%）")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="耗时类指标小于该变化量时不判为回退")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE_PATH, default=None,
+                        help=f"把本次结果保存为基线（默认 {DEFAULT_BASELINE_PATH}）")
+    parser.add_argument("--compare-only", metavar="REPORT", default=None,
+                        help="不运行基准，只把已有报告与 --baseline 对比")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.compare_only:
+        report = load_report(args.compare_only)
+        if report is None:
+            parser.error(f"报告不存在：{args.compare_only}")
+    else:
+        from ..config import EngineConfig
+
+        config = EngineConfig.from_env()
+        base_model = args.base_model or os.environ.get("TIRE_AI_BASE_MODEL")
+        if base_model:
+            config = replace(config, base_model=base_model)
+        else:
+            path = ensure_stand_in()
+            config = replace(config, base_model=path, adapter_path=os.path.join(path, "lora"), device="cpu")
+        config = replace(config, max_new_tokens=args.max_new_tokens)
+        report = run_benchmarks(
+            args.suites,
+            config,
+            workload_size=args.workload_size,
+            seed=args.seed,
+            batch_sizes=tuple(args.batch_sizes),
+            qps_levels=tuple(args.qps),
+            api_requests=args.api_requests,
+            api_url=args.api_url,
+            repeats=args.repeats,
+            output_path=args.output,
+            progress=lambda name: logger.info("基准测试套件：%s", name),
+        )
+        print(f"报告已写入 {args.output}")
+        _print_metrics(report)
+        if args.save_baseline:
+            save_report(report, args.save_baseline)
+            print(f"基线已保存到 {args.save_baseline}")
+
+    if args.baseline:
+        baseline = load_report(args.baseline)
+        if baseline is None:
+            parser.error(f"基线报告不存在：{args.baseline}")
+        comparison = compare_reports(baseline, report, args.tolerance, args.min_delta_ms / 1000)
+        _print_comparison(comparison)
+        if comparison["regressions"]:
+            print(f"FAIL 性能回退 {len(comparison['regressions'])} 项（容差 {args.tolerance:.0%}）")
+            return 1
+        print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""与基线报告对比，找出性能回退。
+
+指标方向由键名决定：*_seconds 与 errors 越低越好，*_per_second、*_hit_rate、accuracy 越高越好，
+其余只展示不判定。变化超过容差（默认15%）且方向变差的记为回退；耗时类指标的变化还需超过
+min_seconds（默认2ms），缓存命中这类微秒级的耗时不会因为抖动被判为回退。
+"""
+
+import json
+import os
+
+DEFAULT_BASELINE_PATH = "./outputs/benchmarks/baseline.json"
+# 这些运行条件不同时，对比结果仅供参考
+_COMPARABLE_META = ("base_model", "quantization", "speculative", "device", "max_new_tokens", "workload_size", "seed")
+
+_LOWER_IS_BETTER = ("_seconds", "errors")
+_HIGHER_IS_BETTER = ("_per_second", "_hit_rate", "accuracy")
+
+
+def metric_direction(name):
+    """返回 "lower"、"higher" 或 None（不参与判定）。"""
+    if name.endswith(_LOWER_IS_BETTER):
+        return "lower"
+    if name.endswith(_HIGHER_IS_BETTER):
+        return "higher"
+    return None
+
+
+def load_report(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def compare_reports(baseline, current, tolerance=0.15, min_seconds=0.002):
+    """返回 {"rows": [...], "regressions": [...], "warnings": [...]}；每行含基线值、当前值、相对变化与状态。"""
+    warnings = []
+    for key in _COMPARABLE_META:
+        before, after = baseline["meta"].get(key), current["meta"].get(key)
+        if before != after:
+            warnings.append(f"运行条件不同：{key} 基线为 {before}，本次为 {after}")
+    if baseline["meta"].get("environment", {}).get("cpu_count") != current["meta"].get("environment", {}).get("cpu_count"):
+        warnings.append("CPU 核数不同，延迟与吞吐量不可直接比较")
+
+    rows = []
+    for name in sorted(set(baseline["metrics"]) & set(current["metrics"])):
+        before, after = baseline["metrics"][name], current["metrics"][name]
+        direction = metric_direction(name)
+        change = (after - before) / before if before else None
+        if direction is None:
+            status = "info"
+        elif change is None:
+            # 基线为0（如错误数）时，任何增加都算回退
+            worse = after > before if direction == "lower" else after < before
+            status = "regression" if worse else "ok"
+        elif name.endswith("_seconds") and abs(after - before) < min_seconds:
+            status = "ok"
+        else:
+            worse = change if direction == "lower" else -change
+            status = "regression" if worse > tolerance else "improved" if worse < -tolerance else "ok"
+        rows.append({"metric": name, "baseline": before, "current": after, "change": change, "status": status})
+    missing = sorted(set(baseline["metrics"]) - set(current["metrics"]))
+    if missing:
+        warnings.append(f"本次未运行的基线指标：{len(missing)} 项")
+    return {
+        "rows": rows,
+        "regressions": [r for r in rows if r["status"] == "regression"],
+        "warnings": warnings,
+    }
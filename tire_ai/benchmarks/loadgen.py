@@ -0,0 +1,85 @@
+"""开环负载生成器：按目标 QPS 预先排好每个请求的发出时刻，不因前面的请求变慢而推迟后续请求。
+
+延迟从计划发出时刻算起，服务端排队的等待时间如实计入（避免 coordinated omission）；
+到达间隔取自固定种子的指数分布（泊松到达）或均匀间隔，同样的参数得到同样的请求序列。
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def latency_summary(values, prefix="latency"):
+    """延迟样本的分位数（秒），键名带 _seconds 后缀，基线对比时按"越低越好"处理。"""
+    if not len(values):
+        return {}
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        f"{prefix}_mean_seconds": round(float(values.mean()), 6),
+        f"{prefix}_p50_seconds": round(float(np.percentile(values, 50)), 6),
+        f"{prefix}_p95_seconds": round(float(np.percentile(values, 95)), 6),
+        f"{prefix}_p99_seconds": round(float(np.percentile(values, 99)), 6),
+    }
+
+
+def arrival_times(count, qps, seed=0, poisson=True):
+    """相对开始时刻的发出时间（秒）。"""
+    if qps <= 0:
+        raise ValueError("qps 必须大于 0")
+    rng = random.Random(seed)
+    times, t = [], 0.0
+    for _ in range(count):
+        times.append(t)
+        t += rng.expovariate(qps) if poisson else 1.0 / qps
+    return times
+
+
+def run_load(send, items, qps, seed=0, poisson=True, max_concurrency=64):
+    """按 qps 依次对 items 调用 send(item)，返回吞吐量、错误数与延迟分位数。
+
+    send 在线程池中执行，抛出异常记为错误；并发数达到 max_concurrency 后请求在本地排队，
+    排队时间同样计入延迟。
+    """
+    schedule = arrival_times(len(items), qps, seed, poisson)
+    records = [None] * len(items)
+    errors = []
+    lock = threading.Lock()
+
+    def call(index, scheduled):
+        started = time.perf_counter()
+        try:
+            send(items[index])
+            ok = True
+        except Exception as exc:
+            ok = False
+            with lock:
+                errors.append(str(exc))
+        records[index] = (scheduled, started, time.perf_counter(), ok)
+
+    origin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(max_concurrency, 1), thread_name_prefix="loadgen") as pool:
+        for index, offset in enumerate(schedule):
+            delay = origin + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(call, index, origin + offset)
+    finished = max(r[2] for r in records) if records else origin
+
+    succeeded = [r for r in records if r[3]]
+    duration = finished - origin
+    report = {
+        "requests": len(items),
+        "errors": len(items) - len(succeeded),
+        "target_qps": qps,
+        "achieved_requests_per_second": round(len(succeeded) / duration, 3) if duration > 0 else 0.0,
+        "duration_seconds": round(duration, 3),
+    }
+    report.update(latency_summary([r[2] - r[0] for r in succeeded]))
+    # 只计服务耗时（不含本地排队），用于区分服务端变慢与负载超出处理能力
+    report.update(latency_summary([r[2] - r[1] for r in succeeded], prefix="service"))
+    if errors:
+        report["first_error"] = errors[0]
+    return report
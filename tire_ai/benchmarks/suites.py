@@ -0,0 +1,300 @@
+"""基准测试套件。每个套件返回 {"metrics": {...}, "details": {...}}：
+
+metrics 是参与基线对比的数值，键名后缀决定方向（_seconds 越低越好，_per_second 越高越好）；
+details 保存分档明细，只写入报告不做对比。生成一律关闭结果缓存与 few-shot 注入（cache 套件除外），
+测的是模型本身的速度。
+"""
+
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import replace
+
+from .loadgen import latency_summary, run_load
+from .workload import build_workload
+
+DEFAULT_REPORT_PATH = "./outputs/benchmarks/suite.json"
+DEFAULT_STAND_IN_PATH = "./outputs/tiny-stand-in"
+SUITES = ("single", "batch", "cache", "classifier", "api")
+
+
+def single_request(engine, workload, warmup=1):
+    """逐条流式生成：端到端延迟、首token延迟与解码速度。"""
+    for item in workload[:warmup]:
+        engine.optimize(item["text"], item["instruction_type"], use_cache=False, few_shot=0)
+    latencies, ttfts, speeds, tokens = [], [], [], 0
+    for item in workload:
+        start = time.perf_counter()
+        stream = engine.stream(item["text"], item["instruction_type"], use_cache=False, few_shot=0,
+                               category=item["category"])
+        result = stream.result()
+        latencies.append(time.perf_counter() - start)
+        if stream.time_to_first_token is not None:
+            ttfts.append(stream.time_to_first_token)
+        speeds.append(stream.tokens_per_second)
+        tokens += result.generated_tokens
+    metrics = latency_summary(latencies)
+    metrics.update(latency_summary(ttfts, prefix="ttft"))
+    metrics["decode_tokens_per_second"] = round(sum(speeds) / len(speeds), 2)
+    metrics["tokens_per_second"] = round(tokens / sum(latencies), 2)
+    return {"metrics": metrics, "details": {"requests": len(workload), "generated_tokens": tokens}}
+
+
+def batch_sweep(engine, workload, batch_sizes=(1, 2, 4, 8)):
+    """不同批大小下的文档吞吐量与单批延迟。"""
+    metrics, details = {}, []
+    for size in batch_sizes:
+        batch_latencies, tokens = [], 0
+        start = time.perf_counter()
+        for offset in range(0, len(workload), size):
+            batch = workload[offset:offset + size]
+            batch_start = time.perf_counter()
+            results = engine.optimize_batch(
+                [item["text"] for item in batch],
+                [item["instruction_type"] for item in batch],
+                use_cache=False,
+                few_shot=0,
+                categories=[item["category"] for item in batch],
+            )
+            batch_latencies.append(time.perf_counter() - batch_start)
+            tokens += sum(r.generated_tokens for r in results)
+        elapsed = time.perf_counter() - start
+        row = {
+            "docs_per_second": round(len(workload) / elapsed, 3),
+            "tokens_per_second": round(tokens / elapsed, 2),
+        }
+        row.update(latency_summary(batch_latencies, prefix="batch_latency"))
+        details.append(dict(row, batch_size=size))
+        metrics.update({f"bs{size}_{k}": v for k, v in row.items()
+                        if k in ("docs_per_second", "tokens_per_second", "batch_latency_p50_seconds")})
+    return {"metrics": metrics, "details": {"sizes": details}}
+
+
+def cache_comparison(engine, workload):
+    """同一组文档：关闭缓存、缓存冷启动（全部未命中）、缓存预热后（全部命中）三遍的延迟。"""
+    from ..cache import ResultCache
+
+    original_cache = engine.cache
+    passes = {}
+    with tempfile.TemporaryDirectory() as directory:
+        # 临时缓存，不影响也不读取正式的缓存文件
+        engine.cache = ResultCache(path=os.path.join(directory, "results.sqlite"))
+        try:
+            for name, use_cache in (("off", False), ("cold", True), ("warm", True)):
+                latencies = []
+                for item in workload:
+                    start = time.perf_counter()
+                    engine.optimize(item["text"], item["instruction_type"], use_cache=use_cache, few_shot=0,
+                                    category=item["category"])
+                    latencies.append(time.perf_counter() - start)
+                passes[name] = latencies
+            stats = engine.cache.stats()
+        finally:
+            engine.cache = original_cache
+
+    metrics = {}
+    for name, latencies in passes.items():
+        metrics.update(latency_summary(latencies, prefix=name))
+    off, warm = sum(passes["off"]), sum(passes["warm"])
+    metrics["warm_hit_rate"] = round(stats["hits"] / len(workload), 4)
+    # 命中时的耗时在微秒级，加速比波动很大，只记录不参与对比
+    speedup = round(off / warm, 1) if warm > 0 else None
+    return {"metrics": metrics, "details": {"cache_stats": stats, "warm_speedup": speedup}}
+
+
+def classifier_throughput(workload, batch_sizes=(1, 32), repeats=20):
+    """轻量分类器（不升级到大模型）的吞吐量与在工作负载上的准确率。"""
+    from ..classifier import InstructionClassifier, train_classifier
+
+    classifier = InstructionClassifier(train_classifier())
+    texts = [item["text"] for item in workload]
+    metrics, details = {}, []
+    for size in batch_sizes:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for offset in range(0, len(texts), size):
+                classifier.classify_batch(texts[offset:offset + size])
+        elapsed = time.perf_counter() - start
+        rate = round(len(texts) * repeats / elapsed, 1)
+        details.append({"batch_size": size, "docs_per_second": rate})
+        metrics[f"bs{size}_docs_per_second"] = rate
+    predicted = classifier.classify_batch(texts)
+    correct = sum(p.instruction_type == item["instruction_type"] for p, item in zip(predicted, workload))
+    metrics["accuracy"] = round(correct / len(workload), 4)
+    return {"metrics": metrics, "details": {"sizes": details}}
+
+
+class LocalServer:
+    """在后台线程中启动 API 服务（使用已加载的引擎），退出时关闭。"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.server = None
+        self.thread = None
+        self.url = None
+
+    def __enter__(self):
+        import uvicorn
+
+        from ..api import create_app
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        config = uvicorn.Config(create_app(engine=self.engine), host="127.0.0.1", port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, name="benchmark-api", daemon=True)
+        self.thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError("本地API服务启动失败")
+            time.sleep(0.05)
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+def api_load(workload, qps_levels=(1, 2, 4), requests_per_level=16, base_url=None, engine=None, seed=0):
+    """按不同 QPS 对文本优化接口施加负载；未指定 base_url 时在本进程内启动服务。
+
+    对外部服务测试时，重复的文本会命中服务端的结果缓存，需要时请以 TIRE_AI_CACHE=0 启动服务。
+    """
+    from ..client import optimize_text
+
+    def level(url):
+        metrics, details = {}, []
+        for qps in qps_levels:
+            items = [workload[i % len(workload)] for i in range(requests_per_level)]
+            result = run_load(
+                lambda item: optimize_text(item["text"], item["instruction_type"], base_url=url),
+                items,
+                qps,
+                seed=seed,
+            )
+            details.append(result)
+            for key in ("achieved_requests_per_second", "latency_p50_seconds", "latency_p95_seconds", "errors"):
+                metrics[f"qps{qps:g}_{key}"] = result[key] if key in result else None
+        return {"metrics": {k: v for k, v in metrics.items() if v is not None}, "details": {"levels": details}}
+
+    if base_url:
+        return level(base_url)
+    with LocalServer(engine) as server:
+        return level(server.url)
+
+
+def ensure_stand_in(path=DEFAULT_STAND_IN_PATH):
+    """没有指定模型时使用 CPU 替身模型（随机权重，每次生成到 max_new_tokens 为止，便于横向比较）。"""
+    if not os.path.isfile(os.path.join(path, "config.json")):
+        from ..tiny_model import build_tiny_model
+
+        build_tiny_model(path, with_adapter=True)
+    return path
+
+
+def _git_commit():
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def _environment():
+    import torch
+    import transformers
+
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+    }
+
+
+def run_benchmarks(suites=SUITES, config=None, workload_size=32, seed=0, batch_sizes=(1, 2, 4, 8),
+                   qps_levels=(1, 2, 4), api_requests=16, api_url=None, repeats=1, output_path=DEFAULT_REPORT_PATH,
+                   progress=None):
+    """依次运行选中的套件 repeats 遍，各指标取中位数，返回报告并写入 output_path（JSON）。"""
+    import torch
+
+    from ..config import EngineConfig
+    from ..engine import TextOptimizationEngine
+
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise ValueError(f"未知的套件：{', '.join(sorted(unknown))}（可选 {'/'.join(SUITES)}）")
+    torch.manual_seed(seed)
+    config = replace(config or EngineConfig.from_env(), few_shot=0)
+    workload = build_workload(workload_size, seed)
+
+    engine = None
+    if set(suites) - {"classifier"} and not (set(suites) == {"api"} and api_url):
+        # 引擎不带结果缓存：cache 套件自行挂载临时缓存
+        engine = TextOptimizationEngine(config, cache=None).load()
+
+    runs = {name: [] for name in suites}
+    for round_index in range(max(repeats, 1)):
+        for name in suites:
+            if progress is not None:
+                progress(f"{name}（第{round_index + 1}遍）")
+            started = time.perf_counter()
+            if name == "single":
+                result = single_request(engine, workload)
+            elif name == "batch":
+                result = batch_sweep(engine, workload, batch_sizes)
+            elif name == "cache":
+                result = cache_comparison(engine, workload)
+            elif name == "classifier":
+                result = classifier_throughput(workload)
+            else:
+                result = api_load(workload, qps_levels, api_requests, api_url, engine, seed)
+            result["details"]["suite_seconds"] = round(time.perf_counter() - started, 2)
+            runs[name].append(result)
+
+    # 多遍取中位数以抑制偶发的系统抖动；明细保留最后一遍
+    results = {}
+    for name, attempts in runs.items():
+        metrics = {key: statistics.median(a["metrics"][key] for a in attempts) for key in attempts[-1]["metrics"]}
+        results[name] = {"metrics": metrics, "details": attempts[-1]["details"]}
+
+    report = {
+        "meta": {
+            "base_model": config.base_model,
+            "adapter_path": config.adapter_path,
+            "quantization": config.quantization,
+            "speculative": config.speculative,
+            "device": engine.stats.device if engine is not None else None,
+            "max_new_tokens": config.max_new_tokens,
+            "workload_size": workload_size,
+            "seed": seed,
+            "repeats": max(repeats, 1),
+            "git_commit": _git_commit(),
+            "timestamp": time.time(),
+            "environment": _environment(),
+        },
+        "metrics": {f"{suite}.{key}": value for suite, r in results.items() for key, value in r["metrics"].items()},
+        "suites": {suite: r["details"] for suite, r in results.items()},
+    }
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
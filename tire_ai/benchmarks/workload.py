@@ -0,0 +1,84 @@
+"""基准测试的工作负载：tire_cases_data 原文加上按固定随机种子生成的变体。
+
+变体改写数值、调整句序、拼接两篇纪要、加上不同的开头或截短，文本长度与内容各不相同，
+可以避免结果缓存在不该命中时命中；同一种子总是得到同一组文本，便于与基线对比。
+"""
+
+import random
+import re
+
+from ..cases import tire_cases_data
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_SENTENCE = re.compile(r"(?<=[。；！？])")
+_OPENINGS = (
+    "【车间早会纪要】",
+    "据质检部门反馈，",
+    "二号线夜班记录：",
+    "设备科周报摘录：",
+    "客户投诉跟进：",
+)
+
+
+def _scale_numbers(text, rng):
+    def replace(match):
+        value = float(match.group()) * rng.uniform(0.8, 1.2)
+        if "." in match.group():
+            return f"{value:.{len(match.group().split('.')[1])}f}"
+        return str(max(int(round(value)), 1))
+
+    return _NUMBER.sub(replace, text)
+
+
+def _sentences(text):
+    return [s for s in _SENTENCE.split(text) if s.strip()]
+
+
+def _reorder(text, rng):
+    sentences = _sentences(text)
+    rng.shuffle(sentences)
+    return "".join(sentences)
+
+
+def _truncate(text, rng):
+    sentences = _sentences(text)
+    return "".join(sentences[:rng.randint(1, max(len(sentences) - 1, 1))])
+
+
+VARIATIONS = {
+    "numbers": lambda case, other, rng: _scale_numbers(case["original_text"], rng),
+    "reorder": lambda case, other, rng: _reorder(case["original_text"], rng),
+    "opening": lambda case, other, rng: rng.choice(_OPENINGS) + case["original_text"],
+    "truncate": lambda case, other, rng: _truncate(case["original_text"], rng),
+    "concat": lambda case, other, rng: case["original_text"] + _scale_numbers(other["original_text"], rng),
+}
+
+
+def build_workload(count=32, seed=0, cases=None):
+    """返回 count 条 {"id", "text", "instruction_type", "category", "variation"}，前几条为案例原文。"""
+    cases = list((cases or tire_cases_data).values())
+    rng = random.Random(seed)
+    items = []
+    seen = set()
+    for i in range(count):
+        case = cases[i % len(cases)]
+        if i < len(cases):
+            variation, text = "original", case["original_text"]
+        else:
+            # 短文本的变体可能与已有文本相同，重抽几次，仍重复时加上编号
+            for _ in range(5):
+                variation = rng.choice(sorted(VARIATIONS))
+                text = VARIATIONS[variation](case, rng.choice(cases), rng)
+                if text not in seen:
+                    break
+            else:
+                text = f"{text}（记录{i}）"
+        seen.add(text)
+        items.append({
+            "id": i,
+            "text": text,
+            "instruction_type": case["instruction_type"],
+            "category": case["category"],
+            "variation": variation,
+        })
+    return items
@@ -0,0 +1,281 @@
+"""结果缓存：按内容寻址，内存 LRU + SQLite 磁盘两级存储。
+
+缓存键由规范化后的输入文本、Instruction 类型、模型/适配器版本和生成参数共同决定，
+相同的样板纪要只需生成一次。
+
+PrefixCache 是另一类缓存：保存提示词固定前缀（Instruction 模板）的 KV 张量，
+同一类型的请求跳过这部分的预填充计算。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "./outputs/cache/results.sqlite"
+
+_WHITESPACE = re.compile(r"[\s　]+")
+
+
+def normalize_text(text):
+    # 只折叠空白，不做 NFKC 之类的归一化（会把"℃"改写成"°C"）
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_key(namespace, text, instruction_type="", version="", params=None):
+    payload = json.dumps(
+        [namespace, normalize_text(text), instruction_type, version, params or {}],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def directory_fingerprint(path):
+    """目录内文件名、大小、修改时间的摘要；保存新的 LoRA 检查点后会发生变化。"""
+    if not path or not os.path.isdir(path):
+        return ""
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(path)):
+        full = os.path.join(path, name)
+        if os.path.isfile(full):
+            stat = os.stat(full)
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_items=512, max_disk_mb=256):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._disk_bytes = 0
+        if path:
+            self._open()
+
+    def _open(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Streamlit 各会话运行在不同线程，连接由 self._lock 保护
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+            """
+        )
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        self._disk_bytes = int(row[0])
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._conn.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value, namespace="optimize"):
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is None:
+                return
+            old = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, namespace, value, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, data, len(data.encode("utf-8")), time.time()),
+            )
+            self._disk_bytes += len(data.encode("utf-8")) - (old[0] if old else 0)
+            self._evict_disk()
+            self._conn.commit()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        # 超出容量时按最近访问时间淘汰，直到降到上限的 90%
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        target = int(self.max_disk_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed ASC").fetchall()
+        removed = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            removed.append((key,))
+            self._disk_bytes -= size
+            self._memory.pop(key, None)
+        self._conn.executemany("DELETE FROM results WHERE key = ?", removed)
+        self.evictions += len(removed)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM results")
+                self._conn.commit()
+            self._disk_bytes = 0
+
+    def sync_version(self, version):
+        """记录当前适配器版本；版本变化（保存了新的 LoRA 检查点）时清空缓存。"""
+        with self._lock:
+            if self._conn is None:
+                current = getattr(self, "_version", None)
+                self._version = version
+                changed = current is not None and current != version
+            else:
+                row = self._conn.execute("SELECT value FROM meta WHERE name = 'adapter_version'").fetchone()
+                changed = row is not None and row[0] != version
+                if row is None or changed:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta (name, value) VALUES ('adapter_version', ?)", (version,)
+                    )
+                    self._conn.commit()
+        if changed:
+            logger.info("检测到新的LoRA检查点（%s），清空结果缓存", version)
+            self.clear()
+        return changed
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            if self._conn is not None:
+                entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            else:
+                entries = len(self._memory)
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": entries,
+                "disk_mb": self._disk_bytes / 1024 ** 2,
+                "evictions": self.evictions,
+            }
+
+
+class PrefixCache:
+    """提示词前缀的 KV 缓存，按 (模型版本, 前缀文本) 寻址，只在内存中按 LRU 淘汰。
+
+    前缀文本原样作为键（不折叠空白，分词结果与空白有关）；模板或示例改动后键随之变化，
+    更换适配器或量化方式后模型版本变化，旧条目不会再被命中，由 LRU 自然淘汰。
+    """
+
+    def __init__(self, max_mb=512):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+        self.seconds_saved = 0.0
+
+    def get(self, version, prefix):
+        with self._lock:
+            entry = self._entries.get((version, prefix))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((version, prefix))
+            self.hits += 1
+            return entry
+
+    def put(self, version, prefix, entry):
+        with self._lock:
+            old = self._entries.pop((version, prefix), None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[(version, prefix)] = entry
+            self._bytes += entry.nbytes
+            # 至少保留刚放入的一条
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def record_saving(self, tokens, seconds):
+        with self._lock:
+            self.tokens_saved += tokens
+            self.seconds_saved += seconds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_mb": self._bytes / 1024 ** 2,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "tokens_saved": self.tokens_saved,
+                "prefill_seconds_saved": self.seconds_saved,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """进程级共享缓存；设置 TIRE_AI_CACHE=0 时返回 None（关闭缓存）。"""
+    global _cache
+    if os.environ.get("TIRE_AI_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(
+                path=os.environ.get("TIRE_AI_CACHE_PATH", DEFAULT_CACHE_PATH),
+                memory_items=int(os.environ.get("TIRE_AI_CACHE_MEMORY_ITEMS", "512")),
+                max_disk_mb=float(os.environ.get("TIRE_AI_CACHE_MAX_MB", "256")),
+            )
+    return _cache
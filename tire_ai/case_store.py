@@ -0,0 +1,279 @@
+"""案例库：SQLite 存储审核过的优化前后文档对，FTS5 全文检索，按分类/类型/指标建索引。
+
+模块2的案例选择只按页读取标题等轻量字段，选中后再读取全文，5 万条案例下仍保持毫秒级响应。
+
+导入数据准备流水线的输出（只导入带优化文本的记录）：
+    python -m tire_ai.case_store import "./data/splits/*.jsonl"
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .data_pipeline import clean_record, iter_records, record_digest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CASE_DB = "./outputs/cases.sqlite"
+METRIC_FIELDS = ("rouge_l", "bleu", "semantic_similarity", "perspective_accuracy")
+# list_cases 允许的排序字段，避免拼接任意 SQL
+ORDER_FIELDS = ("id",) + METRIC_FIELDS
+_SUMMARY_COLUMNS = "id, case_key, title, category, instruction_type, rouge_l"
+# trigram 分词器按3个字符切分，中文无需额外分词；更短的关键词退回 LIKE 查询
+_TRIGRAM = 3
+
+
+class CaseStore:
+    def __init__(self, path=DEFAULT_CASE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Streamlit 各会话运行在不同线程，连接由 self._lock 保护
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # REPLACE 删除旧行时需要触发 cases_ad，保持全文索引同步
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                case_key TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL DEFAULT '',
+                original_text TEXT NOT NULL,
+                optimized_text TEXT NOT NULL,
+                instruction_type TEXT NOT NULL DEFAULT '',
+                category TEXT NOT NULL DEFAULT '',
+                rouge_l REAL,
+                bleu REAL,
+                semantic_similarity REAL,
+                perspective_accuracy REAL,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cases_category ON cases(category, instruction_type);
+            CREATE INDEX IF NOT EXISTS idx_cases_instruction_type ON cases(instruction_type);
+            CREATE INDEX IF NOT EXISTS idx_cases_rouge_l ON cases(rouge_l);
+            CREATE INDEX IF NOT EXISTS idx_cases_bleu ON cases(bleu);
+            CREATE INDEX IF NOT EXISTS idx_cases_semantic_similarity ON cases(semantic_similarity);
+            CREATE INDEX IF NOT EXISTS idx_cases_perspective_accuracy ON cases(perspective_accuracy);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+                title, original_text, optimized_text,
+                content='cases', content_rowid='id', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS cases_ai AFTER INSERT ON cases BEGIN
+                INSERT INTO cases_fts(rowid, title, original_text, optimized_text)
+                VALUES (new.id, new.title, new.original_text, new.optimized_text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS cases_ad AFTER DELETE ON cases BEGIN
+                INSERT INTO cases_fts(cases_fts, rowid, title, original_text, optimized_text)
+                VALUES ('delete', old.id, old.title, old.original_text, old.optimized_text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS cases_au AFTER UPDATE ON cases BEGIN
+                INSERT INTO cases_fts(cases_fts, rowid, title, original_text, optimized_text)
+                VALUES ('delete', old.id, old.title, old.original_text, old.optimized_text);
+                INSERT INTO cases_fts(rowid, title, original_text, optimized_text)
+                VALUES (new.id, new.title, new.original_text, new.optimized_text);
+            END;
+            """
+        )
+
+    def add_cases(self, cases, batch_size=1000):
+        """写入 (case_key, case) 序列，case 与 tire_cases_data 中的条目结构相同；已存在的 case_key 会被更新。"""
+        written = 0
+        batch = []
+        for key, case in cases:
+            metrics = case.get("metrics") or {}
+            batch.append((
+                key,
+                case.get("title") or "",
+                case["original_text"],
+                case.get("optimized_text") or "",
+                case.get("instruction_type") or "",
+                case.get("category") or "",
+                *(metrics.get(name) for name in METRIC_FIELDS),
+                time.time(),
+            ))
+            if len(batch) >= batch_size:
+                written += self._write(batch)
+                batch = []
+        if batch:
+            written += self._write(batch)
+        return written
+
+    def _write(self, rows):
+        with self._lock:
+            # REPLACE 会删除旧行后插入新行：内容更新的案例获得新的 id，向量索引据此增量同步
+            self._conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO cases (case_key, title, original_text, optimized_text, instruction_type,
+                                              category, {', '.join(METRIC_FIELDS)}, created)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def _where(self, category=None, instruction_type=None, search=None, min_score=None, score_field="rouge_l"):
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if instruction_type:
+            clauses.append("instruction_type = ?")
+            params.append(instruction_type)
+        if min_score is not None:
+            if score_field not in METRIC_FIELDS:
+                raise ValueError(f"未知的指标字段：{score_field}")
+            clauses.append(f"{score_field} >= ?")
+            params.append(min_score)
+        search = (search or "").strip()
+        if search:
+            if len(search) >= _TRIGRAM:
+                clauses.append("id IN (SELECT rowid FROM cases_fts WHERE cases_fts MATCH ?)")
+                # 按短语匹配，关键词中的引号需要转义
+                params.append('"' + search.replace('"', '""') + '"')
+            else:
+                clauses.append("(title LIKE ? OR original_text LIKE ? OR optimized_text LIKE ?)")
+                params.extend([f"%{search}%"] * 3)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM cases{where}", params).fetchone()[0]
+
+    def list_cases(self, offset=0, limit=50, order_by="id", descending=False, **filters):
+        """按页返回案例摘要（不含正文）。"""
+        if order_by not in ORDER_FIELDS:
+            raise ValueError(f"不支持的排序字段：{order_by}")
+        where, params = self._where(**filters)
+        direction = "DESC" if descending else "ASC"
+        # 指标排序时没有指标的案例排在最后
+        order = f"id {direction}" if order_by == "id" else f"{order_by} IS NULL, {order_by} {direction}, id"
+        sql = f"SELECT {_SUMMARY_COLUMNS} FROM cases{where} ORDER BY {order} LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_case(self, case_key):
+        """返回与 tire_cases_data 条目结构相同的完整案例；不存在时返回 None。"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM cases WHERE case_key = ?", (case_key,)).fetchone()
+        if row is None:
+            return None
+        metrics = {name: row[name] for name in METRIC_FIELDS if row[name] is not None}
+        return {
+            "title": row["title"],
+            "original_text": row["original_text"],
+            "optimized_text": row["optimized_text"],
+            "instruction_type": row["instruction_type"],
+            "category": row["category"],
+            "metrics": metrics,
+        }
+
+    def iter_since(self, last_id, batch_size=2000):
+        """按 id 顺序分批返回 id 大于 last_id 的案例（id, case_key, original_text, instruction_type）。"""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, case_key, original_text, instruction_type FROM cases WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            last_id = rows[-1]["id"]
+
+    def max_id(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM cases").fetchone()[0]
+
+    def categories(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT category FROM cases WHERE category != '' ORDER BY category")
+            return [row[0] for row in rows]
+
+    def ensure_seeded(self):
+        """空库时写入内置案例，保证页面开箱可用。"""
+        with self._lock:
+            empty = self._conn.execute("SELECT 1 FROM cases LIMIT 1").fetchone() is None
+        if empty:
+            from .cases import tire_cases_data
+
+            self.add_cases(tire_cases_data.items())
+
+    def import_records(self, paths, progress=None):
+        """导入 JSONL/CSV（如数据准备流水线的分片），case_key 取记录的 id，没有时取内容摘要。"""
+        def iter_cases():
+            for record in iter_records(paths):
+                cleaned = clean_record(record)
+                if cleaned is None or not cleaned["optimized_text"]:
+                    continue
+                cleaned["metrics"] = record.get("metrics") or {
+                    name: record[name] for name in METRIC_FIELDS if record.get(name) not in (None, "")
+                }
+                key = str(record.get("id") or record.get("case_key") or f"{record_digest(cleaned):016x}")
+                yield key, cleaned
+
+        total = 0
+        for written in self._batched_add(iter_cases()):
+            total += written
+            if progress is not None:
+                progress(total)
+        return total
+
+    def _batched_add(self, cases, batch_size=5000):
+        batch = []
+        for item in cases:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield self.add_cases(batch, batch_size)
+                batch = []
+        if batch:
+            yield self.add_cases(batch, batch_size)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_case_store():
+    """进程级共享案例库，路径由 TIRE_AI_CASE_DB 指定。"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CaseStore(os.environ.get("TIRE_AI_CASE_DB", DEFAULT_CASE_DB))
+            _store.ensure_seeded()
+    return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="案例库管理")
+    parser.add_argument("--db", default=os.environ.get("TIRE_AI_CASE_DB", DEFAULT_CASE_DB))
+    sub = parser.add_subparsers(dest="command", required=True)
+    importer = sub.add_parser("import", help="导入 JSONL/CSV 案例")
+    importer.add_argument("inputs", nargs="+")
+    search = sub.add_parser("search", help="全文检索")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    store = CaseStore(args.db)
+    if args.command == "import":
+        total = store.import_records(args.inputs, progress=lambda n: logger.info("已导入 %d 条", n))
+        print(json.dumps({"imported": total, "total": store.count()}, ensure_ascii=False))
+    else:
+        for row in store.list_cases(limit=args.limit, search=args.query):
+            print(f"{row['case_key']}\t{row['category']}\t{row['instruction_type']}\t{row['title']}")
+
+
+if __name__ == "__main__":
+    main()
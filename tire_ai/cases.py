@@ -0,0 +1,43 @@
+"""轮胎制造业技术写作文档案例（基于开源数据整理）。"""
+
+tire_cases_data = {
+    "案例1": {
+        "title": "轮胎硫化工艺改进纪要转化",
+        "original_text": "硫化温度从150度提升到155度，硫化时间缩短5分钟，可提高生产效率15%，同时保证轮胎物理性能指标符合标准要求。操作员需要调整设备参数设置，确保温度控制精度在±2度范围内。",
+        "optimized_text": "通过优化硫化工艺参数（温度提升至155℃，时间缩短5分钟），在不降低产品质量的前提下，生产效率提升15%。建议操作人员精确控制温度波动范围±2℃，以确保硫化过程的一致性和产品质量的稳定性。",
+        "instruction_type": "分类型",
+        "category": "工艺改进",
+        "metrics": {
+            "rouge_l": 0.785,
+            "bleu": 0.692,
+            "semantic_similarity": 0.834,
+            "perspective_accuracy": 0.912
+        }
+    },
+    "案例2": {
+        "title": "轮胎成型设备故障排除纪要转化",
+        "original_text": "成型机压力传感器异常，压力波动大，检查显示发现是密封圈老化导致，更换密封圈后恢复正常。需要定期检查密封件状态，建议每季度更换一次。",
+        "optimized_text": "成型设备压力异常的根本原因为密封件老化。解决方案：1）立即更换老化密封圈；2）建立密封件定期更换制度（建议每季度）；3）增加压力传感器日常监控频次。建议制定设备预防性维护计划，确保生产连续性。",
+        "instruction_type": "分类型",
+        "category": "故障排除",
+        "metrics": {
+            "rouge_l": 0.812,
+            "bleu": 0.723,
+            "semantic_similarity": 0.867,
+            "perspective_accuracy": 0.934
+        }
+    },
+    "案例3": {
+        "title": "轮胎产品参数表转化",
+        "original_text": "215/60R16轮胎：宽度215mm，扁平比60%，轮辋直径16英寸，载重指数95，速度级别H。建议胎压2.3bar，适用于中型轿车。",
+        "optimized_text": "产品规格：215/60R16（轿车轮胎）\n技术参数：\n- 轮胎宽度：215mm\n- 扁平比：60%\n- 轮辋直径：16英寸\n- 载重指数：95（690kg）\n- 速度级别：H（210km/h）\n\n推荐使用条件：标准胎压2.3bar，适用于中型轿车日常行驶。",
+        "instruction_type": "开放型",
+        "category": "产品说明",
+        "metrics": {
+            "rouge_l": 0.756,
+            "bleu": 0.681,
+            "semantic_similarity": 0.798,
+            "perspective_accuracy": 0.889
+        }
+    }
+}
@@ -0,0 +1,356 @@
+"""Instruction 类型分类器。
+
+两级结构：
+- 轻量级：字符 n-gram TF-IDF + softmax 线性模型，纯 NumPy 向量化，可一次处理数百篇文档；
+- 重量级：置信度低于阈值的文档交给大模型，按候选标签的条件对数似然打分。
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import metrics
+from .cases import tire_cases_data
+from .prompts import INSTRUCTION_TYPES, normalize_instruction_type
+
+DEFAULT_CLASSIFIER_PATH = "./outputs/instruction-classifier"
+
+# 少量人工整理的种子样本，与案例库一起作为默认训练数据
+SEED_EXAMPLES = [
+    ("密炼机转子温度偏高，排查发现冷却水流量不足，清理过滤器后恢复。建议每周检查冷却水过滤器。", "分类型"),
+    ("胎面挤出速度由12m/min提高到14m/min，口型温度相应调整，废品率下降3%。", "分类型"),
+    ("帘布裁断机刀片磨损导致裁断角度偏差，更换刀片并重新标定后偏差小于0.5度。", "分类型"),
+    ("硫化机合模压力不稳定，检查液压系统发现溢流阀卡滞，清洗后压力恢复正常。", "分类型"),
+    ("胶料门尼粘度波动较大，调整混炼时间后波动范围控制在±3以内。", "分类型"),
+    ("205/55R16轮胎：宽度205mm，扁平比55%，轮辋直径16英寸，载重指数91，速度级别V。", "开放型"),
+    ("225/45R17轮胎参数：载重指数94，速度级别W，建议胎压2.5bar，适用于运动型轿车。", "开放型"),
+    ("全钢子午线轮胎12R22.5，层级18PR，花纹深度15mm，适用于长途干线运输。", "开放型"),
+    ("雪地轮胎195/65R15，带3PMSF标志，橡胶配方低温柔性好，适用于冬季冰雪路面。", "开放型"),
+    ("新款节能轮胎滚动阻力等级A，湿地抓地力等级B，噪音69dB。", "开放型"),
+]
+
+
+def default_examples():
+    examples = [(c["original_text"], c["instruction_type"]) for c in tire_cases_data.values()]
+    return examples + SEED_EXAMPLES
+
+
+def _ngrams(text, ngram_range):
+    lo, hi = ngram_range
+    grams = Counter()
+    for n in range(lo, hi + 1):
+        for i in range(len(text) - n + 1):
+            grams[text[i:i + n]] += 1
+    return grams
+
+
+class CharNgramTfidf:
+    """字符 n-gram TF-IDF，输出 COO 形式的稀疏矩阵 (rows, cols, values)。"""
+
+    def __init__(self, ngram_range=(1, 3), min_df=1, max_features=50000):
+        self.ngram_range = tuple(ngram_range)
+        self.min_df = min_df
+        self.max_features = max_features
+        self.vocabulary = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+
+    def fit(self, texts):
+        df = Counter()
+        for text in texts:
+            df.update(_ngrams(text, self.ngram_range).keys())
+        items = [(g, c) for g, c in df.items() if c >= self.min_df]
+        items.sort(key=lambda x: (-x[1], x[0]))
+        items = items[: self.max_features]
+        self.vocabulary = {g: i for i, (g, _) in enumerate(items)}
+        n = len(texts)
+        counts = np.array([c for _, c in items], dtype=np.float32)
+        # 平滑 idf，与 sklearn 的 smooth_idf=True 一致
+        self.idf = np.log((1.0 + n) / (1.0 + counts)) + 1.0
+        return self
+
+    def transform(self, texts):
+        rows, cols, vals = [], [], []
+        vocab = self.vocabulary
+        for row, text in enumerate(texts):
+            for gram, count in _ngrams(text, self.ngram_range).items():
+                idx = vocab.get(gram)
+                if idx is not None:
+                    rows.append(row)
+                    cols.append(idx)
+                    vals.append(count)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        # 次线性 tf × idf，再按行做 L2 归一化
+        vals = (1.0 + np.log(np.asarray(vals, dtype=np.float32))) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=vals * vals, minlength=len(texts)))
+        vals = vals / np.maximum(norms[rows], 1e-12)
+        return rows, cols, vals.astype(np.float32), len(texts)
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class LinearTextClassifier:
+    """softmax 回归，在稀疏特征上用全批量梯度下降训练。"""
+
+    def __init__(self, labels=INSTRUCTION_TYPES, vectorizer=None, l2=1e-4):
+        self.labels = list(labels)
+        self.vectorizer = vectorizer or CharNgramTfidf()
+        self.l2 = l2
+        self.weights = None
+        self.bias = None
+
+    def _logits(self, rows, cols, vals, n):
+        # 稀疏矩阵乘法：对每个类别按行累加 x_ij * w_jk
+        logits = np.empty((n, len(self.labels)), dtype=np.float32)
+        for k in range(len(self.labels)):
+            logits[:, k] = np.bincount(rows, weights=vals * self.weights[cols, k], minlength=n)
+        return logits + self.bias
+
+    def fit(self, texts, labels, epochs=300, learning_rate=2.0):
+        self.vectorizer.fit(texts)
+        rows, cols, vals, n = self.vectorizer.transform(texts)
+        dim = len(self.vectorizer.vocabulary)
+        index = {label: i for i, label in enumerate(self.labels)}
+        y = np.zeros((n, len(self.labels)), dtype=np.float32)
+        y[np.arange(n), [index[normalize_instruction_type(l)] for l in labels]] = 1.0
+        self.weights = np.zeros((dim, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(epochs):
+            grad_out = (_softmax(self._logits(rows, cols, vals, n)) - y) / n
+            grad_w = np.empty_like(self.weights)
+            for k in range(len(self.labels)):
+                grad_w[:, k] = np.bincount(cols, weights=vals * grad_out[rows, k], minlength=dim)
+            self.weights -= learning_rate * (grad_w + self.l2 * self.weights)
+            self.bias -= learning_rate * grad_out.sum(axis=0)
+        return self
+
+    def predict_proba(self, texts):
+        if not texts:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        return _softmax(self._logits(*self.vectorizer.transform(texts)))
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        meta = {
+            "labels": self.labels,
+            "ngram_range": list(self.vectorizer.ngram_range),
+            "vocabulary": self.vectorizer.vocabulary,
+        }
+        with open(os.path.join(path, "classifier.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        np.savez(
+            os.path.join(path, "weights.npz"),
+            weights=self.weights,
+            bias=self.bias,
+            idf=self.vectorizer.idf,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "classifier.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = np.load(os.path.join(path, "weights.npz"))
+        vectorizer = CharNgramTfidf(ngram_range=meta["ngram_range"])
+        vectorizer.vocabulary = meta["vocabulary"]
+        vectorizer.idf = arrays["idf"]
+        model = cls(labels=meta["labels"], vectorizer=vectorizer)
+        model.weights = arrays["weights"]
+        model.bias = arrays["bias"]
+        return model
+
+
+LLM_CLASSIFY_PROMPT = "判断以下轮胎制造业技术文档的Instruction类型（分类型或开放型）。\n文档：{text}\n类型："
+
+
+def llm_label_scores(engine, texts, labels=INSTRUCTION_TYPES, batch_size=None):
+    """用大模型计算每个候选标签的条件对数似然，返回 (N, C) 数组。
+
+    N×C 条候选序列按 batch_size 行一批前向（默认 TIRE_AI_CLASSIFIER_BATCH_SIZE，8），
+    只对标签 token 所在位置的 logits 求 log_softmax，显存占用与待复核的文档数无关。
+    """
+    import torch
+
+    batch_size = batch_size or int(os.environ.get("TIRE_AI_CLASSIFIER_BATCH_SIZE", "8"))
+    engine.load()
+    tokenizer = engine.tokenizer
+    prompts = [tokenizer(LLM_CLASSIFY_PROMPT.format(text=t))["input_ids"] for t in texts]
+    options = [tokenizer(label, add_special_tokens=False)["input_ids"] for label in labels]
+    sequences, option_lengths = [], []
+    for prompt in prompts:
+        for option in options:
+            sequences.append(prompt + option)
+            option_lengths.append(len(option))
+
+    scores = np.empty(len(sequences), dtype=np.float32)
+    option_width = max(option_lengths)
+    for start in range(0, len(sequences), batch_size):
+        batch = sequences[start:start + batch_size]
+        width = max(len(s) for s in batch)
+        input_ids = torch.full((len(batch), width), tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros_like(input_ids)
+        for row, seq in enumerate(batch):
+            input_ids[row, width - len(seq):] = torch.tensor(seq)
+            attention_mask[row, width - len(seq):] = 1
+        position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)
+
+        with engine.use_adapter(), torch.inference_mode():
+            logits = engine.model(
+                input_ids=input_ids.to(engine.device),
+                attention_mask=attention_mask.to(engine.device),
+                position_ids=position_ids.to(engine.device),
+            ).logits
+            # 标签 token 位于序列末尾（左侧填充），只取预测它们的最后 option_width 个位置
+            log_probs = torch.log_softmax(logits[:, width - 1 - option_width:width - 1].float(), dim=-1)
+            del logits
+        targets = input_ids[:, width - option_width:].to(engine.device)
+        token_scores = log_probs.gather(-1, targets.unsqueeze(-1)).squeeze(-1).cpu().numpy()
+        for row, option_len in enumerate(option_lengths[start:start + len(batch)]):
+            # 取平均对数似然以消除标签长度差异
+            scores[start + row] = token_scores[row, option_width - option_len:].mean()
+    return scores.reshape(len(texts), len(labels))
+
+
+def llm_label_probabilities(engine, texts, labels=INSTRUCTION_TYPES):
+    """大模型给出的标签概率 (N, C)，结果按文本写入引擎的结果缓存。"""
+    from .cache import make_key
+
+    labels = list(labels)
+    cache = engine.cache
+    out = np.zeros((len(texts), len(labels)), dtype=np.float32)
+    keys = [None] * len(texts)
+    pending = []
+    for i, text in enumerate(texts):
+        if cache is not None:
+            keys[i] = make_key("classify", text, version=engine.model_version, params={"labels": labels})
+            value = cache.get(keys[i])
+            if value is not None:
+                out[i] = value["probabilities"]
+                continue
+        pending.append(i)
+    if pending:
+        scores = llm_label_scores(engine, [texts[i] for i in pending], labels)
+        probs = _softmax(scores)
+        for i, p in zip(pending, probs):
+            out[i] = p
+            if keys[i] is not None:
+                cache.put(keys[i], {"probabilities": p.tolist()}, namespace="classify")
+    return out
+
+
+@dataclass
+class ClassificationResult:
+    instruction_type: str
+    probabilities: dict
+    tier: str
+    confidence: float
+    elapsed_ms: float = 0.0
+
+
+class InstructionClassifier:
+    def __init__(self, model, escalation_threshold=0.7):
+        self.model = model
+        self.escalation_threshold = escalation_threshold
+
+    def classify_batch(self, texts, engine=None):
+        """批量分类；仅当提供 engine 时，低置信度文档才会交给大模型复核。"""
+        start = time.perf_counter()
+        probs = self.model.predict_proba(texts)
+        tiers = ["light"] * len(texts)
+        confidence = probs.max(axis=1) if len(texts) else np.zeros(0)
+        ambiguous = np.flatnonzero(confidence < self.escalation_threshold)
+        if engine is not None and len(ambiguous):
+            probs[ambiguous] = self._escalate(engine, [texts[i] for i in ambiguous])
+            for i in ambiguous:
+                tiers[i] = "llm"
+        elapsed = time.perf_counter() - start
+        metrics.observe("classification", elapsed)
+        elapsed_ms = elapsed * 1000 / max(len(texts), 1)
+
+        labels = self.model.labels
+        results = []
+        for row, tier in enumerate(tiers):
+            best = int(probs[row].argmax())
+            results.append(
+                ClassificationResult(
+                    instruction_type=labels[best],
+                    probabilities={label: float(p) for label, p in zip(labels, probs[row])},
+                    tier=tier,
+                    confidence=float(probs[row, best]),
+                    elapsed_ms=elapsed_ms,
+                )
+            )
+        return results
+
+    def classify(self, text, engine=None):
+        return self.classify_batch([text], engine)[0]
+
+    def _escalate(self, engine, texts):
+        # 本进程的推理引擎或远程模型服务（RemoteEngine）都提供 label_probabilities
+        return np.asarray(engine.label_probabilities(texts, self.model.labels), dtype=np.float32)
+
+
+def train_classifier(examples=None, output_dir=None):
+    examples = list(examples or default_examples())
+    texts = [t for t, _ in examples]
+    labels = [l for _, l in examples]
+    model = LinearTextClassifier().fit(texts, labels)
+    if output_dir:
+        model.save(output_dir)
+    return model
+
+
+def iter_jsonl_examples(path):
+    # 兼容数据准备流水线输出的字段名
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                text = record.get("original_text") or record.get("text")
+                if text and record.get("instruction_type"):
+                    yield text, record["instruction_type"]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier(path=None):
+    """进程级共享分类器；没有已训练的模型时用默认样本即时训练（约数十毫秒）。"""
+    global _classifier
+    path = path or os.environ.get("TIRE_AI_CLASSIFIER_PATH", DEFAULT_CLASSIFIER_PATH)
+    threshold = float(os.environ.get("TIRE_AI_CLASSIFIER_THRESHOLD", "0.7"))
+    with _classifier_lock:
+        if _classifier is None:
+            if os.path.isfile(os.path.join(path, "classifier.json")):
+                model = LinearTextClassifier.load(path)
+            else:
+                model = train_classifier()
+            _classifier = InstructionClassifier(model, escalation_threshold=threshold)
+    return _classifier
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="训练Instruction类型轻量分类器")
+    parser.add_argument("data", nargs="*", help="JSONL训练数据（含 original_text/text 与 instruction_type 字段）")
+    parser.add_argument("--output", default=DEFAULT_CLASSIFIER_PATH)
+    args = parser.parse_args(argv)
+
+    examples = default_examples()
+    for path in args.data:
+        examples.extend(iter_jsonl_examples(path))
+    model = train_classifier(examples, args.output)
+    print(f"训练样本 {len(examples)} 条，特征维度 {len(model.vectorizer.vocabulary)}，已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
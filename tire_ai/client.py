@@ -0,0 +1,117 @@
+"""文本优化 API 的轻量客户端（仅依赖标准库）。
+
+服务地址为 http://host:port，或 unix:/path/to.sock（本机 Unix 套接字，见 python -m tire_ai.api --uds）。
+"""
+
+import http.client
+import json
+import os
+import socket
+import urllib.parse
+
+DEFAULT_API_URL = os.environ.get("TIRE_AI_API_URL", "http://localhost:8000")
+
+
+class ApiError(RuntimeError):
+    pass
+
+
+class ServiceUnavailable(ApiError):
+    """连接失败或服务返回 503，可以换一个副本重试。"""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.unix_path)
+        self.sock = sock
+
+
+def _connection(base_url, timeout):
+    if base_url.startswith("unix:"):
+        return _UnixHTTPConnection(base_url[len("unix:"):], timeout), ""
+    parsed = urllib.parse.urlsplit(base_url)
+    cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    return cls(parsed.netloc, timeout=timeout), parsed.path.rstrip("/")
+
+
+def _open(base_url, method, path, payload=None, timeout=300):
+    """发送请求，返回 (连接, 响应)；调用方读完响应后关闭连接。"""
+    base_url = base_url or DEFAULT_API_URL
+    connection, prefix = _connection(base_url, timeout)
+    body = None if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    try:
+        connection.request(method, prefix + path, body=body, headers=headers)
+        response = connection.getresponse()
+    except socket.timeout as exc:
+        connection.close()
+        raise ApiError(f"API服务 {base_url} 响应超时") from exc
+    except OSError as exc:
+        connection.close()
+        raise ServiceUnavailable(f"无法连接API服务 {base_url}: {exc}") from exc
+    if response.status >= 400:
+        detail = response.read().decode("utf-8", "replace")
+        connection.close()
+        error = ServiceUnavailable if response.status == 503 else ApiError
+        raise error(f"API返回错误 {response.status}: {detail}")
+    return connection, response
+
+
+def request_json(base_url, method, path, payload=None, timeout=300):
+    connection, response = _open(base_url, method, path, payload, timeout)
+    try:
+        return json.loads(response.read().decode("utf-8"))
+    except socket.timeout as exc:
+        raise ApiError(f"API服务 {base_url} 响应超时") from exc
+    except OSError as exc:
+        raise ServiceUnavailable(f"API服务 {base_url} 连接中断: {exc}") from exc
+    finally:
+        connection.close()
+
+
+def iter_events(base_url, path, payload, timeout=300):
+    """逐条返回 Server-Sent Events 的 (event, data)；未指定事件名时为 "delta"。"""
+    connection, response = _open(base_url, "POST", path, payload, timeout)
+    try:
+        event = "delta"
+        for raw in response:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):].strip())
+                event = "delta"
+    except socket.timeout as exc:
+        raise ApiError(f"API服务 {base_url} 响应超时") from exc
+    except OSError as exc:
+        raise ServiceUnavailable(f"API服务 {base_url} 连接中断: {exc}") from exc
+    finally:
+        connection.close()
+
+
+def health(base_url=None, timeout=5):
+    return request_json(base_url, "GET", "/health", timeout=timeout)
+
+
+def optimize_text(text, instruction_type="分类型", base_url=None, timeout=300):
+    return request_json(
+        base_url, "POST", "/api/v1/text-optimization", {"text": text, "instruction_type": instruction_type}, timeout
+    )
+
+
+def optimize_texts(documents, base_url=None, timeout=600):
+    """documents: [(text, instruction_type), ...]"""
+    payload = {"documents": [{"text": t, "instruction_type": i} for t, i in documents]}
+    return request_json(base_url, "POST", "/api/v1/text-optimization/batch", payload, timeout)["results"]
+
+
+def stream_optimize_text(text, instruction_type="分类型", base_url=None, timeout=300):
+    """逐段返回 (event, data)；event 为 "delta"、"done" 或 "error"。"""
+    payload = {"text": text, "instruction_type": instruction_type}
+    return iter_events(base_url, "/api/v1/text-optimization/stream", payload, timeout)
@@ -0,0 +1,145 @@
+"""运行配置，统一从环境变量读取，便于在桌面版与服务器部署之间切换。"""
+
+import os
+from dataclasses import dataclass, field
+
+# 默认路径与 Module 4 的训练输出保持一致
+DEFAULT_BASE_MODEL = "THUDM/chatglm3-6b"
+DEFAULT_ADAPTER_PATH = "./outputs/chatglm3-6b-tire-lora"
+DEFAULT_ADAPTERS_DIR = "./outputs/adapters"
+
+
+def _env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class EngineConfig:
+    # 基座模型：可以是 HuggingFace 模型名，也可以是本地目录（例如 CPU 测试用的小模型）
+    base_model: str = DEFAULT_BASE_MODEL
+    # LoRA 适配器目录，不存在时仅加载基座模型
+    adapter_path: str = DEFAULT_ADAPTER_PATH
+    # 按类别/Instruction 类型训练的命名适配器目录，以及同时挂载的数量上限
+    adapters_dir: str = DEFAULT_ADAPTERS_DIR
+    max_adapters: int = 4
+    # auto / cpu / cuda / cuda:0 ...
+    device: str = "auto"
+    # auto / float32 / float16 / bfloat16
+    dtype: str = "auto"
+    trust_remote_code: bool = True
+    max_new_tokens: int = 512
+    # none / int8 / int4：CPU 量化推理，加载时先合并 LoRA 再量化
+    quantization: str = "none"
+    # 检索相似的已审核案例作为 few-shot 示例注入提示词，0 表示不注入
+    few_shot: int = 0
+    # 复用 Instruction 模板等固定前缀的 KV 缓存，跳过这部分预填充（仅支持 llama 结构的模型）
+    prefix_cache: bool = True
+    prefix_cache_mb: float = 512.0
+    # none / prompt_lookup / draft：推测解码，仅用于单条贪心生成（仅支持 llama 结构的模型）
+    speculative: str = "none"
+    # draft 方式使用的小模型，需与基座模型共用分词器
+    draft_model: str = ""
+    speculative_tokens: int = 8
+    # 生成前后用确定性规则规范化单位、展开载重指数/速度级别，并校验输出数值（见 rules.py）
+    rules: bool = True
+    # 模块6按句增量优化：再次提交修改后的文档时，只重新生成有变化的句子及其相邻句子；
+    # 默认关闭，模块6按整篇流式生成
+    incremental: bool = False
+    incremental_context: int = 1
+    # 长文档模式：每块字数上限、与前一块重叠的上下文字数、每批生成的块数
+    chunk_chars: int = 500
+    chunk_overlap: int = 100
+    chunk_batch_size: int = 4
+    # 拆分部署时的模型服务地址（逗号分隔，http://host:port 或 unix:/path.sock）；
+    # 设置后本进程不加载模型，生成请求在各副本间负载均衡
+    model_server: str = ""
+    generation_kwargs: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            base_model=os.environ.get("TIRE_AI_BASE_MODEL", DEFAULT_BASE_MODEL),
+            adapter_path=os.environ.get("TIRE_AI_ADAPTER", DEFAULT_ADAPTER_PATH),
+            adapters_dir=os.environ.get("TIRE_AI_ADAPTERS_DIR", DEFAULT_ADAPTERS_DIR),
+            max_adapters=int(os.environ.get("TIRE_AI_MAX_ADAPTERS", "4")),
+            device=os.environ.get("TIRE_AI_DEVICE", "auto"),
+            dtype=os.environ.get("TIRE_AI_DTYPE", "auto"),
+            trust_remote_code=_env_flag("TIRE_AI_TRUST_REMOTE_CODE", True),
+            max_new_tokens=int(os.environ.get("TIRE_AI_MAX_NEW_TOKENS", "512")),
+            quantization=os.environ.get("TIRE_AI_QUANTIZATION", "none").strip().lower(),
+            few_shot=int(os.environ.get("TIRE_AI_FEW_SHOT", "0")),
+            prefix_cache=_env_flag("TIRE_AI_PREFIX_CACHE", True),
+            prefix_cache_mb=float(os.environ.get("TIRE_AI_PREFIX_CACHE_MB", "512")),
+            speculative=os.environ.get("TIRE_AI_SPECULATIVE", "none").strip().lower(),
+            draft_model=os.environ.get("TIRE_AI_DRAFT_MODEL", ""),
+            speculative_tokens=int(os.environ.get("TIRE_AI_SPECULATIVE_TOKENS", "8")),
+            rules=_env_flag("TIRE_AI_RULES", True),
+            incremental=_env_flag("TIRE_AI_INCREMENTAL", False),
+            incremental_context=int(os.environ.get("TIRE_AI_INCREMENTAL_CONTEXT", "1")),
+            chunk_chars=int(os.environ.get("TIRE_AI_CHUNK_CHARS", "500")),
+            chunk_overlap=int(os.environ.get("TIRE_AI_CHUNK_OVERLAP", "100")),
+            chunk_batch_size=int(os.environ.get("TIRE_AI_CHUNK_BATCH_SIZE", "4")),
+            model_server=os.environ.get("TIRE_AI_MODEL_SERVER", "").strip(),
+        )
+
+
+@dataclass
+class ServerConfig:
+    host: str = "0.0.0.0"
+    port: int = 8000
+    # 动态批处理：单批最大请求数与最长等待时间
+    max_batch_size: int = 8
+    max_wait_ms: float = 10.0
+    # /batch 接口单次允许提交的最大文档数
+    max_documents_per_request: int = 1000
+    # 语音转写接口单个音频文件的大小上限
+    max_audio_mb: int = 200
+    # 允许跨域调用的来源，video_simple.html 从本地文件打开时来源为 null
+    cors_origins: list = field(default_factory=lambda: ["*"])
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            host=os.environ.get("TIRE_AI_API_HOST", "0.0.0.0"),
+            port=int(os.environ.get("TIRE_AI_API_PORT", "8000")),
+            max_batch_size=int(os.environ.get("TIRE_AI_MAX_BATCH_SIZE", "8")),
+            max_wait_ms=float(os.environ.get("TIRE_AI_MAX_WAIT_MS", "10")),
+            max_documents_per_request=int(os.environ.get("TIRE_AI_MAX_BATCH_DOCUMENTS", "1000")),
+            max_audio_mb=int(os.environ.get("TIRE_AI_MAX_AUDIO_MB", "200")),
+            cors_origins=[o.strip() for o in os.environ.get("TIRE_AI_CORS_ORIGINS", "*").split(",") if o.strip()],
+        )
+
+
+@dataclass
+class LauncherConfig:
+    # Streamlit 前端进程数，各占一个端口（frontend_port 起依次递增）
+    frontends: int = 2
+    frontend_port: int = 8501
+    # 模型服务副本数：数字或 auto（按可用内存估算）
+    replicas: str = "auto"
+    max_replicas: int = 4
+    # http：本机端口（server_port 起依次递增）；unix：Unix 套接字（仅 Linux/macOS）
+    transport: str = "http"
+    server_port: int = 8100
+    # Unix 套接字与各进程日志所在目录
+    run_dir: str = "./outputs/run"
+    # 健康检查间隔与判定失败前允许的连续失败次数
+    health_interval: float = 5.0
+    max_health_failures: int = 3
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            frontends=int(os.environ.get("TIRE_AI_FRONTENDS", "2")),
+            frontend_port=int(os.environ.get("TIRE_AI_FRONTEND_PORT", "8501")),
+            replicas=os.environ.get("TIRE_AI_MODEL_REPLICAS", "auto").strip().lower(),
+            max_replicas=int(os.environ.get("TIRE_AI_MAX_MODEL_REPLICAS", "4")),
+            transport=os.environ.get("TIRE_AI_MODEL_SERVER_TRANSPORT", "http").strip().lower(),
+            server_port=int(os.environ.get("TIRE_AI_MODEL_SERVER_PORT", "8100")),
+            run_dir=os.environ.get("TIRE_AI_RUN_DIR", "./outputs/run"),
+            health_interval=float(os.environ.get("TIRE_AI_HEALTH_INTERVAL", "5")),
+            max_health_failures=int(os.environ.get("TIRE_AI_MAX_HEALTH_FAILURES", "3")),
+        )
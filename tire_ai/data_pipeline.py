@@ -0,0 +1,218 @@
+"""数据准备流水线：流式读取 → 并行清洗/单位规范化 → 去重 → 分片写出训练/验证/测试集。
+
+整个流程基于生成器，内存占用与语料规模无关，可处理百万级文档归档：
+    python -m tire_ai.data_pipeline corpus/*.jsonl corpus/*.csv --output ./data/splits --workers 8
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+from multiprocessing import Pool
+
+from .prompts import normalize_instruction_type
+from .rules import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# 默认比例与模块2中的 8000/2000/1000 划分一致
+DEFAULT_SPLIT_RATIOS = (("train", 8), ("val", 2), ("test", 1))
+DEFAULT_SPLITS_DIR = "./data/splits"
+
+_CONTROL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u200b-\u200f\ufeff]")
+_SPACES = re.compile(r"[ \t　]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# 全角数字与符号统一为半角
+_FULLWIDTH = str.maketrans("０１２３４５６７８９％．", "0123456789%.")
+
+_LABEL_ALIASES = {
+    "分类": "分类型",
+    "classification": "分类型",
+    "closed": "分类型",
+    "开放": "开放型",
+    "open": "开放型",
+}
+
+
+def iter_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("%s:%d 不是合法的JSON，已跳过", path, line_no)
+
+
+def iter_csv(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def iter_records(paths):
+    """按文件逐行惰性读取 JSONL/CSV 语料。"""
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if path.endswith((".jsonl", ".json")):
+                yield from iter_jsonl(path)
+            elif path.endswith(".csv"):
+                yield from iter_csv(path)
+            else:
+                logger.warning("不支持的文件类型：%s", path)
+
+
+def clean_text(text):
+    text = _CONTROL_CHARS.sub("", text or "")
+    text = text.translate(_FULLWIDTH).replace("\r\n", "\n").replace("\r", "\n")
+    text = _SPACES.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    # 单位规范化与推理时相同（rules.normalize_text），"度"只在紧挨温度词时换成℃，硬度、角度、电量保持不变
+    return normalize_text(text).strip()
+
+
+def normalize_label(label):
+    label = (label or "").strip()
+    label = _LABEL_ALIASES.get(label.lower(), label)
+    return normalize_instruction_type(label) if label else ""
+
+
+def clean_record(record):
+    """清洗单条记录；缺少原始文本时返回 None。在工作进程中执行。"""
+    original = clean_text(record.get("original_text") or record.get("text") or "")
+    if not original:
+        return None
+    cleaned = {
+        "original_text": original,
+        "optimized_text": clean_text(record.get("optimized_text") or ""),
+        "instruction_type": normalize_label(record.get("instruction_type")),
+        "category": (record.get("category") or "").strip(),
+    }
+    if record.get("title"):
+        cleaned["title"] = clean_text(record["title"])
+    return cleaned
+
+
+def record_digest(record):
+    # 以规范化后的原文+优化文本去重；64位整数摘要，200万条约占100MB
+    key = record["original_text"] + "\x1f" + record["optimized_text"]
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def assign_split(digest, ratios=DEFAULT_SPLIT_RATIOS):
+    # 按内容哈希确定划分，重复运行和增量追加时结果稳定
+    total = sum(w for _, w in ratios)
+    bucket = digest % total
+    for name, weight in ratios:
+        if bucket < weight:
+            return name
+        bucket -= weight
+    return ratios[-1][0]
+
+
+class ShardWriter:
+    """按条数滚动写出 JSONL 分片：{split}-00000.jsonl, {split}-00001.jsonl ..."""
+
+    def __init__(self, output_dir, split, shard_size):
+        self.output_dir = output_dir
+        self.split = split
+        self.shard_size = shard_size
+        self.shard_index = 0
+        self.count = 0
+        self._in_shard = 0
+        self._file = None
+
+    def write(self, record):
+        if self._file is None or self._in_shard >= self.shard_size:
+            self._roll()
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._in_shard += 1
+        self.count += 1
+
+    def _roll(self):
+        if self._file is not None:
+            self._file.close()
+            self.shard_index += 1
+        path = os.path.join(self.output_dir, f"{self.split}-{self.shard_index:05d}.jsonl")
+        self._file = open(path, "w", encoding="utf-8")
+        self._in_shard = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def run_pipeline(paths, output_dir, workers=None, shard_size=50000, chunksize=256,
+                 ratios=DEFAULT_SPLIT_RATIOS, progress=None):
+    """返回各划分的条数与去重/丢弃统计。``progress`` 回调每处理 10000 条调用一次。"""
+    os.makedirs(output_dir, exist_ok=True)
+    writers = {name: ShardWriter(output_dir, name, shard_size) for name, _ in ratios}
+    seen = set()
+    stats = {"read": 0, "dropped": 0, "duplicates": 0}
+    workers = workers or os.cpu_count() or 1
+    try:
+        with Pool(processes=workers) as pool:
+            # imap 保持惰性：输入按块分发给工作进程，结果按顺序流回
+            for cleaned in pool.imap(clean_record, iter_records(paths), chunksize=chunksize):
+                stats["read"] += 1
+                if progress is not None and stats["read"] % 10000 == 0:
+                    progress(dict(stats))
+                if cleaned is None:
+                    stats["dropped"] += 1
+                    continue
+                digest = record_digest(cleaned)
+                if digest in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(digest)
+                writers[assign_split(digest, ratios)].write(cleaned)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    stats.update({name: writer.count for name, writer in writers.items()})
+    with open(os.path.join(output_dir, "stats.json"), "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    return stats
+
+
+def load_split_stats(output_dir=DEFAULT_SPLITS_DIR):
+    path = os.path.join(output_dir, "stats.json")
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_split(output_dir, split):
+    """逐条读取某个划分的所有分片。"""
+    for path in sorted(glob.glob(os.path.join(output_dir, f"{split}-*.jsonl"))):
+        yield from iter_jsonl(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="轮胎制造业技术文档数据准备流水线")
+    parser.add_argument("inputs", nargs="+", help="JSONL/CSV 文件或通配符")
+    parser.add_argument("--output", default=DEFAULT_SPLITS_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    stats = run_pipeline(
+        args.inputs,
+        args.output,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        progress=lambda s: logger.info("已处理 %d 条", s["read"]),
+    )
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""文本向量化：无需模型的字符 n-gram 哈希向量，或用已加载的大模型做均值池化。
+
+两种实现都一次处理一批文本，返回按行 L2 归一化的 float32 矩阵，
+因此余弦相似度就是矩阵乘法（或逐行点积）。案例检索使用哈希向量（索引可持久化、与模型无关）；
+自动评估的语义相似度默认使用模型向量，见 make_embedder。
+"""
+
+import logging
+import os
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class HashingEmbedder:
+    """字符 1~3-gram 带符号哈希到固定维度，tf 取对数；结果在进程和机器之间稳定。"""
+
+    name = "char-ngram-hash"
+
+    def __init__(self, dim=1024, ngram_range=(1, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text):
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            for i in range(len(text) - n + 1):
+                # crc32 不受 PYTHONHASHSEED 影响，持久化的向量索引才能复用
+                yield zlib.crc32(text[i:i + n].encode("utf-8"))
+
+    def embed(self, texts):
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            feats = list(self._features(text))
+            hashes.extend(feats)
+            rows.extend([row] * len(feats))
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = (hashes % self.dim).astype(np.int64)
+        signs = np.where((hashes >> 31) & 1, -1.0, 1.0).astype(np.float32)
+        flat = np.bincount(rows * self.dim + cols, weights=signs, minlength=len(texts) * self.dim)
+        matrix = flat.reshape(len(texts), self.dim).astype(np.float32)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        return normalize_rows(matrix)
+
+
+class ModelEmbedder:
+    """用推理引擎中的模型取最后一层隐藏状态做均值池化，按批前向。"""
+
+    name = "model-mean-pool"
+
+    def __init__(self, engine, batch_size=16, max_length=512):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+    def embed(self, texts):
+        import torch
+
+        engine = self.engine.load()
+        tokenizer = engine.tokenizer
+        chunks = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            encoded = tokenizer(
+                batch, padding=True, truncation=True, max_length=self.max_length, return_tensors="pt"
+            ).to(engine.device)
+            with engine.use_adapter(), torch.inference_mode():
+                # 只传模型需要的输入，部分分词器还会返回 token_type_ids
+                hidden = engine.model(
+                    input_ids=encoded["input_ids"], attention_mask=encoded["attention_mask"], output_hidden_states=True
+                ).hidden_states[-1]
+            # ChatGLM 的隐藏状态为 [seq, batch, hidden]
+            if hidden.shape[0] != encoded["input_ids"].shape[0]:
+                hidden = hidden.transpose(0, 1)
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1)
+            chunks.append(pooled.float().cpu().numpy())
+        if not chunks:
+            return np.zeros((0, 0), dtype=np.float32)
+        return normalize_rows(np.concatenate(chunks).astype(np.float32))
+
+
+EMBEDDER_KINDS = ("auto", "model", "hash")
+
+
+def make_embedder(kind=None, engine=None):
+    """按 kind（默认取 TIRE_AI_EVAL_EMBEDDER）选择向量化方式。
+
+    auto：用模型均值池化，引擎尚未加载时先加载；只有拆分部署（设置了 TIRE_AI_MODEL_SERVER，本进程不加载模型）时
+    退回字符 n-gram 哈希并记录警告；model：同 auto，但拆分部署时报错；hash：字符 n-gram 哈希，只反映字面重合。
+    """
+    from .config import EngineConfig
+    from .engine import TextOptimizationEngine, get_engine
+
+    kind = (kind or os.environ.get("TIRE_AI_EVAL_EMBEDDER", "auto")).strip().lower()
+    if kind not in EMBEDDER_KINDS:
+        raise ValueError(f"不支持的向量化方式：{kind}，可选 {', '.join(EMBEDDER_KINDS)}")
+    if kind == "hash":
+        return HashingEmbedder()
+    if engine is None and not EngineConfig.from_env().model_server:
+        engine = get_engine()
+    if isinstance(engine, TextOptimizationEngine):
+        return ModelEmbedder(engine)
+    if kind == "model":
+        raise ValueError("模型服务模式下本进程没有加载模型，无法用模型计算语义相似度")
+    logger.warning("模型服务模式下本进程没有加载模型，语义相似度改用字符 n-gram 哈希向量（只反映字面重合）")
+    return HashingEmbedder()
+
+
+def cosine_similarity_pairs(embedder, texts_a, texts_b):
+    """逐对余弦相似度：两侧各编码一次，再做一次逐行点积。"""
+    a = embedder.embed(list(texts_a))
+    b = embedder.embed(list(texts_b))
+    return np.einsum("ij,ij->i", a, b)
@@ -0,0 +1,856 @@
+"""文本优化推理引擎：基座模型 + LoRA 适配器，每个进程只加载一次。"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from . import metrics
+from .adapters import DEFAULT_ADAPTER, AdapterPool, discover_adapters, has_adapter
+from .cache import PrefixCache, directory_fingerprint, get_result_cache, make_key
+from .config import EngineConfig
+from .prompts import build_prompt, encode_prompt, normalize_instruction_type, prompt_prefix
+from .quantization import model_memory_mb, quantize_model
+from .rules import check_numbers, normalize_text
+from .speculative import (
+    SPECULATIVE_MODES,
+    DraftModelDrafter,
+    PromptLookupDrafter,
+    load_draft_model,
+    speculative_generate,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OptimizationResult:
+    optimized_text: str
+    instruction_type: str
+    prompt_tokens: int = 0
+    generated_tokens: int = 0
+    elapsed_seconds: float = 0.0
+    cached: bool = False
+    # 作为 few-shot 示例注入提示词的案例 case_key
+    examples: list = field(default_factory=list)
+    # 生成所用的 LoRA 适配器（路由名）
+    adapter: str = DEFAULT_ADAPTER
+    # 规则校验发现的数值问题（缺失、新增或被改动的数值），为空表示一致
+    number_issues: list = field(default_factory=list)
+
+    @property
+    def tokens_per_second(self):
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.generated_tokens / self.elapsed_seconds
+
+    def to_dict(self):
+        return {
+            "optimized_text": self.optimized_text,
+            "instruction_type": self.instruction_type,
+            "prompt_tokens": self.prompt_tokens,
+            "generated_tokens": self.generated_tokens,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "tokens_per_second": round(self.tokens_per_second, 2),
+            "cached": self.cached,
+            "examples": self.examples,
+            "adapter": self.adapter,
+            "number_issues": self.number_issues,
+        }
+
+    @classmethod
+    def from_cache(cls, value):
+        return cls(
+            optimized_text=value["optimized_text"],
+            instruction_type=value["instruction_type"],
+            prompt_tokens=value.get("prompt_tokens", 0),
+            generated_tokens=value.get("generated_tokens", 0),
+            cached=True,
+            examples=value.get("examples", []),
+            adapter=value.get("adapter", DEFAULT_ADAPTER),
+            number_issues=value.get("number_issues", []),
+        )
+
+
+@dataclass
+class LoadStats:
+    load_seconds: float = 0.0
+    device: str = ""
+    dtype: str = ""
+    parameters: int = 0
+    param_memory_mb: float = 0.0
+    rss_mb: float = 0.0
+    gpu_memory_mb: float = 0.0
+    adapter_loaded: bool = False
+    extra: dict = field(default_factory=dict)
+
+
+def process_memory_mb():
+    # psutil 为可选依赖；缺失时在类 Unix 系统上退回 resource 模块（峰值 RSS）
+    try:
+        import psutil
+
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 单位为字节，Linux 为 KB
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return 0.0
+
+
+class TokenStream:
+    """流式生成句柄：迭代得到增量文本，结束后可读取首token延迟与吞吐量。"""
+
+    def __init__(self, streamer, thread, instruction_type, prompt_tokens, start, on_finish):
+        self._streamer = streamer
+        self._thread = thread
+        self._on_finish = on_finish
+        self._finished = False
+        self.instruction_type = instruction_type
+        self.prompt_tokens = prompt_tokens
+        self.start_time = start
+        self.cached = False
+        self.error = None
+        self.examples = []
+        self.adapter = DEFAULT_ADAPTER
+        # 生成结束后对完整文本的后处理，返回 (文本, 数值问题)
+        self.postprocess = None
+        self.text = ""
+        self.elapsed_seconds = 0.0
+        self._stop = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._stop.is_set()
+
+    def cancel(self):
+        """在下一个解码步停止生成；已生成的文本保留，但不写入结果缓存。"""
+        self._stop.set()
+
+    def __iter__(self):
+        if self._finished:
+            return
+        for delta in self._streamer:
+            if delta:
+                self.text += delta
+                yield delta
+        self._thread.join()
+        self.elapsed_seconds = time.perf_counter() - self.start_time
+        if not self._finished:
+            self._finished = True
+            self._on_finish(self)
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def generated_tokens(self):
+        return self._streamer.token_count
+
+    @property
+    def time_to_first_token(self):
+        if self._streamer.first_token_time is None:
+            return None
+        return self._streamer.first_token_time - self.start_time
+
+    @property
+    def tokens_per_second(self):
+        # 按解码阶段计算，不含首token之前的预填充时间
+        first = self.time_to_first_token
+        if first is None or self.generated_tokens < 2:
+            return 0.0
+        decode_seconds = self.elapsed_seconds - first
+        return (self.generated_tokens - 1) / decode_seconds if decode_seconds > 0 else 0.0
+
+    def result(self):
+        for _ in self:
+            pass
+        text, issues = self.text.strip(), []
+        if self.postprocess is not None:
+            text, issues = self.postprocess(text)
+        return OptimizationResult(
+            optimized_text=text,
+            instruction_type=self.instruction_type,
+            prompt_tokens=self.prompt_tokens,
+            generated_tokens=self.generated_tokens,
+            elapsed_seconds=self.elapsed_seconds,
+            examples=self.examples,
+            adapter=self.adapter,
+            number_issues=issues,
+        )
+
+
+class CachedTokenStream:
+    """命中缓存时的流式句柄，一次性返回完整结果，接口与 TokenStream 一致。"""
+
+    cached = True
+    error = None
+    elapsed_seconds = 0.0
+    time_to_first_token = 0.0
+    tokens_per_second = 0.0
+
+    def __init__(self, result):
+        self._result = result
+        self.instruction_type = result.instruction_type
+        self.prompt_tokens = result.prompt_tokens
+        self.generated_tokens = result.generated_tokens
+        self.examples = result.examples
+        self.adapter = result.adapter
+        self.text = result.optimized_text
+
+    def __iter__(self):
+        yield self.text
+
+    def cancel(self):
+        pass
+
+    def result(self):
+        return self._result
+
+
+def _make_streamer(tokenizer):
+    from transformers import TextIteratorStreamer
+
+    class CountingStreamer(TextIteratorStreamer):
+        # 在解码文本之外记录生成的token数与首token时间
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.token_count = 0
+            self.first_token_time = None
+
+        def put(self, value):
+            if not (self.skip_prompt and self.next_tokens_are_prompt):
+                if self.first_token_time is None:
+                    self.first_token_time = time.perf_counter()
+                self.token_count += int(value.numel())
+            super().put(value)
+
+    return CountingStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+
+def _make_stopping_criteria(stop_event):
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class CancelCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return stop_event.is_set()
+
+    return StoppingCriteriaList([CancelCriteria()])
+
+
+# 前缀 KV 缓存与推测解码要求模型在给定 past_key_values 时只计算其后的输入、按缓存长度推算位置编码；
+# ChatGLM3 的自定义实现此时只取最后一个 token，无法复用 KV 缓存
+KV_REUSE_MODEL_TYPES = ("llama", "mistral", "mixtral", "qwen2")
+
+# 推测解码按贪心规则验证候选 token，带其他 logits 处理的生成参数交给 generate
+_SPECULATIVE_KWARGS = {"max_new_tokens", "do_sample", "num_beams", "pad_token_id", "eos_token_id"}
+_LOGITS_PROCESSOR_DEFAULTS = {"repetition_penalty": 1.0, "no_repeat_ngram_size": 0, "min_length": 0,
+                              "min_new_tokens": None}
+
+
+@dataclass
+class PrefixEntry:
+    token_ids: list
+    past_key_values: tuple
+    prefill_seconds: float
+    nbytes: int
+
+
+def _resolve_device(torch, device):
+    if device != "auto":
+        return device
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _resolve_dtype(torch, dtype, device):
+    if dtype == "auto":
+        # CPU 上半精度算子支持不全，默认使用 float32
+        return torch.float16 if device.startswith("cuda") else torch.float32
+    return getattr(torch, dtype)
+
+
+class TextOptimizationEngine:
+    def __init__(self, config=None, cache=None):
+        self.config = config or EngineConfig.from_env()
+        # 结果缓存为可选组件，None 表示不缓存
+        self.cache = cache
+        self.model_version = ""
+        self._adapter_checked_at = 0.0
+        self.model = None
+        self.tokenizer = None
+        self.device = None
+        # 按类别/Instruction 类型路由的命名适配器，模型不是 PeftModel 或已量化时为 None
+        self.adapters = None
+        self.stats = LoadStats()
+        self._load_lock = threading.Lock()
+        # 同一模型的 generate 串行执行，并发请求由上层的批处理调度合并
+        self._generate_lock = threading.Lock()
+        self.prefix_cache = PrefixCache(self.config.prefix_cache_mb)
+        self._prefix_supported = False
+        # 推测解码方式与草稿来源，通过 set_speculative_mode 切换
+        self.speculative = "none"
+        self._speculative_supported = False
+        self._drafter = None
+        self._draft_model = None
+        self._speculative_stats = dict.fromkeys(("generations", "drafted", "accepted", "forwards", "tokens"), 0)
+        # 最近的生成记录：(生成token数, 耗时秒, 首token延迟秒或None)
+        self._recent = deque(maxlen=50)
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def load(self):
+        with self._load_lock:
+            if self.loaded:
+                return self
+            self._load()
+        return self
+
+    def _load(self):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        cfg = self.config
+        start = time.perf_counter()
+        quantized = cfg.quantization not in ("", "none")
+        # 量化推理只在 CPU 上进行，量化前的权重需为 float32
+        device = "cpu" if quantized else _resolve_device(torch, cfg.device)
+        dtype = torch.float32 if quantized else _resolve_dtype(torch, cfg.dtype, device)
+        logger.info("加载基座模型 %s (device=%s, dtype=%s)", cfg.base_model, device, dtype)
+
+        tokenizer = AutoTokenizer.from_pretrained(
+            cfg.base_model, trust_remote_code=cfg.trust_remote_code
+        )
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        # 批量生成时需要左侧填充
+        tokenizer.padding_side = "left"
+
+        model = AutoModelForCausalLM.from_pretrained(
+            cfg.base_model,
+            torch_dtype=dtype,
+            trust_remote_code=cfg.trust_remote_code,
+            low_cpu_mem_usage=True,
+        )
+
+        adapter_loaded = False
+        # 量化前会把 LoRA 合并进权重，量化模式下只使用默认适配器
+        named_adapters = {} if quantized else discover_adapters(cfg.adapters_dir)
+        if has_adapter(cfg.adapter_path):
+            from peft import PeftModel
+
+            logger.info("加载LoRA适配器 %s", cfg.adapter_path)
+            model = PeftModel.from_pretrained(model, cfg.adapter_path)
+            adapter_loaded = True
+        elif named_adapters:
+            from peft import PeftModel
+
+            # 多适配器切换需要 PeftModel：以第一个命名适配器占位创建，默认路由关闭 LoRA 层即为基座模型
+            logger.warning("未找到LoRA适配器 %s，默认路由使用基座模型", cfg.adapter_path)
+            model = PeftModel.from_pretrained(model, next(iter(named_adapters.values())))
+        else:
+            logger.warning("未找到LoRA适配器 %s，仅使用基座模型", cfg.adapter_path)
+
+        # 参数量在量化前统计，量化层的打包权重不再以参数形式出现
+        parameters = sum(p.numel() for p in model.parameters())
+        if quantized:
+            logger.info("合并LoRA并进行%s量化", cfg.quantization.upper())
+            model = quantize_model(model, cfg.quantization)
+
+        model.to(device)
+        model.eval()
+
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.adapters = None
+        if not quantized and (adapter_loaded or named_adapters):
+            # 模型是 PeftModel 时才能挂载其他适配器；之后新训练的适配器也可以直接使用
+            self.adapters = AdapterPool(model, cfg.adapters_dir, cfg.max_adapters, has_default=adapter_loaded)
+        model_type = getattr(getattr(model, "config", None), "model_type", "")
+        self._prefix_supported = (
+            cfg.prefix_cache
+            and model_type in KV_REUSE_MODEL_TYPES
+            and not hasattr(tokenizer, "build_chat_input")
+        )
+        self._speculative_supported = (
+            model_type in KV_REUSE_MODEL_TYPES and not hasattr(tokenizer, "build_chat_input")
+        )
+        self._set_speculative(cfg.speculative)
+        # 前缀的 KV 张量只对加载时的权重有效
+        self.prefix_cache.clear()
+        adapter_version = directory_fingerprint(cfg.adapter_path) if adapter_loaded else ""
+        self.model_version = f"{cfg.base_model}@{adapter_version or 'base'}"
+        if quantized:
+            # 量化后的输出与浮点模型不同，不能共用缓存结果
+            self.model_version += f"#{cfg.quantization}"
+        self._check_adapter_version(force=True)
+
+        gpu_mb = 0.0
+        if device.startswith("cuda"):
+            gpu_mb = torch.cuda.memory_allocated(device) / 1024 ** 2
+        self.stats = LoadStats(
+            load_seconds=time.perf_counter() - start,
+            device=device,
+            dtype=str(dtype).replace("torch.", ""),
+            parameters=parameters,
+            param_memory_mb=model_memory_mb(model),
+            rss_mb=process_memory_mb(),
+            gpu_memory_mb=gpu_mb,
+            adapter_loaded=adapter_loaded,
+        )
+        metrics.observe("model_load", self.stats.load_seconds)
+        logger.info("模型加载完成，用时 %.1fs", self.stats.load_seconds)
+
+    def info(self):
+        s = self.stats
+        return {
+            "base_model": self.config.base_model,
+            "adapter_path": self.config.adapter_path if s.adapter_loaded else None,
+            "loaded": self.loaded,
+            "device": s.device,
+            "dtype": s.dtype,
+            "quantization": self.config.quantization,
+            "parameters": s.parameters,
+            "load_seconds": round(s.load_seconds, 2),
+            "param_memory_mb": round(s.param_memory_mb, 1),
+            "rss_mb": round(s.rss_mb, 1),
+            "gpu_memory_mb": round(s.gpu_memory_mb, 1),
+            "prefix_cache": self._prefix_supported,
+            "speculative": self.speculative if self._speculative_supported else "none",
+            "rules": self.config.rules,
+            "adapters": self.adapters.stats() if self.adapters is not None else None,
+        }
+
+    def set_speculative_mode(self, mode):
+        """切换推测解码方式（none / prompt_lookup / draft），draft 方式首次使用时加载草稿模型。"""
+        self.load()
+        with self._generate_lock:
+            self._set_speculative(mode)
+
+    def _set_speculative(self, mode):
+        mode = (mode or "none").strip().lower()
+        if mode not in SPECULATIVE_MODES:
+            raise ValueError(f"不支持的推测解码方式：{mode}（可选 {'/'.join(SPECULATIVE_MODES)}）")
+        if mode != "none" and not self._speculative_supported:
+            logger.warning("当前模型不支持推测解码，使用普通解码")
+        if mode == "draft":
+            if not self.config.draft_model:
+                raise ValueError("draft 方式需要设置草稿模型（TIRE_AI_DRAFT_MODEL）")
+            if self._draft_model is None:
+                logger.info("加载草稿模型 %s", self.config.draft_model)
+                self._draft_model = load_draft_model(
+                    self.config.draft_model,
+                    self.device,
+                    next(self.model.parameters()).dtype,
+                    self.tokenizer,
+                    self.config.trust_remote_code,
+                )
+            self._drafter = DraftModelDrafter(self._draft_model, self.device)
+        elif mode == "prompt_lookup":
+            self._drafter = PromptLookupDrafter()
+        else:
+            self._drafter = None
+        self.speculative = mode
+
+    def _speculative_applicable(self, batch_size, kwargs):
+        # 只在单条贪心生成时启用：批量生成各行接受的候选数不同，采样与束搜索的验证规则不同
+        if self._drafter is None or not self._speculative_supported or batch_size != 1:
+            return False
+        if kwargs.get("do_sample") or kwargs.get("num_beams", 1) > 1 or set(kwargs) - _SPECULATIVE_KWARGS:
+            return False
+        config = self.model.generation_config
+        return all(
+            getattr(config, name, None) in (None, default) for name, default in _LOGITS_PROCESSOR_DEFAULTS.items()
+        )
+
+    def _speculative_generate(self, input_ids, past, kwargs, stop_event=None, streamer=None):
+        """单条推测解码，需在 use_adapter 中调用；返回新生成的 token 列表。"""
+        eos = kwargs.get("eos_token_id", self.model.generation_config.eos_token_id)
+        eos = set(eos if isinstance(eos, (list, tuple)) else [eos]) - {None}
+        generated, stats = speculative_generate(
+            self.model, input_ids, past, self._drafter, self.config.speculative_tokens,
+            kwargs["max_new_tokens"], eos, stop_event, streamer,
+        )
+        stats["generations"] = 1
+        stats["tokens"] = len(generated)
+        for name, value in stats.items():
+            self._speculative_stats[name] += value
+        metrics.inc("speculative_drafted_tokens", stats["drafted"])
+        metrics.inc("speculative_accepted_tokens", stats["accepted"])
+        return generated
+
+    def speculative_stats(self):
+        """推测解码的累计接受率，以及平均每次主模型前向得到的 token 数（普通解码为1）。"""
+        s = dict(self._speculative_stats, mode=self.speculative if self._speculative_supported else "none")
+        s["acceptance_rate"] = s["accepted"] / s["drafted"] if s["drafted"] else 0.0
+        s["tokens_per_forward"] = s["tokens"] / s["forwards"] if s["forwards"] else 0.0
+        return s
+
+    def reset_speculative_stats(self):
+        self._speculative_stats = dict.fromkeys(self._speculative_stats, 0)
+
+    def _check_adapter_version(self, force=False):
+        # 保存新的 LoRA 检查点后适配器目录指纹变化，旧的缓存结果随之失效
+        if self.cache is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._adapter_checked_at < 10:
+            return
+        self._adapter_checked_at = now
+        self.cache.sync_version(directory_fingerprint(self.config.adapter_path))
+
+    def route(self, category=None, instruction_type=None):
+        """请求使用的适配器：先按案例类别、再按 Instruction 类型匹配命名适配器，否则为默认适配器。"""
+        if self.adapters is None:
+            return DEFAULT_ADAPTER
+        return self.adapters.route(category, instruction_type)
+
+    def version(self, adapter=DEFAULT_ADAPTER):
+        if adapter == DEFAULT_ADAPTER:
+            return self.model_version
+        return f"{self.config.base_model}@{adapter}:{self.adapters.version(adapter)}"
+
+    @contextmanager
+    def use_adapter(self, adapter=DEFAULT_ADAPTER):
+        """持有生成锁并激活指定适配器；模型的前向计算都应在其中进行。"""
+        with self._generate_lock:
+            if self.adapters is None:
+                yield
+            else:
+                with self.adapters.activate(adapter):
+                    yield
+
+    def label_probabilities(self, texts, labels):
+        """大模型对候选 Instruction 类型的概率 (N, C)，供分类器复核低置信度文档。"""
+        from .classifier import llm_label_probabilities
+
+        return llm_label_probabilities(self, texts, labels)
+
+    def _cache_key(self, text, instruction_type, kwargs, examples=None, adapter=DEFAULT_ADAPTER):
+        params = {k: v for k, v in kwargs.items() if k not in ("pad_token_id", "streamer")}
+        if examples:
+            # 示例不同则提示词不同；不带示例时保持原有缓存键
+            params["examples"] = [e["case_key"] for e in examples]
+        return make_key("optimize", text, instruction_type, self.version(adapter), params)
+
+    def _record(self, tokens, seconds, time_to_first_token=None):
+        self._recent.append((tokens, seconds, time_to_first_token))
+        metrics.observe("generation", seconds)
+        metrics.inc("generated_tokens", tokens)
+        if seconds > 0:
+            metrics.set_gauge("last_tokens_per_second", tokens / seconds)
+        if time_to_first_token is not None:
+            metrics.observe("time_to_first_token", time_to_first_token)
+
+    def generation_stats(self):
+        """最近若干次生成的实测吞吐量，供 Module 1 的性能指标面板展示。"""
+        recent = list(self._recent)
+        if not recent:
+            return None
+        tokens = sum(r[0] for r in recent)
+        seconds = sum(r[1] for r in recent)
+        ttfts = [r[2] for r in recent if r[2] is not None]
+        last_tokens, last_seconds, last_ttft = recent[-1]
+        return {
+            "samples": len(recent),
+            "tokens_per_second": tokens / seconds if seconds > 0 else 0.0,
+            "last_tokens_per_second": last_tokens / last_seconds if last_seconds > 0 else 0.0,
+            "time_to_first_token": sum(ttfts) / len(ttfts) if ttfts else None,
+            "last_time_to_first_token": last_ttft,
+        }
+
+    def _examples(self, text, instruction_type, few_shot):
+        k = self.config.few_shot if few_shot is None else few_shot
+        if k <= 0:
+            return []
+        from .retrieval import retrieve_examples
+
+        return retrieve_examples(text, k, instruction_type)
+
+    def _token_ids(self, prompt):
+        return encode_prompt(self.tokenizer, prompt)
+
+    def _encode(self, prompts, prefix=None, adapter=DEFAULT_ADAPTER):
+        """编码并左填充，返回 (input_ids, attention_mask, past_key_values)。
+
+        prefix 为所有提示词共用的前缀时复用它的 KV 缓存，past_key_values 为 None 表示完整预填充。
+        """
+        with metrics.timed("tokenization"):
+            ids = [self._token_ids(p) for p in prompts]
+            prefix_ids = self._token_ids(prefix) if prefix is not None and self._prefix_supported else None
+        # 前缀在边界处与后文合并成其他 token 时不能复用，退回完整预填充
+        if prefix_ids and all(len(x) > len(prefix_ids) and x[:len(prefix_ids)] == prefix_ids for x in ids):
+            return self._encode_with_prefix(ids, prefix, prefix_ids, adapter)
+        return (*self._pad(ids), None)
+
+    def _pad(self, ids, prefix_ids=()):
+        import torch
+
+        # [前缀][填充][各自的后文]：前缀位置对齐到缓存，填充放在中间由 attention_mask 屏蔽
+        n = len(prefix_ids)
+        width = n + max(len(x) - n for x in ids)
+        input_ids = torch.full((len(ids), width), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(ids), width), dtype=torch.long)
+        for row, seq in enumerate(ids):
+            input_ids[row, :n] = torch.tensor(seq[:n], dtype=torch.long)
+            attention_mask[row, :n] = 1
+            input_ids[row, width - len(seq) + n:] = torch.tensor(seq[n:], dtype=torch.long)
+            attention_mask[row, width - len(seq) + n:] = 1
+        return input_ids.to(self.device), attention_mask.to(self.device)
+
+    def _prefix_entry(self, prefix, prefix_ids, adapter):
+        import torch
+
+        # 前缀的 KV 张量与适配器有关，键中的版本区分适配器
+        version = self.version(adapter)
+        entry = self.prefix_cache.get(version, prefix)
+        if entry is not None:
+            return entry, True
+        start = time.perf_counter()
+        with self.use_adapter(adapter), torch.inference_mode():
+            output = self.model(input_ids=torch.tensor([prefix_ids], device=self.device), use_cache=True)
+        seconds = time.perf_counter() - start
+        metrics.observe("prefix_prefill", seconds)
+        past = tuple(tuple(layer) for layer in output.past_key_values)
+        entry = PrefixEntry(
+            token_ids=list(prefix_ids),
+            past_key_values=past,
+            prefill_seconds=seconds,
+            nbytes=sum(t.numel() * t.element_size() for layer in past for t in layer),
+        )
+        self.prefix_cache.put(version, prefix, entry)
+        return entry, False
+
+    def _encode_with_prefix(self, ids, prefix, prefix_ids, adapter):
+        entry, hit = self._prefix_entry(prefix, prefix_ids, adapter)
+        input_ids, attention_mask = self._pad(ids, prefix_ids)
+        batch = len(ids)
+        # 批内各行共用同一份前缀张量（expand 不复制内存）
+        past = tuple(
+            tuple(t.expand(batch, *t.shape[1:]) for t in layer) for layer in entry.past_key_values
+        )
+        if hit:
+            # 节省的预填充时间按单条前缀实测耗时估算
+            saved = entry.prefill_seconds * batch
+            self.prefix_cache.record_saving(len(prefix_ids) * batch, saved)
+            metrics.inc("prefix_tokens_saved", len(prefix_ids) * batch)
+            metrics.inc("prefill_seconds_saved", saved)
+        return input_ids, attention_mask, past
+
+    def _generation_kwargs(self, overrides):
+        kwargs = {
+            "max_new_tokens": self.config.max_new_tokens,
+            "do_sample": False,
+            "pad_token_id": self.tokenizer.pad_token_id,
+        }
+        kwargs.update(self.config.generation_kwargs)
+        kwargs.update(overrides)
+        return kwargs
+
+    def _postprocess(self, source, output):
+        """规则开启时规范化输出并与原文核对数值，返回 (文本, 数值问题)。"""
+        if not self.config.rules:
+            return output, []
+        output = normalize_text(output)
+        return output, check_numbers(source, output)
+
+    def _decode(self, token_ids):
+        eos = self.tokenizer.eos_token_id
+        pad = self.tokenizer.pad_token_id
+        ids = [t for t in token_ids if t not in (eos, pad)]
+        return self.tokenizer.decode(ids, skip_special_tokens=True).strip()
+
+    def optimize_batch(self, texts, instruction_types=None, use_cache=True, few_shot=None, categories=None,
+                       **generation_kwargs):
+        """few_shot 为注入的相似案例数，None 时使用配置 TIRE_AI_FEW_SHOT；categories 用于选择适配器。"""
+        self.load()
+        if instruction_types is None:
+            instruction_types = ["分类型"] * len(texts)
+        if categories is None:
+            categories = [None] * len(texts)
+        if self.config.rules:
+            # 规范化后的文本作为提示词和缓存键，"150度"与"150℃"命中同一条缓存
+            texts = [normalize_text(text) for text in texts]
+        types = [normalize_instruction_type(t) for t in instruction_types]
+        adapters = [self.route(c, t) for c, t in zip(categories, types)]
+        kwargs = self._generation_kwargs(generation_kwargs)
+        examples = [self._examples(text, t, few_shot) for text, t in zip(texts, types)]
+        results = [None] * len(texts)
+        keys = [None] * len(texts)
+        if use_cache and self.cache is not None:
+            self._check_adapter_version()
+            for i, (text, t) in enumerate(zip(texts, types)):
+                keys[i] = self._cache_key(text, t, kwargs, examples[i], adapters[i])
+                value = self.cache.get(keys[i])
+                if value is not None:
+                    results[i] = OptimizationResult.from_cache(value)
+
+        # 只对未命中缓存的文档执行生成；同一适配器的文档合成一批，不同适配器依次切换
+        pending = {}
+        for i, r in enumerate(results):
+            if r is None:
+                pending.setdefault(adapters[i], []).append(i)
+        for adapter, indices in pending.items():
+            generated = self._generate_batch(
+                [texts[i] for i in indices], [types[i] for i in indices], kwargs,
+                [examples[i] for i in indices], adapter,
+            )
+            for i, result in zip(indices, generated):
+                results[i] = result
+                if keys[i] is not None:
+                    self.cache.put(keys[i], result.to_dict())
+        return results
+
+    def _prompt_prefix(self, types, examples, kwargs):
+        """批内提示词共用的固定前缀；前缀不同或束搜索时返回 None（不复用前缀缓存）。"""
+        prefixes = {prompt_prefix(t, e) for t, e in zip(types, examples)}
+        if len(prefixes) != 1 or kwargs.get("num_beams", 1) > 1:
+            return None
+        return prefixes.pop()
+
+    def _generate_batch(self, texts, types, kwargs, examples=None, adapter=DEFAULT_ADAPTER):
+        import torch
+
+        examples = examples or [[] for _ in texts]
+        prompts = [build_prompt(text, t, e) for text, t, e in zip(texts, types, examples)]
+        input_ids, attention_mask, past = self._encode(
+            prompts, self._prompt_prefix(types, examples, kwargs), adapter
+        )
+
+        start = time.perf_counter()
+        with self.use_adapter(adapter), torch.inference_mode():
+            if self._speculative_applicable(len(prompts), kwargs):
+                generated = self._speculative_generate(input_ids, past, kwargs)
+                generated = torch.tensor([generated], dtype=torch.long, device=self.device)
+                output = torch.cat([input_ids, generated], dim=1)
+            else:
+                output = self.model.generate(
+                    input_ids=input_ids, attention_mask=attention_mask, past_key_values=past, **kwargs
+                )
+        elapsed = time.perf_counter() - start
+
+        prompt_width = input_ids.shape[1]
+        self._record(int((output[:, prompt_width:] != self.tokenizer.pad_token_id).sum()), elapsed)
+        results = []
+        for row, t in enumerate(types):
+            new_tokens = output[row, prompt_width:].tolist()
+            text, issues = self._postprocess(texts[row], self._decode(new_tokens))
+            generated = sum(1 for x in new_tokens if x != self.tokenizer.pad_token_id)
+            results.append(
+                OptimizationResult(
+                    optimized_text=text,
+                    instruction_type=t,
+                    prompt_tokens=int(attention_mask[row].sum()),
+                    generated_tokens=generated,
+                    elapsed_seconds=elapsed,
+                    examples=[e["case_key"] for e in examples[row]],
+                    adapter=adapter,
+                    number_issues=issues,
+                )
+            )
+        return results
+
+    def optimize(self, text, instruction_type="分类型", use_cache=True, few_shot=None, category=None,
+                 **generation_kwargs):
+        return self.optimize_batch(
+            [text], [instruction_type], use_cache, few_shot, [category], **generation_kwargs
+        )[0]
+
+    def stream(self, text, instruction_type="分类型", use_cache=True, few_shot=None, category=None,
+               **generation_kwargs):
+        """流式生成，返回可迭代的 TokenStream，每次迭代得到一段新增文本。"""
+        import torch
+
+        self.load()
+        instruction_type = normalize_instruction_type(instruction_type)
+        if self.config.rules:
+            text = normalize_text(text)
+        adapter = self.route(category, instruction_type)
+        kwargs = self._generation_kwargs(generation_kwargs)
+        examples = self._examples(text, instruction_type, few_shot)
+        key = None
+        if use_cache and self.cache is not None:
+            self._check_adapter_version()
+            key = self._cache_key(text, instruction_type, kwargs, examples, adapter)
+            value = self.cache.get(key)
+            if value is not None:
+                return CachedTokenStream(OptimizationResult.from_cache(value))
+
+        input_ids, attention_mask, past = self._encode(
+            [build_prompt(text, instruction_type, examples)],
+            self._prompt_prefix([instruction_type], [examples], kwargs),
+            adapter,
+        )
+        streamer = _make_streamer(self.tokenizer)
+
+        def run():
+            try:
+                with self.use_adapter(adapter), torch.inference_mode():
+                    if self._speculative_applicable(1, kwargs):
+                        self._speculative_generate(input_ids, past, kwargs, token_stream._stop, streamer)
+                        return
+                    self.model.generate(
+                        input_ids=input_ids,
+                        attention_mask=attention_mask,
+                        past_key_values=past,
+                        streamer=streamer,
+                        stopping_criteria=_make_stopping_criteria(token_stream._stop),
+                        **kwargs,
+                    )
+            except Exception as exc:
+                token_stream.error = exc
+                # 生成失败时也要结束迭代，避免调用方一直等待
+                streamer.end()
+
+        def on_finish(ts):
+            # 被取消的生成结果不完整，不记录吞吐量也不写入缓存
+            if ts.error is None and not ts.cancelled:
+                self._record(ts.generated_tokens, ts.elapsed_seconds, ts.time_to_first_token)
+                if key is not None:
+                    self.cache.put(key, ts.result().to_dict())
+
+        thread = threading.Thread(target=run, name="token-stream", daemon=True)
+        token_stream = TokenStream(
+            streamer, thread, instruction_type, int(attention_mask.sum()), time.perf_counter(), on_finish
+        )
+        token_stream.examples = [e["case_key"] for e in examples]
+        token_stream.adapter = adapter
+        token_stream.postprocess = lambda output: self._postprocess(text, output)
+        thread.start()
+        return token_stream
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(config=None):
+    """返回进程级共享的推理引擎（首次调用时加载模型）。
+
+    设置了 TIRE_AI_MODEL_SERVER 时返回连接模型服务的 RemoteEngine，本进程不加载模型。
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            config = config or EngineConfig.from_env()
+            if config.model_server:
+                from .remote import RemoteEngine
+
+                _engine = RemoteEngine(config.model_server.split(","))
+            else:
+                _engine = TextOptimizationEngine(config, cache=get_result_cache())
+    return _engine.load()
+
+
+def engine_loaded():
+    return _engine is not None and _engine.loaded
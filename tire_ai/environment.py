@@ -0,0 +1,59 @@
+"""运行环境检查：Python 与主要依赖的版本、CUDA 是否可用。
+
+检查 CUDA 需要导入 torch（数秒），因此页面上以后台任务运行。
+"""
+
+import platform
+import sys
+from importlib import metadata
+
+# (显示名称, 发行包名, 最低版本)
+REQUIRED_PACKAGES = (
+    ("PyTorch", "torch", "2.1.0"),
+    ("Transformers", "transformers", "4.35.2"),
+    ("PEFT", "peft", "0.7.1"),
+    ("Streamlit", "streamlit", "1.28.0"),
+)
+
+
+def _version_tuple(version):
+    parts = []
+    for part in version.split("+")[0].split("."):
+        digits = "".join(ch for ch in part if ch.isdigit())
+        if not digits:
+            break
+        parts.append(int(digits))
+    return tuple(parts)
+
+
+def check_environment(job=None):
+    """返回检查项列表，每项为 {"name", "version", "ok"}；job 用于报告进度（可选）。"""
+    checks = [{
+        "name": "Python",
+        "version": platform.python_version(),
+        "ok": sys.version_info >= (3, 9),
+    }]
+    for i, (label, package, minimum) in enumerate(REQUIRED_PACKAGES):
+        if job is not None:
+            job.check_cancelled()
+            job.update(progress=i / (len(REQUIRED_PACKAGES) + 1), message=f"检查 {label}")
+        try:
+            version = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            version = None
+        checks.append({
+            "name": label,
+            "version": version,
+            "ok": version is not None and _version_tuple(version) >= _version_tuple(minimum),
+        })
+
+    if job is not None:
+        job.update(message="检查 CUDA")
+    try:
+        import torch
+
+        cuda = torch.version.cuda if torch.cuda.is_available() else None
+    except ImportError:
+        cuda = None
+    checks.append({"name": "CUDA", "version": cuda, "ok": cuda is not None})
+    return checks
@@ -0,0 +1,227 @@
+"""批量自动评估：ROUGE-L、BLEU 与语义相似度。
+
+ROUGE-L/BLEU 按块分发到多个 CPU 进程计算，语义相似度用模型向量（均值池化）对整批做一次矩阵运算，
+向量化方式见 embeddings.make_embedder，使用的方式记录在汇总结果的 similarity_embedder 中。
+每次评估的汇总结果追加到 history.jsonl，模块5的"性能曲线"据此绘制。
+
+    python -m tire_ai.evaluation --checkpoint checkpoint-500 --test-files "./data/splits/test-*.jsonl"
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import metrics
+from .data_pipeline import DEFAULT_SPLITS_DIR, iter_jsonl
+from .embeddings import EMBEDDER_KINDS
+
+DEFAULT_EVAL_DIR = "./outputs/eval"
+
+# 中文按字切分，连续的字母/数字（含小数点、单位）作为一个词
+_TOKEN = re.compile(r"[\u4e00-\u9fff]|[A-Za-z0-9.%℃/]+|[^\s\w]")
+
+
+class ChineseTokenizer:
+    """供 rouge-score 使用的分词器（实现 tokenize 方法即可）。"""
+
+    def tokenize(self, text):
+        return _TOKEN.findall(text or "")
+
+
+_tokenizer = ChineseTokenizer()
+
+
+def _ngram_counts(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def sentence_bleu(reference_tokens, hypothesis_tokens, max_n=4):
+    """BLEU-4，n-gram 精确率做加一平滑，避免短句得分为 0。"""
+    if not hypothesis_tokens or not reference_tokens:
+        return 0.0
+    log_precision = 0.0
+    for n in range(1, max_n + 1):
+        hyp = _ngram_counts(hypothesis_tokens, n)
+        ref = _ngram_counts(reference_tokens, n)
+        overlap = sum(min(c, ref[g]) for g, c in hyp.items())
+        total = max(len(hypothesis_tokens) - n + 1, 0)
+        if n == 1:
+            if overlap == 0:
+                return 0.0
+            log_precision += math.log(overlap / total)
+        else:
+            log_precision += math.log((overlap + 1) / (total + 1))
+    ratio = len(hypothesis_tokens) / len(reference_tokens)
+    brevity = 1.0 if ratio > 1 else math.exp(1 - 1 / ratio)
+    return brevity * math.exp(log_precision / max_n)
+
+
+def _score_chunk(pairs):
+    from rouge_score import rouge_scorer
+
+    scorer = rouge_scorer.RougeScorer(["rougeL"], tokenizer=_tokenizer)
+    out = []
+    for reference, prediction in pairs:
+        rouge_l = scorer.score(reference, prediction)["rougeL"].fmeasure
+        bleu = sentence_bleu(_tokenizer.tokenize(reference), _tokenizer.tokenize(prediction))
+        out.append((rouge_l, bleu))
+    return out
+
+
+def lexical_scores(references, predictions, workers=None, chunk_size=100):
+    """逐条 ROUGE-L / BLEU，返回形状为 (N, 2) 的数组；样本较少时不启动进程池。"""
+    pairs = list(zip(references, predictions))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.float32)
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if len(chunks) == 1 or workers == 1:
+        results = [_score_chunk(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(_score_chunk, chunks))
+    return np.array([row for chunk in results for row in chunk], dtype=np.float32)
+
+
+def score_predictions(references, predictions, embedder=None, workers=None):
+    """embedder 为 None 时按 make_embedder() 的默认方式选择。"""
+    from .embeddings import cosine_similarity_pairs, make_embedder
+
+    lexical = lexical_scores(references, predictions, workers=workers)
+    embedder = embedder or make_embedder()
+    similarity = cosine_similarity_pairs(embedder, predictions, references)
+    return {
+        "rouge_l": lexical[:, 0] if len(lexical) else np.zeros(0),
+        "bleu": lexical[:, 1] if len(lexical) else np.zeros(0),
+        "semantic_similarity": np.clip(similarity, 0.0, 1.0),
+    }
+
+
+def load_test_records(test_files=None, limit=None):
+    """读取测试集分片；没有测试集时使用内置案例。"""
+    pattern = test_files or os.path.join(DEFAULT_SPLITS_DIR, "test-*.jsonl")
+    records = []
+    for path in sorted(glob.glob(pattern)):
+        for record in iter_jsonl(path):
+            if record.get("optimized_text"):
+                records.append(record)
+                if limit and len(records) >= limit:
+                    return records
+    if not records:
+        from .cases import tire_cases_data
+
+        records = [dict(case, id=key) for key, case in tire_cases_data.items()]
+    return records[:limit] if limit else records
+
+
+def generate_predictions(engine, records, batch_size=8, progress=None):
+    predictions = []
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        results = engine.optimize_batch(
+            [r["original_text"] for r in batch],
+            [r.get("instruction_type") or "分类型" for r in batch],
+        )
+        predictions.extend(r.optimized_text for r in results)
+        if progress is not None:
+            progress(len(predictions), len(records))
+    return predictions
+
+
+def evaluate(engine, records, checkpoint, output_dir=DEFAULT_EVAL_DIR, batch_size=8,
+             workers=None, progress=None, embedder=None):
+    """生成预测、计算指标并持久化；返回汇总结果。embedder 为 None 时用 engine 的模型计算语义相似度。"""
+    from .embeddings import make_embedder
+
+    embedder = embedder or make_embedder(engine=engine)
+    started = time.perf_counter()
+    predictions = generate_predictions(engine, records, batch_size=batch_size, progress=progress)
+    generation_seconds = time.perf_counter() - started
+    references = [r["optimized_text"] for r in records]
+    with metrics.timed("evaluation"):
+        scores = score_predictions(references, predictions, embedder=embedder, workers=workers)
+
+    os.makedirs(output_dir, exist_ok=True)
+    safe_name = re.sub(r"[^\w.-]+", "_", checkpoint)
+    with open(os.path.join(output_dir, f"{safe_name}.jsonl"), "w", encoding="utf-8") as f:
+        for i, (record, prediction) in enumerate(zip(records, predictions)):
+            item = {
+                "id": record.get("id", i),
+                "prediction": prediction,
+                "reference": record["optimized_text"],
+            }
+            item.update({name: float(values[i]) for name, values in scores.items()})
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    summary = {
+        "checkpoint": checkpoint,
+        "timestamp": time.time(),
+        "samples": len(records),
+        "generation_seconds": round(generation_seconds, 2),
+        "total_seconds": round(time.perf_counter() - started, 2),
+        "similarity_embedder": embedder.name,
+    }
+    summary.update({name: float(values.mean()) if len(values) else 0.0 for name, values in scores.items()})
+    with open(os.path.join(output_dir, "history.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    return summary
+
+
+def load_history(output_dir=DEFAULT_EVAL_DIR):
+    path = os.path.join(output_dir, "history.jsonl")
+    if not os.path.isfile(path):
+        return []
+    return list(iter_jsonl(path))
+
+
+def load_item_scores(checkpoint, output_dir=DEFAULT_EVAL_DIR):
+    """某次评估的逐条结果，按 id 索引。"""
+    safe_name = re.sub(r"[^\w.-]+", "_", checkpoint)
+    path = os.path.join(output_dir, f"{safe_name}.jsonl")
+    if not os.path.isfile(path):
+        return {}
+    return {str(item["id"]): item for item in iter_jsonl(path)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量自动评估")
+    parser.add_argument("--checkpoint", default=None, help="结果名称，默认取适配器目录名")
+    parser.add_argument("--test-files", default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=DEFAULT_EVAL_DIR)
+    parser.add_argument("--embedder", default=None, choices=EMBEDDER_KINDS,
+                        help="语义相似度的向量化方式，默认取 TIRE_AI_EVAL_EMBEDDER（auto）")
+    args = parser.parse_args(argv)
+
+    from .embeddings import make_embedder
+    from .engine import get_engine
+
+    engine = get_engine()
+    checkpoint = args.checkpoint or os.path.basename(os.path.normpath(engine.config.adapter_path))
+    records = load_test_records(args.test_files, args.limit)
+    summary = evaluate(
+        engine,
+        records,
+        checkpoint,
+        output_dir=args.output,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        embedder=make_embedder(args.embedder, engine),
+        progress=lambda done, total: print(f"\r生成 {done}/{total}", end="", flush=True),
+    )
+    print()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""按句增量优化：文档拆成句子逐句生成，再次提交修改后的文档时只重新生成有变化的句子。
+
+每个句子连同前后各 context 句作为一条输入交给引擎，结果写入引擎的结果缓存，缓存键包含上下文。
+用户只改了一句时，该句和上下文中包含它的相邻句子的缓存键变化，需要重新生成；其余句子命中缓存直接复用。
+引擎没有结果缓存（TIRE_AI_CACHE=0，或模型服务未开启缓存）时每次都会重新生成全部句子，比整篇生成更慢。
+
+这种带上下文的输入格式没有出现在训练数据中，模型可能把上下文一起改写；输出中带有提示词标记或原样的相邻句子时，
+该句保留原文。
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+
+from .rules import check_numbers
+
+# 句末标点（连同其后的引号、括号）结束一个句子；换行单独作为分隔保留
+_SENTENCE = re.compile(r"[^。！？；!?\n]*[。！？；!?]+[”’」』）)]*|[^。！？；!?\n]+")
+_PROMPT_MARKERS = ("上下文（仅供参考", "【本句】", "需要改写的句子")
+# 短于此长度的相邻句子（如"是。"）可能正常出现在改写结果中，不作为上下文被改写的依据
+_MIN_CONTEXT_CHARS = 4
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IncrementalResult:
+    optimized_text: str
+    instruction_type: str
+    sentences: int = 0
+    # 命中缓存、未重新生成的句子数
+    reused: int = 0
+    # 模型把上下文一起改写、保留原文的句子数
+    fallbacks: int = 0
+    generated_tokens: int = 0
+    elapsed_seconds: float = 0.0
+    examples: list = field(default_factory=list)
+    number_issues: list = field(default_factory=list)
+
+    @property
+    def regenerated(self):
+        return self.sentences - self.reused
+
+    def to_dict(self):
+        return {
+            "optimized_text": self.optimized_text,
+            "instruction_type": self.instruction_type,
+            "sentences": self.sentences,
+            "reused": self.reused,
+            "fallbacks": self.fallbacks,
+            "generated_tokens": self.generated_tokens,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "examples": self.examples,
+            "number_issues": self.number_issues,
+        }
+
+
+def split_sentences(text):
+    """拆成 [(句子, 句后分隔符)]；把各句与分隔符依次拼接即得到去掉首尾空白的原文。"""
+    text = text.strip()
+    # 句子两侧的空白（换行、缩进）归入分隔符，修改缩进或空行不影响句子的缓存键
+    spans = []
+    for match in _SENTENCE.finditer(text):
+        sentence = match.group()
+        if sentence.strip():
+            start = match.start() + len(sentence) - len(sentence.lstrip())
+            spans.append((start, match.start() + len(sentence.rstrip())))
+    return [
+        (text[start:end], text[end:spans[i + 1][0] if i + 1 < len(spans) else len(text)])
+        for i, (start, end) in enumerate(spans)
+    ]
+
+
+def sentence_input(sentences, index, context=1):
+    """第 index 句的模型输入：前后各 context 句作为参考上下文，只改写本句。"""
+    sentence = sentences[index]
+    if context <= 0:
+        return sentence
+    before = "".join(sentences[max(0, index - context):index])
+    after = "".join(sentences[index + 1:index + 1 + context])
+    if not before and not after:
+        return sentence
+    return f"上下文（仅供参考，不要改写）：{before}【本句】{after}\n需要改写的句子：{sentence}"
+
+
+def leaks_context(output, sentences, index, context=1):
+    """输出中带有提示词标记，或原样包含相邻的上下文句子时，说明模型没有只改写本句。"""
+    if any(marker in output for marker in _PROMPT_MARKERS):
+        return True
+    sentence = sentences[index]
+    neighbours = sentences[max(0, index - context):index] + sentences[index + 1:index + 1 + context]
+    return any(len(n) >= _MIN_CONTEXT_CHARS and n not in sentence and n in output for n in neighbours)
+
+
+def optimize_document(engine, text, instruction_type="分类型", few_shot=None, context=1, batch_size=8,
+                      rules=True, progress=None):
+    """按句优化文档。progress(已完成句数, 总句数, 当前拼接结果) 在每批生成后调用，未完成的句子显示原文。"""
+    parts = split_sentences(text)
+    sentences = [s for s, _ in parts]
+    inputs = [sentence_input(sentences, i, context) for i in range(len(sentences))]
+    outputs = list(sentences)
+    if engine.cache is None:
+        logger.warning("引擎没有结果缓存，按句增量优化无法复用句子，每次都会重新生成全部 %d 句", len(sentences))
+
+    def stitched():
+        return "".join(o + sep for o, (_, sep) in zip(outputs, parts)).strip()
+
+    result = IncrementalResult(optimized_text="", instruction_type=instruction_type, sentences=len(parts))
+    examples = {}
+    for start in range(0, len(inputs), batch_size):
+        chunk = inputs[start:start + batch_size]
+        batch = engine.optimize_batch(chunk, [instruction_type] * len(chunk), few_shot=few_shot)
+        for i, r in enumerate(batch, start):
+            if leaks_context(r.optimized_text, sentences, i, context):
+                result.fallbacks += 1
+            else:
+                outputs[i] = r.optimized_text
+            result.instruction_type = r.instruction_type
+            examples.update(dict.fromkeys(r.examples))
+            if r.cached:
+                result.reused += 1
+            else:
+                result.generated_tokens += r.generated_tokens
+        # 同一批的句子一起生成，耗时按批计
+        result.elapsed_seconds += max((r.elapsed_seconds for r in batch if not r.cached), default=0.0)
+        if progress is not None:
+            progress(min(start + batch_size, len(inputs)), len(inputs), stitched())
+    result.optimized_text = stitched()
+    result.examples = list(examples)
+    # 逐句的数值校验会把上下文中的数值算作缺失，拼接后对整篇重新校验
+    if rules:
+        result.number_issues = check_numbers(text, result.optimized_text)
+    return result
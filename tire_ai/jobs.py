@@ -0,0 +1,184 @@
+"""后台任务：页面上的耗时操作提交到进程级共享线程池，脚本线程只负责提交与展示。
+
+页面把任务ID保存在 st.session_state 中，重跑时按ID取回同一个任务查看状态或结果，
+不会重复执行；所有浏览器会话共用一个有上限的线程池（TIRE_AI_JOB_WORKERS，默认4），
+批量文档任务与报告渲染也在这个线程池中执行。
+
+任务函数的第一个参数是 Job 本身，可以通过 job.update() 报告进度或中间结果，
+并在循环中调用 job.check_cancelled() 响应取消。
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# 保留的已结束任务数，超出后丢弃最早结束的任务
+MAX_FINISHED_JOBS = 200
+
+
+class JobCancelled(Exception):
+    """任务函数在取消检查点抛出，任务状态记为 cancelled。"""
+
+
+class Job:
+    def __init__(self, name, dedupe_key=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.dedupe_key = dedupe_key
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        # 流式生成等场景的中间结果，完成前页面也可以展示
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed_seconds(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def cancel(self):
+        """排队中的任务直接取消；运行中的任务在下一个取消检查点结束。"""
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            self.status = "cancelled"
+            self.finished_at = time.time()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def update(self, progress=None, message=None, partial=None):
+        if progress is not None:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    def run(self, fn, args, kwargs):
+        if self._cancel.is_set():
+            self.status = "cancelled"
+            self.finished_at = time.time()
+            return
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            self.result = fn(self, *args, **kwargs)
+            self.progress = 1.0
+            self.status = "done"
+        except JobCancelled:
+            self.status = "cancelled"
+        except Exception as exc:
+            logger.exception("后台任务 %s（%s）失败", self.id, self.name)
+            self.error = str(exc)
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            metrics.observe(f"job_{self.name}", self.elapsed_seconds)
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "error": self.error,
+        }
+
+
+_executor = None
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def get_executor():
+    """进程级共享线程池，批量任务与报告渲染也提交到这里。"""
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            workers = int(os.environ.get("TIRE_AI_JOB_WORKERS", "4"))
+            _executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="job")
+        return _executor
+
+
+def _prune():
+    finished = sorted((j for j in _jobs.values() if j.finished), key=lambda j: j.finished_at or 0)
+    for job in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+        del _jobs[job.id]
+
+
+def submit_job(name, fn, *args, dedupe_key=None, **kwargs):
+    """提交 fn(job, *args, **kwargs) 并立即返回 Job。
+
+    dedupe_key 相同且尚未结束的任务直接复用，例如多个会话同时点击"加载模型"只加载一次。
+    """
+    return submit(Job(name, dedupe_key), fn, *args, **kwargs)
+
+
+def submit(job, fn, *args, **kwargs):
+    """提交已创建的 Job（例如携带额外状态的子类），执行 fn(job, *args, **kwargs)；dedupe_key 的处理同 submit_job。"""
+    with _jobs_lock:
+        if job.dedupe_key is not None:
+            for existing in _jobs.values():
+                if existing.dedupe_key == job.dedupe_key and not existing.finished:
+                    return existing
+        _register(job)
+    return _start(job, fn, args, kwargs)
+
+
+def _register(job):
+    _prune()
+    _jobs[job.id] = job
+    return job
+
+
+def _start(job, fn, args, kwargs):
+    job._future = get_executor().submit(job.run, fn, args, kwargs)
+    return job
+
+
+def get_job(job_id):
+    if job_id is None:
+        return None
+    return _jobs.get(job_id)
+
+
+def list_jobs():
+    with _jobs_lock:
+        return sorted(_jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+
+def _collect_job_metrics():
+    jobs = list(_jobs.values())
+    return {
+        "jobs_queued": sum(1 for j in jobs if j.status == "queued"),
+        "jobs_running": sum(1 for j in jobs if j.status == "running"),
+    }
+
+
+metrics.register_collector("jobs", _collect_job_metrics)
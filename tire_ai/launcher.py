@@ -0,0 +1,349 @@
+"""拆分部署启动器：模型服务进程持有模型权重，多个 Streamlit 前端进程通过本机 HTTP 或 Unix 套接字调用。
+
+    python -m tire_ai.launcher --frontends 2 --replicas auto
+    python -m tire_ai.launcher --transport unix --dry-run
+
+每个模型服务副本都加载一份完整的权重，--replicas auto 时按可用内存（GPU 上按显卡数）估算副本数；
+前端进程的 TIRE_AI_MODEL_SERVER 指向全部副本，由 RemoteEngine 按排队情况分配请求。
+模型服务依次启动（上一个加载完成后再启动下一个），避免多份权重同时加载抢占内存与磁盘。
+启动器定期检查各进程，退出或连续多次健康检查失败的进程会被重启；Ctrl+C 关闭全部进程。
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import replace
+
+from .client import ApiError, health
+from .config import EngineConfig, LauncherConfig
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCRIPT = os.path.join(PROJECT_ROOT, "tire_demo_simple.py")
+# 模型加载（含下载）允许的最长时间，超时仍未就绪的模型服务会被重启
+STARTUP_TIMEOUT = 900
+
+_DTYPE_BYTES = {"float32": 4, "float16": 2, "bfloat16": 2, "int8": 1, "int4": 0.5}
+_WEIGHT_SUFFIXES = (".safetensors", ".bin", ".pt")
+
+
+def _uses_gpu(config):
+    if config.quantization not in ("", "none") or config.device == "cpu":
+        return False
+    if config.device.startswith("cuda"):
+        return True
+    import torch
+
+    return torch.cuda.is_available()
+
+
+def estimate_replica_mb(config):
+    """单个模型服务副本常驻内存的估算（MB）；基座模型不是本地目录时返回 None。
+
+    按权重文件大小与 config.json 中的存储精度推算参数量，再乘以运行时每个参数的字节数，
+    另加两成余量与约500MB的运行时开销。可用 TIRE_AI_REPLICA_MEMORY_MB 直接指定。
+    """
+    override = os.environ.get("TIRE_AI_REPLICA_MEMORY_MB")
+    if override:
+        return float(override)
+    if not os.path.isdir(config.base_model):
+        return None
+    weight_bytes = sum(
+        os.path.getsize(os.path.join(config.base_model, name))
+        for name in os.listdir(config.base_model)
+        if name.endswith(_WEIGHT_SUFFIXES)
+    )
+    if not weight_bytes:
+        return None
+    stored = "float16"
+    config_path = os.path.join(config.base_model, "config.json")
+    if os.path.isfile(config_path):
+        with open(config_path, encoding="utf-8") as f:
+            stored = json.load(f).get("torch_dtype") or stored
+    parameters = weight_bytes / _DTYPE_BYTES.get(stored, 2)
+    if config.quantization not in ("", "none"):
+        runtime = config.quantization
+    elif config.dtype == "auto":
+        # 与推理引擎一致：CPU 上默认 float32
+        runtime = "float16" if _uses_gpu(config) else "float32"
+    else:
+        runtime = config.dtype
+    return parameters * _DTYPE_BYTES.get(runtime, 4) * 1.2 / 1024 ** 2 + 500
+
+
+def _available_memory_mb():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available / 1024 ** 2
+
+
+def plan_replicas(launcher_config, engine_config):
+    """返回 (副本数, 说明)。"""
+    requested = launcher_config.replicas
+    if requested != "auto":
+        return max(int(requested), 1), "按参数指定"
+    limit = max(launcher_config.max_replicas, 1)
+    if _uses_gpu(engine_config):
+        import torch
+
+        count = min(torch.cuda.device_count(), limit)
+        return max(count, 1), f"每张显卡一个副本（共 {torch.cuda.device_count()} 张）"
+    need = estimate_replica_mb(engine_config)
+    available = _available_memory_mb()
+    if need is None or available is None:
+        return 1, "无法估算单个副本的内存占用，只启动一个副本（可设置 TIRE_AI_REPLICA_MEMORY_MB）"
+    # 留出两成内存给前端进程与系统；CPU 推理时每个副本至少分到两个核心
+    by_memory = int(available * 0.8 // need)
+    by_cpu = max((os.cpu_count() or 1) // 2, 1)
+    count = max(min(by_memory, by_cpu, limit), 1)
+    return count, (
+        f"每个副本约 {need / 1024:.1f}GB，可用内存 {available / 1024:.1f}GB，"
+        f"{os.cpu_count()} 个CPU核心，上限 {limit}"
+    )
+
+
+def _frontend_health(port, timeout=3):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def _server_health(url, timeout=3):
+    try:
+        return health(url, timeout=timeout)["status"] == "ok"
+    except ApiError:
+        return False
+
+
+class ManagedProcess:
+    """受启动器管理的子进程：启动、健康检查、重启与关闭。"""
+
+    def __init__(self, name, command, env, check, log_path, address):
+        self.name = name
+        self.command = command
+        self.env = env
+        self.check = check
+        self.log_path = log_path
+        self.address = address
+        self.process = None
+        self.started_at = 0.0
+        self.ready = False
+        self.failures = 0
+        self.restarts = 0
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        log = open(self.log_path, "ab")
+        self.process = subprocess.Popen(self.command, env=self.env, stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+        self.started_at = time.monotonic()
+        self.ready = False
+        self.failures = 0
+        logger.info("启动 %s（pid %s）：%s", self.name, self.process.pid, self.address)
+
+    def stop(self, timeout=15):
+        if not self.running:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def restart(self, reason):
+        logger.warning("重启 %s：%s", self.name, reason)
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def supervise(self, max_failures):
+        """检查一次：退出则重启；就绪后连续 max_failures 次健康检查失败、或启动超时也重启。"""
+        if not self.running:
+            self.restart(f"进程已退出（返回码 {self.process.returncode}）")
+            return
+        if self.check():
+            if not self.ready:
+                logger.info("%s 已就绪（用时 %.0fs）", self.name, time.monotonic() - self.started_at)
+            self.ready = True
+            self.failures = 0
+            return
+        if not self.ready:
+            if time.monotonic() - self.started_at > STARTUP_TIMEOUT:
+                self.restart(f"{STARTUP_TIMEOUT}s 内未就绪")
+            return
+        self.failures += 1
+        if self.failures >= max_failures:
+            self.restart(f"连续 {self.failures} 次健康检查失败")
+
+
+class Launcher:
+    def __init__(self, config=None, engine_config=None, script=DEFAULT_SCRIPT):
+        self.config = config or LauncherConfig.from_env()
+        self.engine_config = engine_config or EngineConfig.from_env()
+        self.script = script
+        if self.config.transport not in ("http", "unix"):
+            raise ValueError(f"不支持的连接方式：{self.config.transport}（可选 http/unix）")
+        if self.config.transport == "unix" and not hasattr(os, "fork"):
+            raise ValueError("Unix 套接字仅支持 Linux/macOS，Windows 请使用 --transport http")
+        self.replicas, self.plan_reason = plan_replicas(self.config, self.engine_config)
+        self.servers = []
+        self.frontends = []
+        self._stopping = False
+
+    def server_urls(self):
+        if self.config.transport == "unix":
+            run_dir = os.path.abspath(self.config.run_dir)
+            return [f"unix:{os.path.join(run_dir, f'model-{i}.sock')}" for i in range(self.replicas)]
+        return [f"http://127.0.0.1:{self.config.server_port + i}" for i in range(self.replicas)]
+
+    def frontend_urls(self):
+        return [f"http://localhost:{self.config.frontend_port + i}" for i in range(self.config.frontends)]
+
+    def _base_env(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (PROJECT_ROOT, env.get("PYTHONPATH")) if p)
+        return env
+
+    def _server_process(self, index, url):
+        env = self._base_env()
+        # 模型服务自己加载模型，不能再指向其他模型服务
+        env.pop("TIRE_AI_MODEL_SERVER", None)
+        if _uses_gpu(self.engine_config) and self.replicas > 1:
+            env["CUDA_VISIBLE_DEVICES"] = str(index)
+        else:
+            # CPU 推理时各副本平分核心，避免线程数超过核心数后互相争抢
+            threads = str(max((os.cpu_count() or 1) // self.replicas, 1))
+            env.setdefault("OMP_NUM_THREADS", threads)
+            env.setdefault("MKL_NUM_THREADS", threads)
+        command = [sys.executable, "-m", "tire_ai.api"]
+        if url.startswith("unix:"):
+            path = url[len("unix:"):]
+            if os.path.exists(path):
+                os.remove(path)
+            command += ["--uds", path]
+        else:
+            command += ["--host", "127.0.0.1", "--port", str(self.config.server_port + index)]
+        return ManagedProcess(
+            f"模型服务{index}", command, env, lambda: _server_health(url),
+            os.path.join(self.config.run_dir, f"model-{index}.log"), url,
+        )
+
+    def _frontend_process(self, index, urls):
+        port = self.config.frontend_port + index
+        env = self._base_env()
+        env["TIRE_AI_MODEL_SERVER"] = ",".join(urls)
+        command = [
+            sys.executable, "-m", "streamlit", "run", self.script,
+            "--server.port", str(port),
+            "--server.headless", "true",
+            "--browser.gatherUsageStats", "false",
+        ]
+        return ManagedProcess(
+            f"前端{index}", command, env, lambda: _frontend_health(port),
+            os.path.join(self.config.run_dir, f"frontend-{index}.log"), f"http://localhost:{port}",
+        )
+
+    def start(self):
+        os.makedirs(self.config.run_dir, exist_ok=True)
+        urls = self.server_urls()
+        logger.info("模型服务副本数：%d（%s）", self.replicas, self.plan_reason)
+        self.servers = [self._server_process(i, url) for i, url in enumerate(urls)]
+        self.frontends = [self._frontend_process(i, urls) for i in range(self.config.frontends)]
+        # 前端不依赖模型即可打开；模型服务先启动第一个，其余在 supervise 中依次启动
+        self.servers[0].start()
+        for frontend in self.frontends:
+            frontend.start()
+
+    def supervise_once(self):
+        for index, server in enumerate(self.servers):
+            if server.process is None:
+                # 前一个副本就绪后再启动下一个，权重不同时加载
+                if all(s.ready for s in self.servers[:index]):
+                    server.start()
+                break
+            server.supervise(self.config.max_health_failures)
+        for frontend in self.frontends:
+            frontend.supervise(self.config.max_health_failures)
+
+    def run(self):
+        self.start()
+        print("前端地址：" + "  ".join(self.frontend_urls()))
+        print("模型服务：" + "  ".join(self.server_urls()))
+        print(f"日志目录：{os.path.abspath(self.config.run_dir)}（Ctrl+C 退出）")
+        try:
+            while not self._stopping:
+                time.sleep(self.config.health_interval)
+                self.supervise_once()
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stopping = True
+        for process in self.frontends + self.servers:
+            process.stop()
+        logger.info("已关闭全部进程")
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    defaults = LauncherConfig.from_env()
+    parser = argparse.ArgumentParser(description="拆分部署：模型服务 + 多个 Streamlit 前端")
+    parser.add_argument("--frontends", type=int, default=defaults.frontends)
+    parser.add_argument("--frontend-port", type=int, default=defaults.frontend_port)
+    parser.add_argument("--replicas", default=defaults.replicas, help="模型服务副本数，或 auto 按可用内存估算")
+    parser.add_argument("--max-replicas", type=int, default=defaults.max_replicas)
+    parser.add_argument("--transport", choices=("http", "unix"), default=defaults.transport)
+    parser.add_argument("--server-port", type=int, default=defaults.server_port)
+    parser.add_argument("--run-dir", default=defaults.run_dir)
+    parser.add_argument("--health-interval", type=float, default=defaults.health_interval)
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="前端 Streamlit 脚本")
+    parser.add_argument("--dry-run", action="store_true", help="只显示部署计划，不启动进程")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    config = replace(
+        defaults,
+        frontends=args.frontends,
+        frontend_port=args.frontend_port,
+        replicas=str(args.replicas).strip().lower(),
+        max_replicas=args.max_replicas,
+        transport=args.transport,
+        server_port=args.server_port,
+        run_dir=args.run_dir,
+        health_interval=args.health_interval,
+    )
+    launcher = Launcher(config, script=args.script)
+    if args.dry_run:
+        print(f"模型服务副本数：{launcher.replicas}（{launcher.plan_reason}）")
+        print("模型服务：" + "  ".join(launcher.server_urls()))
+        print("前端地址：" + "  ".join(launcher.frontend_urls()))
+        return
+
+    # 收到 SIGTERM（如 systemd 停止服务）时与 Ctrl+C 一样关闭全部子进程
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        launcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
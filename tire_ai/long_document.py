@@ -0,0 +1,290 @@
+"""长文档模式：按章节与段落分块，分批并行优化，再统一全文术语。
+
+完整的工艺规范远超单次生成能处理的长度。流程分两步：
+
+    map     按标题、段落边界把文档切成不超过 chunk_chars 字的块，每块带上前一块末尾 overlap 字作为
+            参考上下文（只改写本块），每 batch_size 块合成一批生成；拆分部署时多个批次同时发往不同副本
+    reduce  不再调用模型：统计各块输出中同义术语的用法，全文统一为出现最多的写法，并做单位规范化
+
+同一时刻在生成的块数不超过 batch_size × workers，显存/内存占用与文档长度无关。
+命令行处理文件时输出边生成边写入磁盘：
+    python -m tire_ai.long_document spec.txt --output spec-optimized.txt
+"""
+
+import argparse
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from .incremental import split_sentences
+from .rules import check_numbers, normalize_text
+
+# 标题行：Markdown 标题、"第三章"、"三、"、"3.2 硫化工艺" 等不超过 40 字的行
+_HEADING = re.compile(
+    r"^\s*(?:#{1,6}\s+|第[一二三四五六七八九十百零\d]+[章节条部分篇]|[一二三四五六七八九十]+、|\d+(?:\.\d+)*[、.．\s])"
+)
+_HEADING_MAX_CHARS = 40
+
+# 同义术语组：reduce 时全文统一为各块输出中出现次数最多的写法
+TERMINOLOGY = (
+    ("载重指数", "负荷指数"),
+    ("速度级别", "速度等级", "速度符号"),
+    ("扁平比", "高宽比"),
+    ("轮辋直径", "轮圈直径", "钢圈直径"),
+    ("胎压", "充气压力"),
+    ("硫化机", "硫化设备"),
+    ("成型机", "成型设备"),
+    ("胎面花纹", "胎纹"),
+)
+_TERMS = re.compile("|".join(sorted((t for group in TERMINOLOGY for t in group), key=len, reverse=True)))
+
+
+@dataclass
+class Chunk:
+    index: int
+    text: str
+    # 前一块的末尾，只作为参考上下文
+    context: str = ""
+    # 块后的原始分隔（换行、空行），拼接结果时保留
+    separator: str = ""
+
+
+@dataclass
+class LongDocumentResult:
+    optimized_text: str
+    instruction_type: str
+    chunks: int = 0
+    cached_chunks: int = 0
+    generated_tokens: int = 0
+    elapsed_seconds: float = 0.0
+    # reduce 阶段统一的术语：{被替换的写法: 统一后的写法}
+    terminology: dict = field(default_factory=dict)
+    number_issues: list = field(default_factory=list)
+
+    def to_dict(self):
+        return {
+            "optimized_text": self.optimized_text,
+            "instruction_type": self.instruction_type,
+            "chunks": self.chunks,
+            "cached_chunks": self.cached_chunks,
+            "generated_tokens": self.generated_tokens,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "terminology": self.terminology,
+            "number_issues": self.number_issues,
+        }
+
+
+def _is_heading(line):
+    return len(line.strip()) <= _HEADING_MAX_CHARS and bool(_HEADING.match(line))
+
+
+def _blocks(text):
+    """逐个非空行返回 (行, 行后的换行)。"""
+    for match in re.finditer(r"([^\n]*\S[^\n]*)(\n\s*|$)", text.strip()):
+        yield match.group(1).strip(), match.group(2).replace(" ", "").replace("\t", "") or ""
+
+
+def _pieces(line, limit, first_limit=None):
+    """把超过 limit 字的行按句切开（第一段不超过 first_limit 字），单句仍超长时按字数硬切。"""
+    first_limit = first_limit or limit
+    if len(line) <= first_limit:
+        return [line]
+    pieces, current = [], ""
+    for sentence, separator in split_sentences(line):
+        sentence += separator
+        while len(current) + len(sentence) > (limit if pieces else first_limit):
+            if current:
+                pieces.append(current)
+                current = ""
+                continue
+            cut = limit if pieces else first_limit
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:]
+        current += sentence
+    if current:
+        pieces.append(current)
+    return [p.strip() for p in pieces if p.strip()]
+
+
+def _tail(text, overlap):
+    """块末尾不超过 overlap 字的完整句子，作为下一块的上下文。"""
+    if overlap <= 0:
+        return ""
+    tail = ""
+    for sentence, separator in reversed(split_sentences(text)):
+        if len(tail) + len(sentence) + len(separator) > overlap:
+            break
+        tail = sentence + separator + tail
+    return (tail or text[-overlap:]).strip()
+
+
+def iter_chunks(text, chunk_chars=500, overlap=100):
+    """按标题与段落边界分块，每块不超过 chunk_chars 字；块长度超过 chunk_chars 一半后遇到标题即开始新块，
+    让章节尽量不被拆开。"""
+    index, parts, size, previous = 0, [], 0, ""
+    # 只有标题还没有正文时不切块，标题总是和它后面的内容在同一块
+    has_body = False
+
+    def flush():
+        body = "".join(p + s for p, s in parts[:-1]) + parts[-1][0]
+        return Chunk(index, body, _tail(previous, overlap), parts[-1][1])
+
+    for line, separator in _blocks(text):
+        heading = _is_heading(line)
+        # 块中只有标题时，正文的第一段按块内剩余字数切开，和标题放在同一块
+        room = chunk_chars - size if parts and not has_body and not heading else 0
+        pieces = _pieces(line, chunk_chars, room if room > 0 else None)
+        for i, piece in enumerate(pieces):
+            piece_separator = separator if i == len(pieces) - 1 else ""
+            starts_section = i == 0 and heading and size >= chunk_chars // 2
+            if parts and (size + len(piece) > chunk_chars or (has_body and starts_section)):
+                chunk = flush()
+                yield chunk
+                index, parts, size, previous, has_body = index + 1, [], 0, chunk.text, False
+            parts.append((piece, piece_separator))
+            size += len(piece) + len(piece_separator)
+            has_body = has_body or not (i == 0 and heading)
+    if parts:
+        yield flush()
+
+
+def chunk_input(chunk):
+    """块的模型输入：上下文放在前面并注明不改写，与按句增量优化的写法一致。"""
+    if not chunk.context:
+        return chunk.text
+    return f"上下文（仅供参考，不要改写）：{chunk.context}\n需要改写的部分：\n{chunk.text}"
+
+
+def _default_workers(engine):
+    # 拆分部署时每个副本同时处理一批；进程内引擎串行生成，多开线程没有收益
+    pool = getattr(engine, "pool", None)
+    return max(1, len(pool.replicas)) if pool is not None else 1
+
+
+def map_chunks(engine, chunks, instruction_type="分类型", few_shot=None, batch_size=4, workers=None):
+    """按顺序逐块返回 (Chunk, OptimizationResult)；最多 workers 个批次同时在生成，其余块尚未读取。"""
+    workers = workers or _default_workers(engine)
+
+    def run(batch):
+        inputs = [chunk_input(c) for c in batch]
+        return batch, engine.optimize_batch(inputs, [instruction_type] * len(batch), few_shot=few_shot)
+
+    def batches():
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="long-document") as executor:
+        pending = []
+        for batch in batches():
+            pending.append(executor.submit(run, batch))
+            if len(pending) < workers:
+                continue
+            yield from zip(*pending.pop(0).result())
+        for future in pending:
+            yield from zip(*future.result())
+
+
+def count_terms(text, counter=None):
+    counter = counter if counter is not None else Counter()
+    counter.update(_TERMS.findall(text))
+    return counter
+
+
+def preferred_terms(counter):
+    """各同义术语组中出现最多的写法（并列时取组内靠前的），返回 {其他写法: 统一写法}。"""
+    mapping = {}
+    for group in TERMINOLOGY:
+        used = [t for t in group if counter[t]]
+        if len(used) < 2:
+            continue
+        preferred = max(used, key=lambda t: (counter[t], -group.index(t)))
+        mapping.update({t: preferred for t in used if t != preferred})
+    return mapping
+
+
+def harmonize_terms(text, mapping, rules=True):
+    """reduce 阶段：统一术语写法，规则开启时再做一次单位规范化。"""
+    if mapping:
+        text = _TERMS.sub(lambda m: mapping.get(m.group(), m.group()), text)
+    return normalize_text(text) if rules else text
+
+
+def optimize_long_document(engine, text, instruction_type="分类型", few_shot=None, chunk_chars=500, overlap=100,
+                           batch_size=4, workers=None, rules=True, progress=None):
+    """分块优化整篇文档。progress(已完成块数, 总块数, 本块结果) 在每块完成后按顺序调用，结果只在最后拼接一次。"""
+    total = sum(1 for _ in iter_chunks(text, chunk_chars, overlap))
+    result = LongDocumentResult(optimized_text="", instruction_type=instruction_type, chunks=total)
+    parts, counter = [], Counter()
+    start = time.perf_counter()
+    for chunk, r in map_chunks(
+        engine, iter_chunks(text, chunk_chars, overlap), instruction_type, few_shot, batch_size, workers
+    ):
+        parts.append(r.optimized_text + chunk.separator)
+        count_terms(r.optimized_text, counter)
+        result.instruction_type = r.instruction_type
+        if r.cached:
+            result.cached_chunks += 1
+        else:
+            result.generated_tokens += r.generated_tokens
+        if progress is not None:
+            progress(chunk.index + 1, total, parts[-1])
+    result.elapsed_seconds = time.perf_counter() - start
+    result.terminology = preferred_terms(counter)
+    result.optimized_text = harmonize_terms("".join(parts), result.terminology, rules).strip()
+    if rules:
+        result.number_issues = check_numbers(text, result.optimized_text)
+    return result
+
+
+def main(argv=None):
+    from .config import EngineConfig
+    from .engine import get_engine
+
+    config = EngineConfig.from_env()
+    parser = argparse.ArgumentParser(description="长文档分块优化")
+    parser.add_argument("input", help="UTF-8 文本文件")
+    parser.add_argument("--output", default=None, help="输出文件，默认为 <input>-optimized.txt")
+    parser.add_argument("--instruction-type", default="分类型")
+    parser.add_argument("--chunk-chars", type=int, default=config.chunk_chars)
+    parser.add_argument("--overlap", type=int, default=config.chunk_overlap)
+    parser.add_argument("--batch-size", type=int, default=config.chunk_batch_size)
+    parser.add_argument("--workers", type=int, default=None, help="同时生成的批次数，默认为模型服务副本数")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.input)[0] + "-optimized.txt"
+    with open(args.input, encoding="utf-8") as f:
+        text = f.read()
+    engine = get_engine()
+    total = sum(1 for _ in iter_chunks(text, args.chunk_chars, args.overlap))
+    # map 的结果先逐块写入临时文件，reduce 时逐行替换术语写入输出文件，内存中不保留全文结果
+    counter = Counter()
+    partial = output + ".part"
+    with open(partial, "w", encoding="utf-8") as f:
+        for chunk, r in map_chunks(
+            engine, iter_chunks(text, args.chunk_chars, args.overlap), args.instruction_type,
+            batch_size=args.batch_size, workers=args.workers,
+        ):
+            f.write(r.optimized_text + chunk.separator)
+            count_terms(r.optimized_text, counter)
+            print(f"分块 {chunk.index + 1}/{total}{'（缓存）' if r.cached else ''}", flush=True)
+    mapping = preferred_terms(counter)
+    with open(partial, encoding="utf-8") as src, open(output, "w", encoding="utf-8") as dst:
+        for line in src:
+            dst.write(harmonize_terms(line, mapping, config.rules))
+    os.remove(partial)
+    for old, new in mapping.items():
+        print(f"术语统一：{old} → {new}")
+    print(f"已写入 {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""运行指标：分阶段耗时直方图、计数器、仪表值与系统资源，导出为 Prometheus 文本格式。
+
+    from tire_ai.metrics import timed
+    with timed("tokenization"):
+        ...
+
+阶段名称：model_load / tokenization / classification / generation / time_to_first_token /
+evaluation / report_render / api_request。
+"""
+
+import math
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 直方图分桶上限（秒），覆盖从分词的毫秒级到模型加载的分钟级
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+QUANTILES = (0.5, 0.95, 0.99)
+_PREFIX = "tire_ai_"
+
+
+class Histogram:
+    """累计分桶计数用于 Prometheus，最近 window 个样本用于计算 p50/p95/p99。"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=2048):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def quantile(self, q):
+        values = sorted(self.recent)
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))
+        return values[index]
+
+    def summary(self):
+        out = {"count": self.count, "mean": self.sum / self.count if self.count else 0.0}
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}"] = self.quantile(q)
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        # 导出时调用的回调，返回 {名称: 数值}，用于队列深度等由其他组件持有的状态
+        self._collectors = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def register_collector(self, name, collect):
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _collected(self):
+        values = {}
+        for collect in list(self._collectors.values()):
+            try:
+                values.update(collect())
+            except Exception:
+                continue
+        return values
+
+    def stage_summary(self):
+        """各阶段的调用次数、均值与 p50/p95/p99（秒）。"""
+        with self._lock:
+            return {stage: hist.summary() for stage, hist in sorted(self._histograms.items())}
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def gauges(self):
+        with self._lock:
+            gauges = dict(self._gauges)
+        gauges.update(self._collected())
+        return gauges
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            gauges = dict(self._gauges)
+
+        name = _PREFIX + "stage_latency_seconds"
+        lines += [f"# HELP {name} 各处理阶段耗时", f"# TYPE {name} histogram"]
+        for stage, hist in histograms:
+            for bound, count in zip(hist.buckets, hist.bucket_counts):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {hist.sum:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+
+        name = _PREFIX + "stage_latency_recent_seconds"
+        lines += [f"# HELP {name} 最近样本窗口内的分位数耗时", f"# TYPE {name} summary"]
+        for stage, hist in histograms:
+            for q in QUANTILES:
+                value = hist.quantile(q)
+                if value is not None:
+                    lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {sum(hist.recent):.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {len(hist.recent)}')
+
+        for key, value in counters:
+            metric = _PREFIX + key + "_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+        gauges.update(self._collected())
+        gauges.update(system_gauges())
+        for key, value in sorted(gauges.items()):
+            if value is None:
+                continue
+            metric = _PREFIX + key
+            lines += [f"# TYPE {metric} gauge", f"{metric} {float(value):.6g}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+observe = registry.observe
+timed = registry.timed
+inc = registry.inc
+set_gauge = registry.set_gauge
+register_collector = registry.register_collector
+
+
+def system_stats():
+    """当前进程与主机的资源使用情况，供模块1的"系统资源"面板展示。"""
+    stats = {
+        "cpu_count": os.cpu_count() or 0,
+        "cpu_percent": None,
+        "process_cpu_percent": None,
+        "memory_total_mb": None,
+        "memory_used_mb": None,
+        "process_rss_mb": None,
+        "gpu_name": None,
+        "gpu_memory_total_mb": None,
+        "gpu_memory_used_mb": None,
+        "disk_total_gb": None,
+        "disk_free_gb": None,
+    }
+    try:
+        import psutil
+
+        memory = psutil.virtual_memory()
+        process = psutil.Process(os.getpid())
+        stats.update(
+            cpu_percent=psutil.cpu_percent(interval=None),
+            process_cpu_percent=process.cpu_percent(interval=None),
+            memory_total_mb=memory.total / 1024 ** 2,
+            memory_used_mb=(memory.total - memory.available) / 1024 ** 2,
+            process_rss_mb=process.memory_info().rss / 1024 ** 2,
+        )
+    except ImportError:
+        from .engine import process_memory_mb
+
+        stats["process_rss_mb"] = process_memory_mb()
+
+    # 只在 torch 已被推理引擎导入后读取显存，避免为了展示资源而导入 torch
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        free, total = torch.cuda.mem_get_info()
+        stats.update(
+            gpu_name=torch.cuda.get_device_name(),
+            gpu_memory_total_mb=total / 1024 ** 2,
+            gpu_memory_used_mb=(total - free) / 1024 ** 2,
+        )
+
+    disk = shutil.disk_usage(os.getcwd())
+    stats.update(disk_total_gb=disk.total / 1024 ** 3, disk_free_gb=disk.free / 1024 ** 3)
+    return stats
+
+
+def system_gauges():
+    stats = system_stats()
+    return {
+        "cpu_percent": stats["cpu_percent"],
+        "process_cpu_percent": stats["process_cpu_percent"],
+        "memory_used_bytes": stats["memory_used_mb"] and stats["memory_used_mb"] * 1024 ** 2,
+        "process_resident_memory_bytes": stats["process_rss_mb"] and stats["process_rss_mb"] * 1024 ** 2,
+        "gpu_memory_used_bytes": stats["gpu_memory_used_mb"] and stats["gpu_memory_used_mb"] * 1024 ** 2,
+    }
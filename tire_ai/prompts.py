@@ -0,0 +1,59 @@
+"""Instruction 类型对应的处理模板（与 Module 3 中展示的模板一致）。"""
+
+INSTRUCTION_TYPES = ("分类型", "开放型")
+
+INSTRUCTIONS = {
+    "分类型": (
+        "将工程师视角的技术纪要转换为客户友好的产品说明，强调效益和操作建议。"
+        "保留全部工艺参数与数值，温度统一使用℃表示。\n"
+    ),
+    "开放型": (
+        "对以下轮胎制造业技术文档进行开放式优化，整理为结构清晰的产品规格说明，"
+        "补充必要的参数含义，保留全部数值。\n"
+    ),
+}
+
+INPUT_MARKER = "输入：\n"
+OUTPUT_MARKER = "\n输出：\n"
+
+INSTRUCTION_TEMPLATES = {name: instruction + INPUT_MARKER for name, instruction in INSTRUCTIONS.items()}
+
+
+def normalize_instruction_type(instruction_type):
+    # API 文档示例中使用 "分类"/"开放" 的简写
+    if instruction_type in INSTRUCTION_TYPES:
+        return instruction_type
+    if instruction_type and instruction_type.startswith("开放"):
+        return "开放型"
+    return "分类型"
+
+
+def format_examples(examples):
+    """检索到的相似案例作为 few-shot 示例，放在指令与本次输入之间。"""
+    parts = ["参考以下已审核案例的写法：\n"]
+    for i, example in enumerate(examples, 1):
+        parts.append(
+            f"示例{i}输入：\n{example['original_text'].strip()}\n"
+            f"示例{i}输出：\n{example['optimized_text'].strip()}\n\n"
+        )
+    return "".join(parts)
+
+
+def prompt_prefix(instruction_type="分类型", examples=None):
+    """提示词中文档之前的固定部分，同一 Instruction 类型（及相同示例）的请求完全相同。"""
+    instruction_type = normalize_instruction_type(instruction_type)
+    if not examples:
+        return INSTRUCTION_TEMPLATES[instruction_type]
+    return INSTRUCTIONS[instruction_type] + format_examples(examples) + INPUT_MARKER
+
+
+def build_prompt(text, instruction_type="分类型", examples=None):
+    return prompt_prefix(instruction_type, examples) + text.strip() + OUTPUT_MARKER
+
+
+def encode_prompt(tokenizer, prompt):
+    """提示词编码为 token id 列表；微调与推理共用，保证适配器训练时与使用时的输入格式一致。"""
+    # ChatGLM3 的分词器提供对话格式封装，其余模型直接编码提示词
+    if hasattr(tokenizer, "build_chat_input"):
+        return tokenizer.build_chat_input(prompt)["input_ids"][0].tolist()
+    return tokenizer(prompt)["input_ids"]
@@ -0,0 +1,238 @@
+"""CPU 量化推理：先合并 LoRA，再对线性层做 INT8 动态量化或 INT4 分组权重量化。
+
+    TIRE_AI_QUANTIZATION=int8 streamlit run tire_demo_simple.py
+
+INT8 使用 torch 的动态量化（权重 int8，激活按批动态量化），在无 GPU 的工作站上通常比
+fp32 更快；INT4 只压缩权重存储，前向时逐层反量化为浮点再计算，主要用于节省内存。
+
+内置基准测试在 tire_cases_data 上比较各精度的加载耗时、内存占用、延迟与输出一致性：
+    python -m tire_ai.quantization --modes float32 bfloat16 int8 int4
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import time
+from dataclasses import replace
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("none", "int8", "int4")
+DEFAULT_BENCHMARK_PATH = "./outputs/benchmarks/quantization.json"
+# 输出层保持浮点，避免词表 logits 的量化误差直接影响解码
+_KEEP_FLOAT_MODULES = ("lm_head", "output_layer", "embed_out")
+
+
+def merge_adapter(model):
+    """PeftModel 合并 LoRA 权重后返回普通模型；量化必须在合并之后进行。"""
+    if hasattr(model, "merge_and_unload"):
+        return model.merge_and_unload()
+    return model
+
+
+def _int4_linear_class():
+    import torch
+    import torch.nn.functional as F
+
+    class Int4Linear(torch.nn.Module):
+        """对称分组 INT4 权重：每组 group_size 个输入通道共享一个缩放系数，两个权重打包进一个字节。"""
+
+        def __init__(self, in_features, out_features, group_size, packed, scales, bias):
+            super().__init__()
+            self.in_features = in_features
+            self.out_features = out_features
+            self.group_size = group_size
+            self.register_buffer("packed", packed)
+            self.register_buffer("scales", scales)
+            self.bias = bias
+
+        @classmethod
+        def from_linear(cls, linear, group_size=128):
+            weight = linear.weight.detach().float()
+            out_features, in_features = weight.shape
+            pad = (-in_features) % group_size
+            if pad:
+                weight = F.pad(weight, (0, pad))
+            groups = weight.view(out_features, -1, group_size)
+            scales = groups.abs().amax(dim=-1, keepdim=True).clamp(min=1e-8) / 7
+            q = (torch.round(groups / scales).clamp(-8, 7) + 8).to(torch.uint8).view(out_features, -1)
+            packed = q[:, 0::2] | (q[:, 1::2] << 4)
+            bias = None
+            if linear.bias is not None:
+                bias = torch.nn.Parameter(linear.bias.detach().float(), requires_grad=False)
+            return cls(in_features, out_features, group_size, packed, scales.squeeze(-1), bias)
+
+        def dequantize(self):
+            q = torch.stack((self.packed & 0x0F, self.packed >> 4), dim=-1).view(self.out_features, -1)
+            groups = (q.float() - 8).view(self.out_features, -1, self.group_size)
+            weight = (groups * self.scales.unsqueeze(-1)).view(self.out_features, -1)
+            return weight[:, :self.in_features]
+
+        def forward(self, x):
+            bias = self.bias.to(x.dtype) if self.bias is not None else None
+            return F.linear(x, self.dequantize().to(x.dtype), bias)
+
+        def extra_repr(self):
+            return f"in_features={self.in_features}, out_features={self.out_features}, group_size={self.group_size}"
+
+    return Int4Linear
+
+
+def _quantizable_linears(model):
+    """需要量化的 Linear 层 (名称, 模块)，不含 _KEEP_FLOAT_MODULES 中的输出层。"""
+    import torch
+
+    return [
+        (name, module)
+        for name, module in model.named_modules()
+        if isinstance(module, torch.nn.Linear) and not name.endswith(_KEEP_FLOAT_MODULES)
+    ]
+
+
+def quantize_int8(model):
+    import torch
+
+    # 按层名指定量化范围，输出层与 INT4 一样保持浮点
+    qconfig_spec = {name: torch.ao.quantization.default_dynamic_qconfig for name, _ in _quantizable_linears(model)}
+    return torch.ao.quantization.quantize_dynamic(model, qconfig_spec, dtype=torch.qint8)
+
+
+def quantize_int4(model, group_size=128):
+    int4_linear = _int4_linear_class()
+    for name, module in _quantizable_linears(model):
+        parent_name, _, child = name.rpartition(".")
+        parent = model.get_submodule(parent_name) if parent_name else model
+        # 输入维度小于分组大小时整层为一组（取偶数以便两两打包）
+        size = group_size if module.in_features >= group_size else module.in_features + module.in_features % 2
+        setattr(parent, child, int4_linear.from_linear(module, size))
+    return model
+
+
+def quantize_model(model, mode, group_size=128):
+    """mode 为 none / int8 / int4；返回量化后的模型（可能是新对象）。"""
+    if mode in ("", "none", None):
+        return model
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"不支持的量化方式：{mode}（可选 {'/'.join(QUANTIZATION_MODES)}）")
+    model = merge_adapter(model)
+    if mode == "int8":
+        return quantize_int8(model)
+    return quantize_int4(model, group_size=group_size)
+
+
+def model_memory_mb(model):
+    """权重占用：参数 + 缓冲区，再加上动态量化层中不以参数形式暴露的打包权重。"""
+    import torch
+
+    total = sum(t.numel() * t.element_size() for t in model.parameters())
+    total += sum(t.numel() * t.element_size() for t in model.buffers())
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            weight, bias = packed._weight_bias()
+            total += weight.numel() * weight.element_size()
+            if isinstance(bias, torch.Tensor):
+                total += bias.numel() * bias.element_size()
+    return total / 1024 ** 2
+
+
+def _mode_config(base_config, mode):
+    # 基准测试中的精度名称：float32 / bfloat16 / float16 为浮点加载，int8 / int4 为量化加载
+    if mode in QUANTIZATION_MODES[1:]:
+        return replace(base_config, device="cpu", dtype="float32", quantization=mode)
+    return replace(base_config, device="cpu", dtype=mode, quantization="none")
+
+
+def run_benchmark(modes=("float32", "bfloat16", "int8"), config=None, cases=None, max_new_tokens=None,
+                  output_path=DEFAULT_BENCHMARK_PATH, progress=None):
+    """逐个精度加载模型并在案例上生成，以第一个精度的输出为参照计算一致性。"""
+    from .cases import tire_cases_data
+    from .config import EngineConfig
+    from .engine import TextOptimizationEngine
+    from .evaluation import lexical_scores
+
+    base_config = config or EngineConfig.from_env()
+    if max_new_tokens:
+        base_config = replace(base_config, max_new_tokens=max_new_tokens)
+    cases = list((cases or tire_cases_data).values())
+    texts = [c["original_text"] for c in cases]
+    types = [c["instruction_type"] for c in cases]
+
+    results = []
+    reference = None
+    for mode in modes:
+        if progress is not None:
+            progress(mode)
+        engine = TextOptimizationEngine(_mode_config(base_config, mode), cache=None)
+        engine.load()
+        latencies, outputs, tokens = [], [], 0
+        for text, instruction_type in zip(texts, types):
+            result = engine.optimize(text, instruction_type, use_cache=False)
+            latencies.append(result.elapsed_seconds)
+            outputs.append(result.optimized_text)
+            tokens += result.generated_tokens
+        if reference is None:
+            reference = outputs
+        agreement = lexical_scores(reference, outputs, workers=1)
+        results.append({
+            "mode": mode,
+            "load_seconds": round(engine.stats.load_seconds, 2),
+            "memory_mb": round(engine.stats.param_memory_mb, 1),
+            "rss_mb": round(engine.stats.rss_mb, 1),
+            "mean_latency_seconds": round(sum(latencies) / len(latencies), 4),
+            "tokens_per_second": round(tokens / sum(latencies), 2) if sum(latencies) > 0 else 0.0,
+            "exact_match": round(sum(a == b for a, b in zip(reference, outputs)) / len(outputs), 4),
+            "rouge_l_vs_reference": round(float(agreement[:, 0].mean()), 4),
+        })
+        del engine
+        gc.collect()
+
+    report = {
+        "base_model": base_config.base_model,
+        "adapter_path": base_config.adapter_path,
+        "reference_mode": modes[0],
+        "cases": len(cases),
+        "max_new_tokens": base_config.max_new_tokens,
+        "timestamp": time.time(),
+        "results": results,
+    }
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def load_benchmark(path=DEFAULT_BENCHMARK_PATH):
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="量化推理基准测试")
+    parser.add_argument("--modes", nargs="+", default=["float32", "bfloat16", "int8"],
+                        help="float32 / bfloat16 / float16 / int8 / int4，第一个作为一致性参照")
+    parser.add_argument("--max-new-tokens", type=int, default=128)
+    parser.add_argument("--output", default=DEFAULT_BENCHMARK_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    report = run_benchmark(
+        args.modes,
+        max_new_tokens=args.max_new_tokens,
+        output_path=args.output,
+        progress=lambda mode: logger.info("基准测试：%s", mode),
+    )
+    header = f"{'精度':<10}{'加载s':>8}{'权重MB':>10}{'延迟s':>10}{'tokens/s':>10}{'一致率':>8}{'ROUGE-L':>9}"
+    print(header)
+    for r in report["results"]:
+        print(f"{r['mode']:<10}{r['load_seconds']:>8.1f}{r['memory_mb']:>10.1f}{r['mean_latency_seconds']:>10.3f}"
+              f"{r['tokens_per_second']:>10.1f}{r['exact_match']:>8.0%}{r['rouge_l_vs_reference']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
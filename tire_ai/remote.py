@@ -0,0 +1,411 @@
+"""拆分部署：Streamlit 前端进程不加载模型，通过本机 HTTP 或 Unix 套接字调用模型服务。
+
+设置 TIRE_AI_MODEL_SERVER（逗号分隔的多个副本地址）后，get_engine() 返回 RemoteEngine，
+接口与 TextOptimizationEngine 一致，各页面无需区分。后台线程定期检查各副本的 /health；
+每个请求发给排队最少的可用副本，连接失败时标记该副本不可用并换下一个副本重试。
+
+一键启动模型服务与多个前端见 tire_ai.launcher。
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from . import metrics
+from .adapters import DEFAULT_ADAPTER
+from .client import ApiError, ServiceUnavailable, health, iter_events, request_json
+from .engine import OptimizationResult
+from .prompts import normalize_instruction_type
+
+logger = logging.getLogger(__name__)
+
+_RESULT_FIELDS = (
+    "optimized_text", "instruction_type", "prompt_tokens", "generated_tokens", "elapsed_seconds", "cached",
+    "examples", "adapter", "number_issues",
+)
+
+
+@dataclass
+class Replica:
+    url: str
+    # unknown / loading / ok / down
+    status: str = "unknown"
+    queue_depth: int = 0
+    # 本进程发往该副本、尚未返回的请求数
+    inflight: int = 0
+    requests: int = 0
+    failures: int = 0
+    pid: int = None
+    error: str = ""
+    checked_at: float = 0.0
+
+
+class ReplicaPool:
+    """模型服务副本的健康状态与负载均衡。"""
+
+    def __init__(self, urls, health_interval=5.0, health_timeout=3.0):
+        urls = [u.strip().rstrip("/") for u in urls if u.strip()]
+        if not urls:
+            raise ValueError("至少需要一个模型服务地址")
+        self.replicas = [Replica(url) for url in urls]
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="replica-health", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_all()
+
+    def check_all(self):
+        for replica in self.replicas:
+            try:
+                status = health(replica.url, timeout=self.health_timeout)
+            except ApiError as exc:
+                self._mark_down(replica, exc)
+                continue
+            with self._lock:
+                if replica.status != status["status"]:
+                    logger.info("模型服务 %s 状态：%s", replica.url, status["status"])
+                replica.status = status["status"]
+                replica.queue_depth = status.get("queue_depth", 0)
+                replica.pid = status.get("pid")
+                replica.error = ""
+                replica.checked_at = time.time()
+
+    @property
+    def checked(self):
+        return any(r.checked_at for r in self.replicas)
+
+    def available(self):
+        return [r for r in self.replicas if r.status == "ok"]
+
+    def _mark_down(self, replica, exc):
+        with self._lock:
+            if replica.status != "down":
+                logger.warning("模型服务 %s 不可用：%s", replica.url, exc)
+            replica.status = "down"
+            replica.error = str(exc)
+            replica.failures += 1
+            replica.checked_at = time.time()
+
+    def _acquire(self, exclude=()):
+        for attempt in range(2):
+            with self._lock:
+                candidates = [r for r in self.replicas if r.status == "ok" and r.url not in exclude]
+                if candidates:
+                    # 服务端排队数每次健康检查更新，本进程在途请求数实时更新；负载相同时轮流分配
+                    replica = min(candidates, key=lambda r: (r.inflight + r.queue_depth, r.requests))
+                    replica.inflight += 1
+                    replica.requests += 1
+                    return replica
+            if attempt == 0:
+                # 没有可用副本时立即重新检查一次，不等下一轮健康检查
+                self.check_all()
+        raise ServiceUnavailable("没有可用的模型服务副本")
+
+    def _release(self, replica):
+        with self._lock:
+            replica.inflight -= 1
+
+    def call(self, fn):
+        """fn(url) 在选中的副本上执行；连接失败时换其他副本重试。"""
+        tried = set()
+        while True:
+            replica = self._acquire(tried)
+            try:
+                return fn(replica.url)
+            except ServiceUnavailable as exc:
+                self._mark_down(replica, exc)
+                tried.add(replica.url)
+            finally:
+                self._release(replica)
+
+    def stream(self, path, payload, timeout):
+        """逐条返回 SSE 事件；收到第一条事件之前连接失败时换其他副本重试。"""
+        tried = set()
+        while True:
+            replica = self._acquire(tried)
+            started = False
+            events = iter_events(replica.url, path, payload, timeout)
+            try:
+                for item in events:
+                    started = True
+                    yield item
+                return
+            except ServiceUnavailable as exc:
+                self._mark_down(replica, exc)
+                if started:
+                    raise
+                tried.add(replica.url)
+            finally:
+                # 调用方提前结束迭代时关闭连接，服务端随即停止生成
+                events.close()
+                self._release(replica)
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    "url": r.url,
+                    "status": r.status,
+                    "queue_depth": r.queue_depth,
+                    "inflight": r.inflight,
+                    "requests": r.requests,
+                    "failures": r.failures,
+                    "pid": r.pid,
+                    "error": r.error,
+                }
+                for r in self.replicas
+            ]
+
+
+def merge_stats(snapshots):
+    """合并各副本的统计：计数相加，命中率、接受率等比率按合计后的计数重新计算。"""
+    snapshots = [s for s in snapshots if s]
+    if not snapshots:
+        return None
+    if len(snapshots) == 1:
+        return snapshots[0]
+    merged = dict(snapshots[0])
+    for key in merged:
+        values = [s.get(key) for s in snapshots]
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            merged[key] = sum(values)
+    if "hits" in merged:
+        lookups = merged["hits"] + merged["misses"]
+        merged["hit_rate"] = merged["hits"] / lookups if lookups else 0.0
+    if "drafted" in merged:
+        merged["acceptance_rate"] = merged["accepted"] / merged["drafted"] if merged["drafted"] else 0.0
+        merged["tokens_per_forward"] = merged["tokens"] / merged["forwards"] if merged["forwards"] else 0.0
+    if "samples" in merged:
+        # 生成速度与首token延迟按各副本的样本数加权平均
+        for key in ("tokens_per_second", "time_to_first_token"):
+            pairs = [(s[key], s["samples"]) for s in snapshots if s.get(key) is not None]
+            weight = sum(n for _, n in pairs)
+            merged[key] = sum(v * n for v, n in pairs) / weight if weight else None
+        for key in ("last_tokens_per_second", "last_time_to_first_token"):
+            merged[key] = snapshots[0].get(key)
+    return merged
+
+
+class _RemoteStats:
+    """让 engine.cache.stats() / engine.prefix_cache.stats() 的调用方式在拆分部署下不变。"""
+
+    def __init__(self, engine, name):
+        self._engine = engine
+        self._name = name
+
+    def stats(self):
+        return merge_stats([s[self._name] for s in self._engine.snapshots()])
+
+
+class RemoteTokenStream:
+    """远程流式生成句柄，接口与 TokenStream 一致；结束后的统计取自服务端的 done 事件。"""
+
+    cached = False
+
+    def __init__(self, events, instruction_type):
+        self._events = events
+        self._stop = threading.Event()
+        self._finished = False
+        self.instruction_type = instruction_type
+        self.prompt_tokens = 0
+        self.generated_tokens = 0
+        self.start_time = time.perf_counter()
+        self.time_to_first_token = None
+        self.tokens_per_second = 0.0
+        self.elapsed_seconds = 0.0
+        self.error = None
+        self.examples = []
+        self.adapter = DEFAULT_ADAPTER
+        self.number_issues = []
+        self.text = ""
+        # 服务端规则后处理过的最终文本
+        self._optimized_text = None
+
+    @property
+    def cancelled(self):
+        return self._stop.is_set()
+
+    def cancel(self):
+        # 关闭连接后服务端随即停止生成
+        self._stop.set()
+
+    def __iter__(self):
+        if self._finished:
+            return
+        try:
+            for event, data in self._events:
+                if event == "error":
+                    self.error = ApiError(data["error"])
+                    break
+                if event == "done":
+                    self._finish(data)
+                    break
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - self.start_time
+                self.text += data["delta"]
+                yield data["delta"]
+                if self._stop.is_set():
+                    break
+        finally:
+            self._events.close()
+            self._finished = True
+            self.elapsed_seconds = time.perf_counter() - self.start_time
+        if self.error is not None:
+            raise self.error
+
+    def _finish(self, data):
+        self.cached = data.get("cached", False)
+        self.prompt_tokens = data.get("prompt_tokens", 0)
+        self.generated_tokens = data.get("generated_tokens", 0)
+        self.examples = data.get("examples", [])
+        self.adapter = data.get("adapter", DEFAULT_ADAPTER)
+        self.number_issues = data.get("number_issues", [])
+        self._optimized_text = data.get("optimized_text")
+        self.tokens_per_second = data.get("tokens_per_second") or 0.0
+        # 首token延迟以服务端计时为准，与进程内引擎的口径一致
+        if data.get("time_to_first_token") is not None:
+            self.time_to_first_token = data["time_to_first_token"]
+
+    def result(self):
+        for _ in self:
+            pass
+        return OptimizationResult(
+            optimized_text=self._optimized_text if self._optimized_text is not None else self.text.strip(),
+            instruction_type=self.instruction_type,
+            prompt_tokens=self.prompt_tokens,
+            generated_tokens=self.generated_tokens,
+            elapsed_seconds=self.elapsed_seconds,
+            cached=self.cached,
+            examples=self.examples,
+            adapter=self.adapter,
+            number_issues=self.number_issues,
+        )
+
+
+class RemoteEngine:
+    """与 TextOptimizationEngine 接口一致的远程引擎，模型权重只在模型服务进程中。"""
+
+    def __init__(self, urls, health_interval=5.0, timeout=600, load_timeout=600):
+        self.pool = ReplicaPool(urls, health_interval).start()
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        self._snapshots = []
+        self._snapshot_at = 0.0
+        self._snapshot_lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        if not self.pool.checked:
+            self.pool.check_all()
+        return bool(self.pool.available())
+
+    def load(self):
+        """等待至少一个副本加载完模型。"""
+        deadline = time.monotonic() + self.load_timeout
+        while not self.loaded:
+            if time.monotonic() > deadline:
+                states = "，".join(f"{r['url']} {r['status']}" for r in self.pool.stats())
+                raise ServiceUnavailable(f"模型服务未就绪：{states}")
+            time.sleep(1)
+            self.pool.check_all()
+        return self
+
+    def snapshots(self):
+        """各可用副本的 /api/v1/engine 统计，1秒内重复调用直接复用。"""
+        with self._snapshot_lock:
+            if time.monotonic() - self._snapshot_at > 1.0:
+                snapshots = []
+                for replica in self.pool.available():
+                    try:
+                        snapshots.append(request_json(replica.url, "GET", "/api/v1/engine", timeout=10))
+                    except ApiError as exc:
+                        logger.warning("读取模型服务 %s 的统计失败：%s", replica.url, exc)
+                self._snapshots = snapshots
+                self._snapshot_at = time.monotonic()
+            return self._snapshots
+
+    def info(self):
+        snapshots = self.snapshots()
+        if not snapshots:
+            raise ServiceUnavailable("没有可用的模型服务副本")
+        info = dict(snapshots[0]["info"])
+        info["model_server"] = self.pool.stats()
+        return info
+
+    def generation_stats(self):
+        return merge_stats([s["generation"] for s in self.snapshots()])
+
+    def speculative_stats(self):
+        return merge_stats([s["speculative"] for s in self.snapshots()])
+
+    @property
+    def cache(self):
+        if not any(s["cache"] for s in self.snapshots()):
+            return None
+        return _RemoteStats(self, "cache")
+
+    @property
+    def prefix_cache(self):
+        return _RemoteStats(self, "prefix_cache")
+
+    def _request(self, path, payload):
+        start = time.perf_counter()
+        try:
+            return self.pool.call(lambda url: request_json(url, "POST", path, payload, self.timeout))
+        finally:
+            metrics.observe("model_server_request", time.perf_counter() - start)
+
+    def optimize_batch(self, texts, instruction_types=None, use_cache=True, few_shot=None, categories=None,
+                       **generation_kwargs):
+        if generation_kwargs:
+            raise TypeError(f"模型服务不支持自定义生成参数：{', '.join(generation_kwargs)}")
+        if instruction_types is None:
+            instruction_types = ["分类型"] * len(texts)
+        if categories is None:
+            categories = [None] * len(texts)
+        documents = [
+            {"text": text, "instruction_type": t, "category": c, "few_shot": few_shot, "use_cache": use_cache}
+            for text, t, c in zip(texts, instruction_types, categories)
+        ]
+        if not documents:
+            return []
+        results = self._request("/api/v1/text-optimization/batch", {"documents": documents})["results"]
+        return [OptimizationResult(**{k: r[k] for k in _RESULT_FIELDS if k in r}) for r in results]
+
+    def optimize(self, text, instruction_type="分类型", use_cache=True, few_shot=None, category=None,
+                 **generation_kwargs):
+        return self.optimize_batch(
+            [text], [instruction_type], use_cache, few_shot, [category], **generation_kwargs
+        )[0]
+
+    def stream(self, text, instruction_type="分类型", use_cache=True, few_shot=None, category=None,
+               **generation_kwargs):
+        if generation_kwargs:
+            raise TypeError(f"模型服务不支持自定义生成参数：{', '.join(generation_kwargs)}")
+        payload = {
+            "text": text,
+            "instruction_type": instruction_type,
+            "category": category,
+            "few_shot": few_shot,
+            "use_cache": use_cache,
+        }
+        events = self.pool.stream("/api/v1/text-optimization/stream", payload, self.timeout)
+        return RemoteTokenStream(events, normalize_instruction_type(instruction_type))
+
+    def label_probabilities(self, texts, labels):
+        payload = {"texts": list(texts), "labels": list(labels)}
+        return self._request("/api/v1/label-probabilities", payload)["probabilities"]
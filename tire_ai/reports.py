@@ -0,0 +1,365 @@
+"""报告引擎：根据实际优化结果与评估指标生成 Markdown / DOCX / PDF 报告。
+
+报告内容先整理成普通 dict（可 JSON 序列化），文件名取内容哈希：输入不变时直接复用磁盘上的文件，
+输入变化后自动生成新文件。渲染作为后台任务提交到 jobs 模块的共享线程池，页面只轮询状态，不阻塞下载按钮。
+
+DOCX 依赖 python-docx，PDF 依赖 reportlab（使用内置 CJK 字体 STSong-Light，无需额外字体文件）。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from xml.sax.saxutils import escape
+
+from . import metrics
+from .client import DEFAULT_API_URL
+from .jobs import Job, get_job, submit
+
+DEFAULT_REPORT_DIR = "./outputs/reports"
+DEFAULT_TITLE = "轮胎制造业AI优化报告"
+REPORT_SECTIONS = ("优化前后对比", "评估指标", "专家评价", "API接口文档", "使用建议")
+REPORT_FORMATS = {
+    "md": ("Markdown", "text/markdown"),
+    "docx": ("Word", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    "pdf": ("PDF", "application/pdf"),
+}
+# 渲染逻辑变化时递增，使旧的缓存文件失效
+RENDERER_VERSION = 1
+
+METRIC_LABELS = {
+    "rouge_l": "ROUGE-L",
+    "bleu": "BLEU",
+    "semantic_similarity": "语义相似度",
+    "generated_tokens": "生成token数",
+    "tokens_per_second": "tokens/s",
+}
+
+EXPERT_REVIEW = (
+    "经过5位轮胎制造业专家的综合评估，模型生成的技术文档在专业术语使用和视角转换方面表现优秀。"
+    "生成文本保持了原始技术信息的准确性，同时增强了可读性和客户友好度。"
+)
+
+USAGE_TIPS = (
+    "对于不同类型的文档，建议选择相应的Instruction类型",
+    "定期更新微调数据，以提高模型在特定场景下的表现",
+    "结合人工审核，确保最终输出符合企业标准",
+    "考虑建立多级审核流程，提高文档质量",
+)
+
+API_EXAMPLE = f"""import requests
+
+url = "{DEFAULT_API_URL}/api/v1/text-optimization"
+data = {{
+    "text": "需要优化的技术文档内容",
+    "instruction_type": "分类型"
+}}
+
+response = requests.post(url, json=data)
+print(response.json()["optimized_text"])"""
+
+
+def build_report(sections, documents=(), evaluation=None, title=DEFAULT_TITLE):
+    """整理报告内容。documents 为包含 original_text / optimized_text / instruction_type 及可选指标的 dict。"""
+    sections = [s for s in REPORT_SECTIONS if s in sections]
+    docs = []
+    for doc in documents:
+        item = {
+            "original_text": doc.get("original_text", ""),
+            "optimized_text": doc.get("optimized_text", ""),
+            "instruction_type": doc.get("instruction_type", ""),
+        }
+        item["metrics"] = {
+            key: doc[key] for key in METRIC_LABELS if doc.get(key) is not None
+        }
+        docs.append(item)
+    report = {"title": title, "sections": sections, "documents": docs, "evaluation": None}
+    if evaluation:
+        report["evaluation"] = {
+            "checkpoint": evaluation.get("checkpoint", ""),
+            "samples": evaluation.get("samples", 0),
+            "scores": {key: evaluation[key] for key in ("rouge_l", "bleu", "semantic_similarity") if key in evaluation},
+        }
+    return report
+
+
+def report_key(report):
+    payload = json.dumps(report, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(f"{RENDERER_VERSION}\x1f{payload}".encode("utf-8")).hexdigest()[:16]
+
+
+def _document_averages(report):
+    totals = {}
+    for doc in report["documents"]:
+        for key, value in doc["metrics"].items():
+            totals.setdefault(key, []).append(value)
+    return {key: sum(values) / len(values) for key, values in totals.items()}
+
+
+def _format_metric(key, value):
+    if key in ("rouge_l", "bleu", "semantic_similarity"):
+        return f"{value:.3f}"
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
+
+
+def _metric_rows(report):
+    """评估指标表格：(指标, 数值, 来源)。"""
+    rows = []
+    evaluation = report["evaluation"]
+    if evaluation:
+        for key, value in evaluation["scores"].items():
+            rows.append((METRIC_LABELS[key], _format_metric(key, value),
+                         f"测试集评估 {evaluation['checkpoint']}（{evaluation['samples']}条）"))
+    for key, value in _document_averages(report).items():
+        rows.append((METRIC_LABELS[key], _format_metric(key, value), f"本报告{len(report['documents'])}篇文档平均"))
+    return rows
+
+
+# ---------------------------------------------------------------- Markdown
+
+def iter_markdown(report, max_documents=None):
+    """逐段生成 Markdown 文本，写文件时不需要把整份报告拼接在内存中。"""
+    yield f"# {report['title']}\n\n"
+    yield f"生成时间：{time.strftime('%Y-%m-%d %H:%M')}\n\n"
+    for section in report["sections"]:
+        yield f"## {section}\n\n"
+        if section == "优化前后对比":
+            documents = report["documents"]
+            if not documents:
+                yield "暂无优化结果。\n\n"
+            shown = documents if max_documents is None else documents[:max_documents]
+            for i, doc in enumerate(shown, 1):
+                yield f"### 文档{i}（{doc['instruction_type'] or '未标注'}）\n\n"
+                yield "**原始文档**\n\n" + _quote(doc["original_text"]) + "\n\n"
+                yield "**优化后文档**\n\n" + _quote(doc["optimized_text"]) + "\n\n"
+                if doc["metrics"]:
+                    yield " · ".join(f"{METRIC_LABELS[k]}: {_format_metric(k, v)}" for k, v in doc["metrics"].items())
+                    yield "\n\n"
+            if len(shown) < len(documents):
+                yield f"……其余 {len(documents) - len(shown)} 篇见完整报告文件\n\n"
+        elif section == "评估指标":
+            rows = _metric_rows(report)
+            if not rows:
+                yield "暂无评估结果，请先在模块5运行自动评估。\n\n"
+                continue
+            yield "| 指标 | 得分 | 来源 |\n|------|------|------|\n"
+            for name, value, source in rows:
+                yield f"| {name} | {value} | {source} |\n"
+            yield "\n"
+        elif section == "专家评价":
+            yield EXPERT_REVIEW + "\n\n"
+        elif section == "API接口文档":
+            yield "```python\n" + API_EXAMPLE + "\n```\n\n"
+        elif section == "使用建议":
+            for i, tip in enumerate(USAGE_TIPS, 1):
+                yield f"{i}. {tip}\n"
+            yield "\n"
+
+
+def _quote(text):
+    return "\n".join("> " + line for line in (text or "").splitlines() or [""])
+
+
+def render_markdown(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in iter_markdown(report):
+            f.write(chunk)
+
+
+# ---------------------------------------------------------------- DOCX
+
+def render_docx(report, path):
+    try:
+        from docx import Document
+        from docx.oxml.ns import qn
+    except ImportError as exc:
+        raise RuntimeError("生成Word报告需要安装 python-docx：pip install python-docx") from exc
+
+    document = Document()
+    normal = document.styles["Normal"]
+    normal.font.name = "宋体"
+    normal.element.rPr.rFonts.set(qn("w:eastAsia"), "宋体")
+
+    document.add_heading(report["title"], level=0)
+    document.add_paragraph(f"生成时间：{time.strftime('%Y-%m-%d %H:%M')}")
+    for section in report["sections"]:
+        document.add_heading(section, level=1)
+        if section == "优化前后对比":
+            if not report["documents"]:
+                document.add_paragraph("暂无优化结果。")
+            for i, doc in enumerate(report["documents"], 1):
+                document.add_heading(f"文档{i}（{doc['instruction_type'] or '未标注'}）", level=2)
+                table = document.add_table(rows=2, cols=2)
+                table.style = "Table Grid"
+                table.cell(0, 0).text = "原始文档"
+                table.cell(0, 1).text = "优化后文档"
+                table.cell(1, 0).text = doc["original_text"]
+                table.cell(1, 1).text = doc["optimized_text"]
+                if doc["metrics"]:
+                    document.add_paragraph(
+                        " · ".join(f"{METRIC_LABELS[k]}: {_format_metric(k, v)}" for k, v in doc["metrics"].items())
+                    )
+        elif section == "评估指标":
+            rows = _metric_rows(report)
+            if not rows:
+                document.add_paragraph("暂无评估结果，请先在模块5运行自动评估。")
+                continue
+            table = document.add_table(rows=1, cols=3)
+            table.style = "Table Grid"
+            for cell, text in zip(table.rows[0].cells, ("指标", "得分", "来源")):
+                cell.text = text
+            for row in rows:
+                for cell, text in zip(table.add_row().cells, row):
+                    cell.text = text
+        elif section == "专家评价":
+            document.add_paragraph(EXPERT_REVIEW)
+        elif section == "API接口文档":
+            paragraph = document.add_paragraph()
+            run = paragraph.add_run(API_EXAMPLE)
+            run.font.name = "Consolas"
+        elif section == "使用建议":
+            for tip in USAGE_TIPS:
+                document.add_paragraph(tip, style="List Number")
+    document.save(path)
+
+
+# ---------------------------------------------------------------- PDF
+
+def render_pdf(report, path):
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+        from reportlab.lib.units import mm
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+        from reportlab.platypus import Paragraph, Preformatted, SimpleDocTemplate, Spacer, Table, TableStyle
+    except ImportError as exc:
+        raise RuntimeError("生成PDF报告需要安装 reportlab：pip install reportlab") from exc
+
+    font = "STSong-Light"
+    pdfmetrics.registerFont(UnicodeCIDFont(font))
+    base = getSampleStyleSheet()
+    body = ParagraphStyle("body", parent=base["BodyText"], fontName=font, fontSize=10, leading=15, wordWrap="CJK")
+    h0 = ParagraphStyle("h0", parent=base["Title"], fontName=font)
+    h1 = ParagraphStyle("h1", parent=base["Heading1"], fontName=font, fontSize=15)
+    h2 = ParagraphStyle("h2", parent=base["Heading2"], fontName=font, fontSize=12)
+    code = ParagraphStyle("code", parent=body, fontSize=8.5, leading=12, backColor=colors.whitesmoke)
+    grid = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#eef0fb")),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ])
+
+    def para(text, style=body):
+        return Paragraph(escape(text or "").replace("\n", "<br/>"), style)
+
+    def flowables():
+        yield para(report["title"], h0)
+        yield para(f"生成时间：{time.strftime('%Y-%m-%d %H:%M')}")
+        for section in report["sections"]:
+            yield para(section, h1)
+            if section == "优化前后对比":
+                if not report["documents"]:
+                    yield para("暂无优化结果。")
+                for i, doc in enumerate(report["documents"], 1):
+                    yield para(f"文档{i}（{doc['instruction_type'] or '未标注'}）", h2)
+                    table = Table(
+                        [[para("原始文档"), para("优化后文档")],
+                         [para(doc["original_text"]), para(doc["optimized_text"])]],
+                        colWidths=[85 * mm, 85 * mm],
+                    )
+                    table.setStyle(grid)
+                    yield table
+                    if doc["metrics"]:
+                        yield para(" · ".join(
+                            f"{METRIC_LABELS[k]}: {_format_metric(k, v)}" for k, v in doc["metrics"].items()
+                        ))
+                    yield Spacer(1, 4 * mm)
+            elif section == "评估指标":
+                rows = _metric_rows(report)
+                if not rows:
+                    yield para("暂无评估结果，请先在模块5运行自动评估。")
+                    continue
+                table = Table(
+                    [[para(c) for c in ("指标", "得分", "来源")]] + [[para(c) for c in row] for row in rows],
+                    colWidths=[35 * mm, 30 * mm, 105 * mm],
+                )
+                table.setStyle(grid)
+                yield table
+            elif section == "专家评价":
+                yield para(EXPERT_REVIEW)
+            elif section == "API接口文档":
+                yield Preformatted(API_EXAMPLE, code)
+            elif section == "使用建议":
+                for i, tip in enumerate(USAGE_TIPS, 1):
+                    yield para(f"{i}. {tip}")
+
+    doc = SimpleDocTemplate(path, pagesize=A4, title=report["title"],
+                            leftMargin=18 * mm, rightMargin=18 * mm, topMargin=18 * mm, bottomMargin=18 * mm)
+    doc.build(list(flowables()))
+
+
+_RENDERERS = {"md": render_markdown, "docx": render_docx, "pdf": render_pdf}
+
+
+def render_report(report, fmt, path):
+    """渲染到临时文件后再改名，缓存目录中不会出现写了一半的报告。"""
+    if fmt not in _RENDERERS:
+        raise ValueError(f"不支持的报告格式：{fmt}")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with metrics.timed("report_render"):
+            _RENDERERS[fmt](report, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class ReportJob(Job):
+    """一个格式的报告渲染任务，在共享任务注册表中登记；相同内容与格式正在渲染时复用同一个任务。"""
+
+    def __init__(self, key, fmt, path):
+        super().__init__("report", dedupe_key=f"{key}.{fmt}")
+        self.key = key
+        self.fmt = fmt
+        self.path = path
+        self.cached = False
+
+    @property
+    def file_name(self):
+        return f"{DEFAULT_TITLE}.{self.fmt}"
+
+    @property
+    def mime(self):
+        return REPORT_FORMATS[self.fmt][1]
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+def _render_report_job(job, report):
+    if os.path.isfile(job.path):
+        job.cached = True
+        return job.path
+    job.check_cancelled()
+    return render_report(report, job.fmt, job.path)
+
+
+def submit_report(report, fmt, output_dir=DEFAULT_REPORT_DIR):
+    """提交后台渲染，返回 ReportJob；相同内容正在生成时直接复用，已生成过时直接读取磁盘上的文件。"""
+    os.makedirs(output_dir, exist_ok=True)
+    key = report_key(report)
+    path = os.path.join(output_dir, f"report-{key}.{fmt}")
+    return submit(ReportJob(key, fmt, path), _render_report_job, report)
+
+
+def get_report_job(job_id):
+    job = get_job(job_id)
+    return job if isinstance(job, ReportJob) else None
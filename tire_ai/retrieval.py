@@ -0,0 +1,192 @@
+"""相似案例检索：案例库原文的向量索引，为文本优化提供 few-shot 示例。
+
+索引为平铺（flat）的 float32 矩阵，以原始二进制文件追加写入，查询时按内存映射读取：
+    vectors.f32   每行一个 L2 归一化向量
+    keys.jsonl    与向量逐行对应的 case_key
+    meta.json     向量化方法、维度、已同步到的案例库 id
+
+案例库中新增或更新的案例（REPLACE 后 id 变大）只需追加对应的向量，无需重建整个索引；
+同一 case_key 出现多次时以最后一行为准。
+
+    python -m tire_ai.retrieval sync
+    python -m tire_ai.retrieval search "硫化温度提升到155度"
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from . import metrics
+from .case_store import get_case_store
+from .embeddings import HashingEmbedder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = "./outputs/retrieval"
+
+
+class CaseIndex:
+    def __init__(self, directory=DEFAULT_INDEX_DIR, embedder=None):
+        self.directory = directory
+        self.embedder = embedder or HashingEmbedder()
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.jsonl")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def size(self):
+        return int(self._active.sum())
+
+    def _meta(self):
+        return {"embedder": self.embedder.name, "dim": self.embedder.dim, "last_id": self.last_id}
+
+    def _load(self):
+        meta = {}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta and (meta.get("embedder"), meta.get("dim")) != (self.embedder.name, self.embedder.dim):
+            logger.warning("向量化方法或维度已变化，重建检索索引")
+            meta = {}
+        if not meta:
+            self._reset_files()
+        self.last_id = meta.get("last_id", 0)
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, encoding="utf-8") as f:
+                keys = [json.loads(line) for line in f if line.strip()]
+        # 追加写入中断时两个文件的行数可能不一致，以较短者为准
+        rows = min(len(keys), os.path.getsize(self.vectors_path) // (4 * self.embedder.dim))
+        self.keys = keys[:rows]
+        self._map()
+
+    def _reset_files(self):
+        open(self.vectors_path, "wb").close()
+        open(self.keys_path, "w", encoding="utf-8").close()
+        self.last_id = 0
+        self._write_meta()
+
+    def _write_meta(self):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._meta(), f)
+        os.replace(tmp, self.meta_path)
+
+    def _map(self):
+        rows = len(self.keys)
+        if rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dim))
+        else:
+            self._vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        latest = {key: row for row, key in enumerate(self.keys)}
+        self._active = np.zeros(rows, dtype=bool)
+        self._active[list(latest.values())] = True
+
+    def add(self, items, last_id=None):
+        """追加 (case_key, 原文) 的向量；last_id 为这批案例在案例库中的最大 id。"""
+        items = list(items)
+        if not items:
+            return 0
+        vectors = self.embedder.embed([text for _, text in items]).astype(np.float32)
+        with self._lock:
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.keys_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(key, ensure_ascii=False) + "\n" for key, _ in items)
+            self.keys.extend(key for key, _ in items)
+            if last_id is not None:
+                self.last_id = max(self.last_id, last_id)
+            self._write_meta()
+            self._map()
+        return len(items)
+
+    def sync(self, store, batch_size=2000):
+        """把案例库中 id 大于 last_id 的案例追加进索引，返回新增的向量数。"""
+        if store.max_id() < self.last_id:
+            # 案例库被重建过，旧索引中的行号已经对不上
+            with self._lock:
+                self._reset_files()
+                self.keys = []
+                self._map()
+        added = 0
+        for rows in store.iter_since(self.last_id, batch_size):
+            added += self.add([(row["case_key"], row["original_text"]) for row in rows], last_id=rows[-1]["id"])
+        if added:
+            logger.info("检索索引新增 %d 条，共 %d 条", added, self.size)
+        return added
+
+    def search(self, text, k=3):
+        """返回与 text 最相近的 k 个 (case_key, 余弦相似度)，按相似度降序。"""
+        query = self.embedder.embed([text])[0]
+        with self._lock:
+            vectors, active, keys = self._vectors, self._active, self.keys
+        if not len(keys) or k <= 0:
+            return []
+        with metrics.timed("retrieval"):
+            scores = np.where(active, vectors @ query, -np.inf)
+            k = min(k, int(active.sum()))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+        return [(keys[row], float(scores[row])) for row in top]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_case_index():
+    """进程级共享检索索引，目录由 TIRE_AI_RETRIEVAL_DIR 指定。"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CaseIndex(os.environ.get("TIRE_AI_RETRIEVAL_DIR", DEFAULT_INDEX_DIR))
+    return _index
+
+
+def retrieve_examples(text, k=2, instruction_type=None):
+    """检索与 text 相似的已审核案例，优先返回相同 Instruction 类型的案例；与输入原文相同的案例不作为示例。"""
+    if k <= 0:
+        return []
+    store = get_case_store()
+    index = get_case_index()
+    # 每次检索前同步一次：刚审核入库的案例立即可用，没有新案例时只是一次主键查询
+    index.sync(store)
+    candidates = []
+    for key, score in index.search(text, k * 4):
+        case = store.get_case(key)
+        if case is None or not case["optimized_text"] or case["original_text"].strip() == text.strip():
+            continue
+        candidates.append(dict(case, case_key=key, score=score))
+    if instruction_type:
+        candidates.sort(key=lambda case: case["instruction_type"] != instruction_type)
+    return candidates[:k]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="相似案例检索索引")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="把案例库的新增案例追加到索引")
+    search = sub.add_parser("search", help="检索相似案例")
+    search.add_argument("text")
+    search.add_argument("-k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "sync":
+        index = get_case_index()
+        added = index.sync(get_case_store())
+        print(json.dumps({"added": added, "size": index.size}, ensure_ascii=False))
+    else:
+        for case in retrieve_examples(args.text, args.k):
+            print(f"{case['score']:.3f}\t{case['case_key']}\t{case['title']}")
+
+
+if __name__ == "__main__":
+    main()
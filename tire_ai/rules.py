@@ -0,0 +1,208 @@
+"""确定性的规则处理：单位规范化、轮胎规格展开与数值校验。
+
+案例中相当一部分改写是机械性的："150度"→"150℃"、"载重指数95"→"载重指数：95（690kg）"、
+"速度级别H"→"速度级别：H（210km/h）"。这些由规则完成，不依赖模型：
+
+    normalize_text   生成前处理输入、生成后处理输出，全部规则合并为一个预编译正则，单次扫描完成
+    check_numbers    对比原文与输出中的数值（含单位），列出缺失、新增与被改动的数值
+
+规则是幂等的，已展开的内容不会重复展开。单篇文档的处理耗时在数十微秒量级：
+    python -m tire_ai.rules                  # 在 tire_cases_data 上运行并计时
+    python -m tire_ai.rules "载重指数95，速度级别H" --output "载重指数：96"
+"""
+
+import argparse
+import re
+import time
+from decimal import Decimal, InvalidOperation
+
+# 载重指数（ETRTO/ISO 4223）对应的单胎最大负荷（kg）
+LOAD_INDEX_KG = {
+    50: 190, 51: 195, 52: 200, 53: 206, 54: 212, 55: 218, 56: 224, 57: 230, 58: 236, 59: 243,
+    60: 250, 61: 257, 62: 265, 63: 272, 64: 280, 65: 290, 66: 300, 67: 307, 68: 315, 69: 325,
+    70: 335, 71: 345, 72: 355, 73: 365, 74: 375, 75: 387, 76: 400, 77: 412, 78: 425, 79: 437,
+    80: 450, 81: 462, 82: 475, 83: 487, 84: 500, 85: 515, 86: 530, 87: 545, 88: 560, 89: 580,
+    90: 600, 91: 615, 92: 630, 93: 650, 94: 670, 95: 690, 96: 710, 97: 730, 98: 750, 99: 775,
+    100: 800, 101: 825, 102: 850, 103: 875, 104: 900, 105: 925, 106: 950, 107: 975, 108: 1000, 109: 1030,
+    110: 1060, 111: 1090, 112: 1120, 113: 1150, 114: 1180, 115: 1215, 116: 1250, 117: 1285, 118: 1320,
+    119: 1360, 120: 1400, 121: 1450, 122: 1500, 123: 1550, 124: 1600, 125: 1650, 126: 1700, 127: 1750,
+    128: 1800, 129: 1850, 130: 1900, 131: 1950, 132: 2000, 133: 2060, 134: 2120, 135: 2180, 136: 2240,
+    137: 2300, 138: 2360, 139: 2430, 140: 2500, 141: 2575, 142: 2650, 143: 2725, 144: 2800, 145: 2900,
+    146: 3000, 147: 3075, 148: 3150, 149: 3250, 150: 3350,
+}
+
+# 速度级别对应的最高速度（km/h）
+SPEED_SYMBOL_KMH = {
+    "J": 100, "K": 110, "L": 120, "M": 130, "N": 140, "P": 150, "Q": 160, "R": 170, "S": 180,
+    "T": 190, "U": 200, "H": 210, "V": 240, "W": 270, "Y": 300,
+}
+
+_NUMBER = r"[±+\-]?\d+(?:\.\d+)?"
+_SIZE = r"\d{3}/\d{2}Z?R\d{2}(?:\.\d)?"
+_SPEED = "[" + "".join(SPEED_SYMBOL_KMH) + "]"
+
+# 全部规则合并为一个正则，按分组名分派；已展开的内容后面紧跟括号，由否定前瞻跳过
+_RULES = re.compile("|".join((
+    # 规格后的使用条件：215/60R16 95H
+    rf"(?P<size>{_SIZE})\s+(?P<service_load>\d{{2,3}})(?P<service_speed>{_SPEED})(?![A-Za-z0-9（(])",
+    rf"(?P<load_label>载重指数|负荷指数)[：:]?\s*(?P<load>\d{{2,3}})(?![\d.]|\s*[（(])",
+    rf"(?P<speed_label>速度级别|速度等级|速度符号)[：:]?\s*(?P<speed>{_SPEED})(?![A-Za-z]|\s*[（(])",
+    rf"(?P<celsius>{_NUMBER})\s*(?:摄氏度|°[Cc]|℃)",
+    # "度"也用于硬度、角度、电量（kWh）等，只在紧挨着温度词时换成℃，见 _is_temperature
+    rf"(?P<degree>{_NUMBER})\s*度(?!数)",
+)))
+# 判断"度"的含义时只看数字所在的短句；顿号只在并列的数值之外作为分隔
+_SEGMENT_DELIMITERS = "，,。；;！!？?\n"
+_TEMPERATURE_WORDS = ("温", "热", "冷")
+_NON_TEMPERATURE_WORDS = ("硬度", "角", "坡", "倾斜", "弧", "电")
+# 数字前紧挨着的并列数值："温度150度、160度和170度"中后两个数值沿用第一个数值前的关键词
+_ENUMERATION = re.compile(rf"(?:{_NUMBER}\s*(?:度|℃)?\s*[、和及或至到~～—\-]\s*)+$")
+
+_UNITS = ("km/h", "kPa", "MPa", "psi", "bar", "mm", "cm", "kg", "英寸", "分钟", "小时", "℃", "度", "%", "秒", "天", "m")
+_NUMBER_TOKENS = re.compile(
+    rf"(?P<size>{_SIZE})|(?P<value>{_NUMBER})\s*(?P<unit>{'|'.join(re.escape(u) for u in _UNITS)})?"
+)
+# 输出常把要点改写成"1）""2、"这样的编号，编号不是原文数值
+_LIST_MARKER = re.compile(r"[)）、.]")
+
+
+def _is_temperature(match):
+    """数字所在短句中离它最近的关键词是温度词时才是温度："硫化温度从150度提升到155度"、"温度150度、160度和170度"、
+    "150度高温下硫化"都是，"邵氏硬度65度"、"夹角30度"、"耗电100度"、"100度电"都不是。
+
+    先看数字前的关键词（跳过并列的数值），数字前没有关键词时再看数字后的。
+    """
+    text = match.string
+    if text[match.end():match.end() + 1] in ("角", "电"):
+        return False
+    start = max(text.rfind(d, 0, match.start()) for d in _SEGMENT_DELIMITERS) + 1
+    before = text[start:match.start()]
+    enumeration = _ENUMERATION.search(before)
+    if enumeration is not None:
+        before = before[:enumeration.start()]
+    before = before[before.rfind("、") + 1:]
+    temperature = max(before.rfind(w) for w in _TEMPERATURE_WORDS)
+    other = max(before.rfind(w) for w in _NON_TEMPERATURE_WORDS)
+    if temperature != other:
+        return temperature > other
+    end = min((i for i in (text.find(d, match.end()) for d in _SEGMENT_DELIMITERS + "、") if i >= 0), default=len(text))
+    after = text[match.end():end]
+    temperature = min((after.find(w) for w in _TEMPERATURE_WORDS if w in after), default=-1)
+    other = min((after.find(w) for w in _NON_TEMPERATURE_WORDS if w in after), default=-1)
+    return temperature >= 0 and (other < 0 or temperature < other)
+
+
+def _replace(match):
+    group = match.lastgroup
+    if group == "service_speed":
+        load, speed = int(match["service_load"]), match["service_speed"]
+        if load not in LOAD_INDEX_KG:
+            return match[0]
+        return (f"{match['size']} {load}{speed}"
+                f"（载重{LOAD_INDEX_KG[load]}kg，速度{SPEED_SYMBOL_KMH[speed]}km/h）")
+    if group == "load":
+        load = int(match["load"])
+        if load not in LOAD_INDEX_KG:
+            return match[0]
+        return f"{match['load_label']}：{load}（{LOAD_INDEX_KG[load]}kg）"
+    if group == "speed":
+        return f"{match['speed_label']}：{match['speed']}（{SPEED_SYMBOL_KMH[match['speed']]}km/h）"
+    if group == "celsius":
+        return f"{match['celsius']}℃"
+    if _is_temperature(match):
+        return f"{match['degree']}℃"
+    return match[0]
+
+
+def normalize_text(text):
+    """单位规范化与载重指数、速度级别展开；对已处理过的文本再次调用结果不变。"""
+    return _RULES.sub(_replace, text)
+
+
+def _canonical(value):
+    sign = value[0] if value[0] in "±+-" else ""
+    try:
+        number = Decimal(value.lstrip("±+-")).normalize()
+    except InvalidOperation:
+        return value
+    return sign + f"{number:f}"
+
+
+def extract_numbers(text):
+    """文本中的数值（含单位与±号），规格如 215/60R16 作为一个整体；返回按出现顺序排列的列表。"""
+    numbers = []
+    for match in _NUMBER_TOKENS.finditer(text):
+        if match["size"]:
+            numbers.append(match["size"])
+        elif match["unit"] or not _LIST_MARKER.match(text, match.end()):
+            numbers.append(_canonical(match["value"]) + (match["unit"] or ""))
+    return numbers
+
+
+def _unit(token):
+    return re.sub(r"^[±+\-]?[\d.]+", "", token)
+
+
+def _same_value(token):
+    # 规则无法判断的"N度"保留原样，模型改写成"N℃"时数值不变，比较时视为同一数值
+    return token[:-1] + "℃" if token.endswith("度") else token
+
+
+def check_numbers(source, output):
+    """对比原文与输出中的数值，返回问题列表（空列表表示数值一致）。
+
+    原文的载重指数、速度级别展开得到的负荷与速度也视为原文数值，"N度"与"N℃"视为同一数值；
+    同一单位下一个数值缺失、另一个数值新增时记为"数值改动"。
+    """
+    expected = extract_numbers(normalize_text(source))
+    produced = extract_numbers(output)
+    expected_values = {_same_value(n) for n in expected}
+    produced_values = {_same_value(n) for n in produced}
+    missing = [n for n in dict.fromkeys(expected) if _same_value(n) not in produced_values]
+    added = [n for n in dict.fromkeys(produced) if _same_value(n) not in expected_values]
+    issues = []
+    for number in list(missing):
+        # 无单位的数值（如序号）容易误配，只在有单位时判定为改动
+        unit = _unit(_same_value(number))
+        replacement = next((n for n in added if unit and _unit(_same_value(n)) == unit), None)
+        if replacement is not None:
+            issues.append(f"数值改动：{number} → {replacement}")
+            missing.remove(number)
+            added.remove(replacement)
+    issues += [f"缺少数值：{n}" for n in missing]
+    issues += [f"新增数值：{n}" for n in added]
+    return issues
+
+
+def main(argv=None):
+    from .cases import tire_cases_data
+
+    parser = argparse.ArgumentParser(description="规则处理：单位规范化、规格展开与数值校验")
+    parser.add_argument("text", nargs="?", help="要处理的文本，省略时在内置案例上运行")
+    parser.add_argument("--output", default=None, help="与 text 对比数值的输出文本")
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.text:
+        print(normalize_text(args.text))
+        if args.output is not None:
+            for issue in check_numbers(args.text, args.output) or ["数值一致"]:
+                print(issue)
+        return
+
+    for key, case in tire_cases_data.items():
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            normalized = normalize_text(case["original_text"])
+        normalize_us = (time.perf_counter() - start) / args.repeats * 1e6
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            issues = check_numbers(case["original_text"], case["optimized_text"])
+        check_us = (time.perf_counter() - start) / args.repeats * 1e6
+        print(f"{key}（规范化 {normalize_us:.0f}µs，校验 {check_us:.0f}µs）")
+        print(f"  {normalized}")
+        print(f"  与参考输出对比：{'；'.join(issues) or '数值一致'}")
+
+
+if __name__ == "__main__":
+    main()
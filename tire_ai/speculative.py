@@ -0,0 +1,264 @@
+"""推测解码：先由草稿给出若干候选 token，再由主模型一次前向计算全部验证。
+
+模块6的改写大多照抄原文并做局部修改（"150度"改为"155℃"、调整语序），候选 token 的接受率很高。
+两种草稿来源：
+    prompt_lookup  在输入文档与已生成文本中查找与末尾 n-gram 相同的片段，取其后续 token（无需额外模型）
+    draft          与主模型共用分词器的小模型贪心生成候选
+
+只在贪心解码、单条生成时启用，接受规则与逐 token 贪心解码一致，输出相同（浮点误差范围内）。
+主模型需为 llama 结构（KV 缓存形状为 [batch, heads, seq, dim]、位置编码按缓存长度推算）。
+
+在 tire_cases_data 上与普通贪心解码比较接受率与加速比：
+    python -m tire_ai.speculative --modes prompt_lookup draft --draft-model ./models/tiny-draft
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from dataclasses import replace
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_MODES = ("none", "prompt_lookup", "draft")
+DEFAULT_BENCHMARK_PATH = "./outputs/benchmarks/speculative.json"
+
+
+def crop_past(past_key_values, length):
+    """把 KV 缓存截短到前 length 个位置（丢弃未被接受的候选 token）。"""
+    return tuple(tuple(t[:, :, :length] for t in layer) for layer in past_key_values)
+
+
+def _past_length(past_key_values):
+    return 0 if past_key_values is None else past_key_values[0][0].shape[2]
+
+
+class PromptLookupDrafter:
+    """在已有序列（提示词 + 已生成部分）中查找末尾 n-gram 的上一次出现，取其后续 token 作为候选。"""
+
+    def __init__(self, max_ngram=3, min_ngram=1):
+        self.max_ngram = max_ngram
+        self.min_ngram = min_ngram
+
+    def propose(self, ids, count):
+        if count <= 0:
+            return []
+        for n in range(min(self.max_ngram, len(ids) - 1), self.min_ngram - 1, -1):
+            tail = ids[-n:]
+            # 从后往前找，最近的出现与当前上下文最相关
+            for start in range(len(ids) - n - 1, -1, -1):
+                if ids[start:start + n] == tail:
+                    follow = ids[start + n:start + n + count]
+                    if follow:
+                        return follow
+        return []
+
+
+class DraftModelDrafter:
+    """小模型贪心生成候选；保留自身的 KV 缓存，下一轮只计算新增的 token。"""
+
+    def __init__(self, model, device):
+        self.model = model
+        self.device = device
+        self._past = None
+        self._tokens = []
+
+    def reset(self):
+        self._past = None
+        self._tokens = []
+
+    def propose(self, ids, count):
+        import torch
+
+        if count <= 0:
+            return []
+        # 缓存与当前序列的公共前缀可以复用，其余（被拒绝的候选）截掉
+        common = 0
+        limit = min(len(self._tokens), len(ids) - 1)
+        while common < limit and self._tokens[common] == ids[common]:
+            common += 1
+        past = crop_past(self._past, common) if self._past is not None and common else None
+        feed = ids[common:]
+        drafted = []
+        for _ in range(count):
+            output = self.model(
+                input_ids=torch.tensor([feed], device=self.device), past_key_values=past, use_cache=True
+            )
+            past = output.past_key_values
+            token = int(output.logits[0, -1].argmax())
+            drafted.append(token)
+            feed = [token]
+        self._past = past
+        self._tokens = list(ids) + drafted[:-1]
+        return drafted
+
+
+def speculative_generate(model, input_ids, past_key_values, drafter, num_tokens, max_new_tokens, eos_token_ids,
+                         stop_event=None, streamer=None):
+    """单条贪心推测解码，返回 (新生成的 token 列表, 统计)。
+
+    past_key_values 可以是提示词前缀的缓存（input_ids 的前若干个位置），其余部分在第一轮一并计算。
+    """
+    import torch
+
+    device = input_ids.device
+    ids = input_ids[0].tolist()
+    past = past_key_values
+    cached = _past_length(past)
+    generated = []
+    stats = {"drafted": 0, "accepted": 0, "forwards": 0}
+    if streamer is not None:
+        streamer.put(input_ids.cpu())
+    while len(generated) < max_new_tokens:
+        if stop_event is not None and stop_event.is_set():
+            break
+        pending = ids[cached:]
+        # 最后一个位置留给主模型自己的预测，候选数不超过剩余额度
+        draft = drafter.propose(ids, min(num_tokens, max_new_tokens - len(generated) - 1))
+        output = model(
+            input_ids=torch.tensor([pending + draft], device=device), past_key_values=past, use_cache=True
+        )
+        stats["forwards"] += 1
+        predicted = output.logits[0, len(pending) - 1:].argmax(-1).tolist()
+        accepted = 0
+        while accepted < len(draft) and draft[accepted] == predicted[accepted]:
+            accepted += 1
+        stats["drafted"] += len(draft)
+        stats["accepted"] += accepted
+        new = draft[:accepted] + [predicted[accepted]]
+        # 缓存保留到最后一个被接受的候选；主模型补上的那个 token 留到下一轮计算
+        cached = len(ids) + accepted
+        past = crop_past(output.past_key_values, cached)
+
+        new = new[:max_new_tokens - len(generated)]
+        finished = False
+        for i, token in enumerate(new):
+            if token in eos_token_ids:
+                new = new[:i + 1]
+                finished = True
+                break
+        ids.extend(new)
+        generated.extend(new)
+        if streamer is not None:
+            streamer.put(torch.tensor(new))
+        if finished:
+            break
+    if streamer is not None:
+        streamer.end()
+    return generated, stats
+
+
+def load_draft_model(path, device, dtype, tokenizer, trust_remote_code=True):
+    """加载草稿模型；分词器与主模型不一致时无法直接比较 token，抛出 ValueError。"""
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    draft_tokenizer = AutoTokenizer.from_pretrained(path, trust_remote_code=trust_remote_code)
+    if draft_tokenizer.get_vocab() != tokenizer.get_vocab():
+        raise ValueError(f"草稿模型 {path} 的词表与主模型不同，不能用于推测解码")
+    model = AutoModelForCausalLM.from_pretrained(
+        path, torch_dtype=dtype, trust_remote_code=trust_remote_code, low_cpu_mem_usage=True
+    )
+    model.to(device)
+    model.eval()
+    return model
+
+
+def run_benchmark(modes=("prompt_lookup",), config=None, cases=None, max_new_tokens=None,
+                  output_path=DEFAULT_BENCHMARK_PATH, progress=None):
+    """同一个引擎依次切换解码方式，在案例上与普通贪心解码比较耗时、接受率与输出一致性。"""
+    from .cases import tire_cases_data
+    from .config import EngineConfig
+    from .engine import TextOptimizationEngine
+
+    config = config or EngineConfig.from_env()
+    if max_new_tokens:
+        config = replace(config, max_new_tokens=max_new_tokens)
+    engine = TextOptimizationEngine(replace(config, few_shot=0), cache=None).load()
+    cases = list((cases or tire_cases_data).values())
+
+    results = []
+    reference = None
+    for mode in ("none",) + tuple(m for m in modes if m != "none"):
+        if progress is not None:
+            progress(mode)
+        engine.set_speculative_mode(mode)
+        # 预热一次，避免首次调用的初始化开销计入第一种方式
+        engine.optimize(cases[0]["original_text"], cases[0]["instruction_type"], use_cache=False)
+        engine.reset_speculative_stats()
+        outputs, seconds, tokens = [], 0.0, 0
+        for case in cases:
+            result = engine.optimize(case["original_text"], case["instruction_type"], use_cache=False)
+            outputs.append(result.optimized_text)
+            seconds += result.elapsed_seconds
+            tokens += result.generated_tokens
+        if reference is None:
+            reference, reference_seconds = outputs, seconds
+        stats = engine.speculative_stats()
+        results.append({
+            "mode": mode,
+            "seconds": round(seconds, 3),
+            "tokens_per_second": round(tokens / seconds, 2) if seconds > 0 else 0.0,
+            "speedup": round(reference_seconds / seconds, 2) if seconds > 0 else 0.0,
+            "acceptance_rate": round(stats["acceptance_rate"], 4) if mode != "none" else None,
+            "tokens_per_forward": round(stats["tokens_per_forward"], 2) if mode != "none" else 1.0,
+            "exact_match": round(sum(a == b for a, b in zip(reference, outputs)) / len(outputs), 4),
+        })
+    engine.set_speculative_mode(config.speculative)
+
+    report = {
+        "base_model": config.base_model,
+        "draft_model": config.draft_model or None,
+        "speculative_tokens": config.speculative_tokens,
+        "cases": len(cases),
+        "max_new_tokens": config.max_new_tokens,
+        "timestamp": time.time(),
+        "results": results,
+    }
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def load_benchmark(path=DEFAULT_BENCHMARK_PATH):
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    from .config import EngineConfig
+
+    parser = argparse.ArgumentParser(description="推测解码基准测试（与普通贪心解码比较）")
+    parser.add_argument("--modes", nargs="+", default=["prompt_lookup"], choices=SPECULATIVE_MODES[1:])
+    parser.add_argument("--draft-model", default=None, help="draft 方式使用的小模型（与主模型共用分词器）")
+    parser.add_argument("--tokens", type=int, default=None, help="每轮候选 token 数")
+    parser.add_argument("--max-new-tokens", type=int, default=128)
+    parser.add_argument("--output", default=DEFAULT_BENCHMARK_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    config = EngineConfig.from_env()
+    if args.draft_model:
+        config = replace(config, draft_model=args.draft_model)
+    if args.tokens:
+        config = replace(config, speculative_tokens=args.tokens)
+    report = run_benchmark(
+        args.modes,
+        config,
+        max_new_tokens=args.max_new_tokens,
+        output_path=args.output,
+        progress=lambda mode: logger.info("推测解码基准：%s", mode),
+    )
+    print(f"{'方式':<16}{'耗时s':>8}{'tokens/s':>10}{'加速比':>8}{'接受率':>8}{'tokens/前向':>12}{'一致率':>8}")
+    for r in report["results"]:
+        acceptance = f"{r['acceptance_rate']:.0%}" if r["acceptance_rate"] is not None else "-"
+        print(f"{r['mode']:<16}{r['seconds']:>8.2f}{r['tokens_per_second']:>10.1f}{r['speedup']:>8.2f}"
+              f"{acceptance:>8}{r['tokens_per_forward']:>12.2f}{r['exact_match']:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
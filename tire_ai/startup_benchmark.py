@@ -0,0 +1,108 @@
+"""Streamlit 启动耗时基准：冷启动与"准备阶段"页面重跑超出预算时以非零状态退出。
+
+    python -m tire_ai.startup_benchmark --cold-budget 3 --rerun-budget 0.3
+
+冷启动在新的 Python 进程中测量（首次执行页面脚本，含 tire_ai 各模块导入，不含 streamlit 自身导入），
+重跑取多次的中位数。同时检查打开"准备阶段"后是否已导入 torch/transformers 等重依赖。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCRIPT = os.path.join(_REPO_ROOT, "tire_demo_simple.py")
+# 在用户点击"加载模型"之前不应导入的模块
+HEAVY_MODULES = ("torch", "transformers", "peft", "datasets", "rouge_score")
+
+
+def _measure(script, reruns, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    started = time.perf_counter()
+    app = AppTest.from_file(script, default_timeout=timeout).run()
+    cold = time.perf_counter() - started
+    if app.exception:
+        raise RuntimeError(f"页面脚本执行出错：{app.exception[0].value}")
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    rerun_times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        rerun_times.append(time.perf_counter() - started)
+
+    # 依次首次打开其余页面，记录各页面的导入+渲染耗时（不计入预算）
+    radio = app.sidebar.radio[0]
+    pages = {}
+    for label in radio.options[1:]:
+        started = time.perf_counter()
+        radio.set_value(label).run()
+        pages[label] = round(time.perf_counter() - started, 4)
+    return {
+        "cold_start_seconds": round(cold, 4),
+        "rerun_seconds": round(statistics.median(rerun_times), 4) if rerun_times else 0.0,
+        "rerun_samples": [round(t, 4) for t in rerun_times],
+        "heavy_modules_on_start": heavy,
+        "first_open_seconds": pages,
+    }
+
+
+def run_startup_benchmark(script=DEFAULT_SCRIPT, reruns=5, timeout=60):
+    """在子进程中测量，保证冷启动不受当前进程已导入模块的影响。"""
+    completed = subprocess.run(
+        [sys.executable, "-m", "tire_ai.startup_benchmark", "--child",
+         "--script", os.path.abspath(script), "--reruns", str(reruns), "--timeout", str(timeout)],
+        cwd=_REPO_ROOT,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        timeout=timeout * (reruns + 8),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or "启动基准测试子进程失败")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit 启动耗时基准")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT)
+    parser.add_argument("--cold-budget", type=float,
+                        default=float(os.environ.get("TIRE_AI_COLD_START_BUDGET", "3.0")))
+    parser.add_argument("--rerun-budget", type=float,
+                        default=float(os.environ.get("TIRE_AI_RERUN_BUDGET", "0.3")))
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_measure(args.script, args.reruns, args.timeout), ensure_ascii=False))
+        return 0
+
+    result = run_startup_benchmark(args.script, args.reruns, args.timeout)
+    print(f"冷启动：{result['cold_start_seconds']:.3f}s（预算 {args.cold_budget:.3f}s）")
+    print(f"准备阶段重跑：{result['rerun_seconds']:.3f}s（预算 {args.rerun_budget:.3f}s，中位数）")
+    for label, seconds in result["first_open_seconds"].items():
+        print(f"  首次打开 {label}：{seconds:.3f}s")
+
+    failures = []
+    if result["cold_start_seconds"] > args.cold_budget:
+        failures.append("冷启动超出预算")
+    if result["rerun_seconds"] > args.rerun_budget:
+        failures.append("重跑超出预算")
+    if result["heavy_modules_on_start"]:
+        failures.append("启动时导入了重依赖：" + ", ".join(result["heavy_modules_on_start"]))
+    for failure in failures:
+        print("FAIL", failure)
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""生成用于 CPU 测试的小型本地替身模型（随机权重，结构与 Llama 系列一致）。
+
+用法：
+    python -m tire_ai.tiny_model ./outputs/tiny-stand-in --with-adapter
+    set TIRE_AI_BASE_MODEL=./outputs/tiny-stand-in
+"""
+
+import argparse
+import os
+
+from .cases import tire_cases_data
+from .prompts import INSTRUCTION_TEMPLATES, OUTPUT_MARKER
+
+SPECIAL_TOKENS = ["<unk>", "<s>", "</s>", "<pad>"]
+
+
+def _corpus():
+    for case in tire_cases_data.values():
+        yield case["original_text"]
+        yield case["optimized_text"]
+    for template in INSTRUCTION_TEMPLATES.values():
+        yield template + OUTPUT_MARKER
+
+
+def build_tokenizer(vocab_size=1024):
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import PreTrainedTokenizerFast
+
+    # 字节级 BPE：任意中文输入都能编码，不会出现未登录字符
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=SPECIAL_TOKENS,
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    tokenizer.train_from_iterator(_corpus(), trainer=trainer)
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="<unk>",
+        bos_token="<s>",
+        eos_token="</s>",
+        pad_token="<pad>",
+    )
+
+
+def build_tiny_model(output_dir, hidden_size=64, num_layers=2, with_adapter=False, seed=0):
+    import torch
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(seed)
+    tokenizer = build_tokenizer()
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_layers,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=2048,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+    )
+    model = LlamaForCausalLM(config)
+    os.makedirs(output_dir, exist_ok=True)
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+    if with_adapter:
+        from peft import LoraConfig, get_peft_model
+
+        lora = get_peft_model(
+            model,
+            LoraConfig(r=4, lora_alpha=8, target_modules=["q_proj", "v_proj"], task_type="CAUSAL_LM"),
+        )
+        lora.save_pretrained(os.path.join(output_dir, "lora"))
+    return output_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成CPU测试用的小型替身模型")
+    parser.add_argument("output_dir", nargs="?", default="./outputs/tiny-stand-in")
+    parser.add_argument("--hidden-size", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--with-adapter", action="store_true", help="同时生成一个随机LoRA适配器")
+    args = parser.parse_args(argv)
+    path = build_tiny_model(args.output_dir, args.hidden_size, args.layers, args.with_adapter)
+    print(f"替身模型已保存到 {path}")
+
+
+if __name__ == "__main__":
+    main()
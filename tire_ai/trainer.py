@@ -0,0 +1,305 @@
+"""LoRA 微调：在独立进程中运行 PEFT + transformers.Trainer，并把训练进度回传给页面。
+
+命令行：
+    python -m tire_ai.trainer --base-model ./outputs/tiny-stand-in --max-steps 20 --save-steps 10
+
+只用某一类别的样本训练该类别的适配器（推理时按类别自动切换，见 tire_ai/adapters.py）：
+    python -m tire_ai.trainer --category 故障排除 --output-dir ./outputs/adapters/故障排除
+"""
+
+import argparse
+import glob
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+
+from .config import DEFAULT_ADAPTER_PATH, DEFAULT_BASE_MODEL
+from .data_pipeline import DEFAULT_SPLITS_DIR
+
+logger = logging.getLogger(__name__)
+
+# 不参与 LoRA 的输出层
+_EXCLUDED_MODULES = ("lm_head", "output_layer", "embed_out")
+
+
+@dataclass
+class LoraTrainingConfig:
+    # 与模块4中的滑块一一对应
+    r: int = 8
+    lora_alpha: int = 16
+    lora_dropout: float = 0.1
+    batch_size: int = 4
+    learning_rate: float = 2e-4
+    warmup_steps: int = 100
+    max_steps: int = 1000
+    save_steps: int = 500
+    gradient_accumulation_steps: int = 1
+    base_model: str = field(default_factory=lambda: os.environ.get("TIRE_AI_BASE_MODEL", DEFAULT_BASE_MODEL))
+    output_dir: str = field(default_factory=lambda: os.environ.get("TIRE_AI_ADAPTER", DEFAULT_ADAPTER_PATH))
+    train_files: str = os.path.join(DEFAULT_SPLITS_DIR, "train-*.jsonl")
+    max_length: int = 512
+    seed: int = 42
+    # 非空时只使用该类别的样本
+    category: str = ""
+
+
+def find_linear_modules(model):
+    """返回全部线性层的模块名（peft 0.7 尚不支持 target_modules="all-linear"）。"""
+    import torch
+
+    names = set()
+    for name, module in model.named_modules():
+        if isinstance(module, torch.nn.Linear) and not name.endswith(_EXCLUDED_MODULES):
+            names.add(name.rsplit(".", 1)[-1])
+    return sorted(names)
+
+
+def _load_records(config):
+    from datasets import Dataset, load_dataset
+
+    files = sorted(glob.glob(config.train_files))
+    if files:
+        # Arrow 内存映射，训练集不需要整体读入内存
+        dataset = load_dataset("json", data_files=files, split="train")
+        dataset = dataset.filter(
+            lambda r: bool(r.get("optimized_text")) and (not config.category or r.get("category") == config.category)
+        )
+        if len(dataset):
+            return dataset
+    from .cases import tire_cases_data
+
+    logger.warning("%s 中没有带优化文本的训练样本，使用内置案例训练", config.train_files)
+    cases = [c for c in tire_cases_data.values() if not config.category or c["category"] == config.category]
+    if not cases:
+        raise ValueError(f"没有类别为 {config.category} 的训练样本")
+    return Dataset.from_list([dict(c, metrics=None) for c in cases])
+
+
+def build_train_dataset(config, tokenizer):
+    from .prompts import build_prompt, encode_prompt
+
+    def tokenize(record):
+        # 与推理时同样编码提示词（ChatGLM3 使用对话格式），适配器学到的输入格式与使用时一致
+        prompt = build_prompt(record["original_text"], record.get("instruction_type") or "分类型")
+        prompt_ids = encode_prompt(tokenizer, prompt)
+        target_ids = tokenizer(record["optimized_text"], add_special_tokens=False)["input_ids"]
+        input_ids = (prompt_ids + target_ids + [tokenizer.eos_token_id])[: config.max_length]
+        # 只对输出部分计算损失
+        labels = ([-100] * len(prompt_ids) + target_ids + [tokenizer.eos_token_id])[: config.max_length]
+        return {"input_ids": input_ids, "attention_mask": [1] * len(input_ids), "labels": labels}
+
+    records = _load_records(config)
+    return records.map(tokenize, remove_columns=records.column_names)
+
+
+def _make_callback(events, config):
+    from transformers import TrainerCallback
+
+    samples_per_step = config.batch_size * config.gradient_accumulation_steps
+
+    class ProgressCallback(TrainerCallback):
+        def __init__(self):
+            self._step_started = None
+            self._window = []
+
+        def on_step_begin(self, args, state, control, **kwargs):
+            self._step_started = time.perf_counter()
+
+        def on_step_end(self, args, state, control, **kwargs):
+            if self._step_started is not None:
+                self._window = (self._window + [time.perf_counter() - self._step_started])[-20:]
+
+        def on_log(self, args, state, control, logs=None, **kwargs):
+            if not logs or "loss" not in logs:
+                return
+            seconds = sum(self._window) / len(self._window) if self._window else 0.0
+            events.put({
+                "type": "log",
+                "step": state.global_step,
+                "max_steps": state.max_steps,
+                "loss": logs["loss"],
+                "learning_rate": logs.get("learning_rate"),
+                "samples_per_second": samples_per_step / seconds if seconds > 0 else 0.0,
+            })
+
+        def on_save(self, args, state, control, **kwargs):
+            path = os.path.join(args.output_dir, f"checkpoint-{state.global_step}")
+            events.put({"type": "checkpoint", "step": state.global_step, "path": path})
+
+    return ProgressCallback()
+
+
+def run_training(config, events):
+    """训练主体，``events`` 为具有 put 方法的队列。"""
+    import torch
+    from peft import LoraConfig, get_peft_model
+    from transformers import (
+        AutoModelForCausalLM,
+        AutoTokenizer,
+        DataCollatorForSeq2Seq,
+        Trainer,
+        TrainingArguments,
+    )
+
+    started = time.perf_counter()
+    events.put({"type": "status", "message": "正在加载基座模型"})
+    use_cuda = torch.cuda.is_available()
+    tokenizer = AutoTokenizer.from_pretrained(config.base_model, trust_remote_code=True)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    model = AutoModelForCausalLM.from_pretrained(
+        config.base_model,
+        trust_remote_code=True,
+        torch_dtype=torch.float16 if use_cuda else torch.float32,
+    )
+    model = get_peft_model(
+        model,
+        LoraConfig(
+            r=config.r,
+            lora_alpha=config.lora_alpha,
+            lora_dropout=config.lora_dropout,
+            target_modules=find_linear_modules(model),
+            task_type="CAUSAL_LM",
+        ),
+    )
+    if use_cuda:
+        # 基座为 fp16 时，LoRA 参数保持 fp32，否则混合精度无法反缩放梯度
+        for param in model.parameters():
+            if param.requires_grad:
+                param.data = param.data.float()
+    trainable, total = model.get_nb_trainable_parameters()
+    events.put({"type": "status", "message": "正在准备训练数据", "trainable_parameters": trainable,
+                "total_parameters": total})
+
+    dataset = build_train_dataset(config, tokenizer)
+    args = TrainingArguments(
+        output_dir=config.output_dir,
+        per_device_train_batch_size=config.batch_size,
+        gradient_accumulation_steps=config.gradient_accumulation_steps,
+        learning_rate=config.learning_rate,
+        warmup_steps=config.warmup_steps,
+        max_steps=config.max_steps,
+        save_steps=config.save_steps,
+        save_total_limit=3,
+        logging_steps=1,
+        lr_scheduler_type="cosine",
+        optim="adamw_torch",
+        fp16=use_cuda,
+        use_cpu=not use_cuda,
+        report_to=[],
+        disable_tqdm=True,
+        remove_unused_columns=False,
+        seed=config.seed,
+    )
+    trainer = Trainer(
+        model=model,
+        args=args,
+        train_dataset=dataset,
+        data_collator=DataCollatorForSeq2Seq(tokenizer, label_pad_token_id=-100, padding=True),
+        callbacks=[_make_callback(events, config)],
+    )
+    events.put({"type": "status", "message": "开始训练", "train_samples": len(dataset)})
+    result = trainer.train()
+    # 最终适配器写到 output_dir 根目录，推理引擎与结果缓存据此识别新版本
+    model.save_pretrained(config.output_dir)
+    events.put({
+        "type": "done",
+        "train_loss": result.training_loss,
+        "steps": result.global_step,
+        "output_dir": config.output_dir,
+        "trainable_parameters": trainable,
+        "seconds": time.perf_counter() - started,
+        "checkpoints": sorted(glob.glob(os.path.join(config.output_dir, "checkpoint-*"))),
+    })
+
+
+def _training_entry(config, events):
+    try:
+        run_training(config, events)
+    except Exception as exc:
+        events.put({"type": "error", "message": str(exc), "traceback": traceback.format_exc()})
+
+
+class TrainingRun:
+    """在子进程中运行的一次训练；页面每次重跑时调用 poll() 读取新事件。"""
+
+    def __init__(self, config):
+        self.config = config
+        ctx = multiprocessing.get_context("spawn")
+        self._events = ctx.Queue()
+        self._process = ctx.Process(target=_training_entry, args=(config, self._events), daemon=True)
+        self._lock = threading.Lock()
+        self.events = []
+        self.started_at = time.time()
+
+    def start(self):
+        self._process.start()
+        return self
+
+    def poll(self):
+        with self._lock:
+            while True:
+                try:
+                    self.events.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+            return list(self.events)
+
+    @property
+    def running(self):
+        return self._process.is_alive()
+
+    @property
+    def finished(self):
+        return any(e["type"] in ("done", "error") for e in self.poll())
+
+    def losses(self):
+        return [e for e in self.poll() if e["type"] == "log"]
+
+    def stop(self):
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=10)
+
+
+_current_run = None
+_run_lock = threading.Lock()
+
+
+def start_training(config):
+    """同一时间只允许一个训练进程，所有会话共享其进度。"""
+    global _current_run
+    with _run_lock:
+        if _current_run is not None and _current_run.running:
+            raise RuntimeError("已有训练任务正在运行")
+        _current_run = TrainingRun(config).start()
+        return _current_run
+
+
+def current_training():
+    return _current_run
+
+
+def main(argv=None):
+    defaults = LoraTrainingConfig()
+    parser = argparse.ArgumentParser(description="LoRA微调训练")
+    for name, value in asdict(defaults).items():
+        parser.add_argument("--" + name.replace("_", "-"), type=type(value), default=value)
+    args = parser.parse_args(argv)
+    config = LoraTrainingConfig(**vars(args))
+
+    class PrintQueue:
+        def put(self, event):
+            print(event, flush=True)
+
+    logging.basicConfig(level=logging.INFO)
+    run_training(config, PrintQueue())
+
+
+if __name__ == "__main__":
+    main()
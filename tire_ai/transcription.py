@@ -0,0 +1,246 @@
+"""本地语音转写：Whisper 系列小模型在 CPU 上运行，供 video_simple.html 调用，无需联网。
+
+长录音先用能量 VAD 在停顿处切成不超过30秒的片段（Whisper 的输入窗口），
+长时间的静音不送入模型；片段按批提交到线程池并行解码，按时间顺序逐段返回转写结果。
+
+    python -m tire_ai.transcription 车间录音.wav --optimize
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WHISPER_MODEL = "openai/whisper-base"
+SAMPLE_RATE = 16000
+# Whisper 单次输入最长30秒
+MAX_CHUNK_SECONDS = 30.0
+
+
+def _resample(audio, rate):
+    if rate == SAMPLE_RATE or not len(audio):
+        return audio
+    target = np.arange(int(len(audio) * SAMPLE_RATE / rate)) * (rate / SAMPLE_RATE)
+    return np.interp(target, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def _read_wav(data):
+    with wave.open(io.BytesIO(data)) as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2 ** 31
+    else:
+        raise ValueError(f"不支持的WAV采样位宽：{width * 8}bit")
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return _resample(audio, rate)
+
+
+def decode_audio(data):
+    """把音频文件内容解码为 16kHz 单声道 float32；WAV 直接读取，其他格式需要 ffmpeg。"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return _read_wav(data)
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError("非WAV格式的音频需要安装ffmpeg（video_simple.html 会在浏览器中转成WAV再上传）")
+    completed = subprocess.run(
+        [ffmpeg, "-nostdin", "-i", "pipe:0", "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"],
+        input=data,
+        capture_output=True,
+    )
+    if completed.returncode != 0:
+        raise ValueError("音频解码失败：" + completed.stderr.decode("utf-8", "replace").strip().splitlines()[-1])
+    return np.frombuffer(completed.stdout, dtype=np.float32)
+
+
+def speech_chunks(audio, sample_rate=SAMPLE_RATE, max_seconds=MAX_CHUNK_SECONDS,
+                  frame_ms=30, min_silence_ms=300, pad_ms=200):
+    """能量 VAD：返回语音片段的 (起始, 结束) 采样点，每段不超过 max_seconds，尽量在停顿处切分。"""
+    frame = int(sample_rate * frame_ms / 1000)
+    count = len(audio) // frame
+    if count == 0:
+        return [(0, len(audio))] if len(audio) else []
+    energy = np.sqrt(np.mean(audio[:count * frame].reshape(count, frame) ** 2, axis=1))
+    # 阈值取在本底噪声与语音能量之间，适应不同录音电平的车间环境
+    noise, loud = np.percentile(energy, 10), np.percentile(energy, 95)
+    voiced = energy > max(noise + 0.1 * (loud - noise), 1e-4)
+
+    # 短暂停顿并入前后的语音段
+    gap = max(int(min_silence_ms / frame_ms), 1)
+    segments = []
+    start = last = None
+    for i in np.flatnonzero(voiced):
+        if start is None:
+            start = last = i
+        elif i - last > gap:
+            segments.append((start, last + 1))
+            start = last = i
+        else:
+            last = i
+    if start is not None:
+        segments.append((start, last + 1))
+
+    pad = int(pad_ms / frame_ms)
+    max_frames = int(max_seconds * 1000 / frame_ms)
+    chunks = []
+    for seg_start, seg_end in segments:
+        seg_start, seg_end = max(seg_start - pad, 0), min(seg_end + pad, count)
+        # 能与上一块合并且不超长时合并，减少送入模型的片段数
+        if chunks and seg_end - chunks[-1][0] <= max_frames:
+            chunks[-1] = (chunks[-1][0], seg_end)
+            continue
+        # 超过30秒的连续语音只能硬切
+        for piece in range(seg_start, seg_end, max_frames):
+            chunks.append((piece, min(piece + max_frames, seg_end)))
+    return [(s * frame, min(e * frame, len(audio))) for s, e in chunks]
+
+
+class Transcriber:
+    def __init__(self, model_name=DEFAULT_WHISPER_MODEL, language="zh", batch_size=4, workers=2):
+        self.model_name = model_name
+        self.language = language
+        self.batch_size = batch_size
+        self.workers = workers
+        self.model = None
+        self.processor = None
+        self._load_lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def load(self):
+        with self._load_lock:
+            if self.loaded:
+                return self
+            from transformers import WhisperForConditionalGeneration, WhisperProcessor
+
+            start = time.perf_counter()
+            logger.info("加载语音转写模型 %s", self.model_name)
+            self.processor = WhisperProcessor.from_pretrained(self.model_name)
+            model = WhisperForConditionalGeneration.from_pretrained(self.model_name)
+            model.eval()
+            self.model = model
+            # 多个片段批次并行解码；torch 算子执行时释放 GIL，线程即可利用多核
+            self._executor = ThreadPoolExecutor(max_workers=max(self.workers, 1), thread_name_prefix="whisper")
+            metrics.observe("transcription_model_load", time.perf_counter() - start)
+        return self
+
+    def _decode_batch(self, pieces):
+        import torch
+
+        with metrics.timed("transcription_chunk"):
+            features = self.processor.feature_extractor(
+                pieces, sampling_rate=SAMPLE_RATE, return_tensors="pt"
+            ).input_features
+            with torch.inference_mode():
+                ids = self.model.generate(features, language=self.language, task="transcribe")
+            return [text.strip() for text in self.processor.batch_decode(ids, skip_special_tokens=True)]
+
+    def stream(self, audio):
+        """逐段返回 {"index", "total", "start", "end", "text"}，按时间顺序；后面的批次在后台同时解码。"""
+        self.load()
+        chunks = speech_chunks(audio)
+        batches = [chunks[i:i + self.batch_size] for i in range(0, len(chunks), self.batch_size)]
+        futures = [
+            self._executor.submit(self._decode_batch, [audio[start:end] for start, end in batch])
+            for batch in batches
+        ]
+        index = 0
+        try:
+            for batch, future in zip(batches, futures):
+                for (start, end), text in zip(batch, future.result()):
+                    yield {
+                        "index": index,
+                        "total": len(chunks),
+                        "start": round(start / SAMPLE_RATE, 2),
+                        "end": round(end / SAMPLE_RATE, 2),
+                        "text": text,
+                    }
+                    index += 1
+        finally:
+            # 客户端断开时不再解码剩余片段
+            for future in futures:
+                future.cancel()
+
+    def join(self, texts):
+        separator = "" if self.language in ("zh", "ja") else " "
+        return separator.join(t for t in texts if t)
+
+    def transcribe(self, audio):
+        start = time.perf_counter()
+        segments = list(self.stream(audio))
+        elapsed = time.perf_counter() - start
+        metrics.observe("transcription", elapsed)
+        return {
+            "text": self.join(s["text"] for s in segments),
+            "segments": segments,
+            "audio_seconds": round(len(audio) / SAMPLE_RATE, 2),
+            "elapsed_seconds": round(elapsed, 2),
+        }
+
+
+_transcriber = None
+_transcriber_lock = threading.Lock()
+
+
+def get_transcriber():
+    """进程级共享的转写模型，首次转写时加载；模型与并行度由环境变量配置。"""
+    global _transcriber
+    with _transcriber_lock:
+        if _transcriber is None:
+            _transcriber = Transcriber(
+                model_name=os.environ.get("TIRE_AI_WHISPER_MODEL", DEFAULT_WHISPER_MODEL),
+                language=os.environ.get("TIRE_AI_WHISPER_LANGUAGE", "zh"),
+                batch_size=int(os.environ.get("TIRE_AI_WHISPER_BATCH_SIZE", "4")),
+                workers=int(os.environ.get("TIRE_AI_WHISPER_WORKERS", "2")),
+            )
+    return _transcriber
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地语音转写")
+    parser.add_argument("audio", help="音频文件（WAV；其他格式需要ffmpeg）")
+    parser.add_argument("--optimize", action="store_true", help="转写后直接进行文本优化")
+    parser.add_argument("--instruction-type", default="分类型")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.audio, "rb") as f:
+        audio = decode_audio(f.read())
+    transcriber = get_transcriber()
+    texts = []
+    start = time.perf_counter()
+    for segment in transcriber.stream(audio):
+        print(f"[{segment['start']:7.2f}s - {segment['end']:7.2f}s] {segment['text']}", flush=True)
+        texts.append(segment["text"])
+    text = transcriber.join(texts)
+    print(f"音频 {len(audio) / SAMPLE_RATE:.1f}s，转写耗时 {time.perf_counter() - start:.1f}s")
+    if args.optimize and text:
+        from .engine import get_engine
+
+        result = get_engine().optimize(text, args.instruction_type)
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Streamlit 页面：每个功能模块一个文件，提供 render()。
+
+主脚本只导入当前选中的页面，其余页面及其依赖（训练、评估、批量任务等）在首次打开时才导入。
+"""
+
+import importlib
+
+# 侧边栏选项 → 页面模块，顺序即导航顺序
+PAGES = {
+    "🏁 准备阶段 - 模型加载与环境验证": "preparation",
+    "📊 数据准备 - 轮胎制造业数据处理": "data_preparation",
+    "🔍 Instruction 类型判断": "instruction",
+    "⚙️ 模型微调 - Lora 参数配置与训练": "finetuning",
+    "✅ 验证评估 - 自动+人工评估": "validation",
+    "📝 成果输出 - 文本优化与报告生成": "output",
+}
+
+
+def render_page(label):
+    # import_module 命中 sys.modules 缓存，页面模块在进程内只执行一次导入
+    importlib.import_module(f"{__name__}.{PAGES[label]}").render()
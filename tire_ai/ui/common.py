@@ -0,0 +1,51 @@
+"""页面间共享的资源。"""
+
+import time
+
+import streamlit as st
+
+from ..engine import get_engine
+from ..jobs import get_job, submit_job
+
+
+# 推理引擎在进程内只加载一次，所有浏览器会话共享同一份模型
+@st.cache_resource(show_spinner=False)
+def load_engine():
+    return get_engine()
+
+
+def submit_session_job(slot, name, fn, *args, **kwargs):
+    """提交后台任务，把任务ID记在当前会话的 slot 下；页面重跑时用 session_job(slot) 取回。"""
+    job = submit_job(name, fn, *args, **kwargs)
+    st.session_state.setdefault("jobs", {})[slot] = job.id
+    return job
+
+
+def session_job(slot):
+    return get_job(st.session_state.get("jobs", {}).get(slot))
+
+
+def render_job_status(job, label, cancel_key=None):
+    """显示任务状态；运行中时可以取消。返回任务是否已成功完成。"""
+    if job is None:
+        return False
+    if job.status == "queued":
+        st.info(f"{label}：排队中...")
+    elif job.status == "running":
+        st.info(f"{label}：进行中 · 已用时 {job.elapsed_seconds:.0f}s" + (f" · {job.message}" if job.message else ""))
+        if job.progress:
+            st.progress(job.progress)
+    elif job.status == "failed":
+        st.error(f"{label}失败：{job.error}")
+    elif job.status == "cancelled":
+        st.warning(f"{label}已取消")
+    if cancel_key and not job.finished and st.button("取消", key=cancel_key):
+        job.cancel()
+    return job.status == "done"
+
+
+def rerun_while_pending(*slots, interval=1.0):
+    """本会话的任务未结束时定时刷新页面；放在页面末尾，不影响其余内容渲染。"""
+    if any(job is not None and not job.finished for job in map(session_job, slots)):
+        time.sleep(interval)
+        st.rerun()
@@ -0,0 +1,121 @@
+"""模块2：数据准备 - 轮胎制造业数据处理。"""
+
+import streamlit as st
+
+from ..case_store import get_case_store
+from ..data_pipeline import load_split_stats
+from ..evaluation import load_history, load_item_scores
+
+CASES_PER_PAGE = 50
+
+
+def render():
+    st.header("📊 模块2：数据准备 - 轮胎制造业数据处理")
+    
+    st.info("💡 数据处理说明")
+    st.markdown("""
+    - 数据来源：Kaggle轮胎制造工艺开源数据集和汽车工程开源文档库
+    - 数据预处理：数据清洗、格式标准化、标签规范化
+    - Instruction类型：分为分类型和开放型两种主要类型
+    - 训练集大小：8000条，验证集大小：2000条，测试集大小：1000条
+    """)
+    
+    # 数据准备流水线的实际输出
+    split_stats = load_split_stats()
+    if split_stats:
+        st.subheader("🗂️ 数据集划分")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("训练集", split_stats.get("train", 0))
+        col2.metric("验证集", split_stats.get("val", 0))
+        col3.metric("测试集", split_stats.get("test", 0))
+        col4.metric("去重丢弃", split_stats.get("duplicates", 0))
+    else:
+        st.caption("尚未运行数据准备流水线：python -m tire_ai.data_pipeline 语料.jsonl --output ./data/splits")
+    
+    # 案例选择：案例库按页查询，下拉框只加载当前页的标题
+    st.subheader("📋 案例选择")
+    case_store = get_case_store()
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        case_category = st.selectbox("分类", ["全部"] + case_store.categories(), key="case_category")
+    
+    with col2:
+        case_instruction_type = st.selectbox("Instruction类型", ["全部", "分类型", "开放型"], key="case_instruction_type")
+    
+    with col3:
+        case_search = st.text_input("全文检索（原文/优化文本）", key="case_search")
+    
+    case_filters = {
+        "category": None if case_category == "全部" else case_category,
+        "instruction_type": None if case_instruction_type == "全部" else case_instruction_type,
+        "search": case_search
+    }
+    case_total = case_store.count(**case_filters)
+    if case_total == 0:
+        st.warning("没有符合条件的案例")
+        return
+    
+    page_count = (case_total + CASES_PER_PAGE - 1) // CASES_PER_PAGE
+    case_page = st.number_input(f"页码（共{page_count}页，{case_total}个案例）", min_value=1, max_value=page_count, value=1, key="case_page")
+    page_cases = case_store.list_cases(offset=(case_page - 1) * CASES_PER_PAGE, limit=CASES_PER_PAGE, **case_filters)
+    case_titles = {row["case_key"]: row["title"] for row in page_cases}
+    
+    selected_case = st.selectbox(
+        "选择轮胎制造业案例",
+        list(case_titles),
+        format_func=lambda key: f"{key}：{case_titles[key]}" if case_titles[key] else key,
+        index=0
+    )
+    case = case_store.get_case(selected_case)
+    
+    # 显示选中的案例
+    st.subheader(f"案例详情：{case['title']}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 原始技术文档")
+        st.markdown(f"""
+        <div style="background-color: #f8f9fa; border: 1px solid #dee2e6; border-radius: 5px; padding: 1rem; margin: 1rem 0;">
+            {case['original_text']}
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("### 优化后文档")
+        st.markdown(f"""
+        <div style="background-color: #f8f9fa; border: 1px solid #dee2e6; border-radius: 5px; padding: 1rem; margin: 1rem 0;">
+            {case['optimized_text']}
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # 案例信息
+    st.subheader("📊 案例分析")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.info(f"分类：{case['category']}")
+        st.info(f"Instruction类型：{case['instruction_type']}")
+    
+    with col2:
+        # 指标图表：有评估结果时使用最近一次评估中该案例的实测得分
+        metrics = dict(case['metrics'])
+        eval_history = load_history()
+        if eval_history:
+            case_scores = load_item_scores(eval_history[-1]["checkpoint"]).get(selected_case)
+            if case_scores:
+                metrics.update({name: case_scores[name] for name in ("rouge_l", "bleu", "semantic_similarity")})
+        
+        st.text("评估指标：")
+        # 导入的案例可能缺少部分指标，只显示已有的
+        for name, label in (("rouge_l", "ROUGE-L"), ("bleu", "BLEU"),
+                            ("semantic_similarity", "语义相似度"), ("perspective_accuracy", "视角转换准确度")):
+            if metrics.get(name) is None:
+                continue
+            st.progress(min(max(float(metrics[name]), 0.0), 1.0))
+            st.caption(f"{label}: {metrics[name]:.3f}")
+        if not metrics:
+            st.caption("该案例暂无评估指标")
@@ -0,0 +1,134 @@
+"""模块4：模型微调 - LoRA 参数配置与训练。"""
+
+import os
+import time
+
+import streamlit as st
+
+from ..cases import tire_cases_data
+from ..config import EngineConfig
+from ..trainer import LoraTrainingConfig, current_training, start_training
+
+
+def render():
+    st.header("⚙️ 模块4：模型微调 - Lora 参数配置与训练")
+    
+    st.info("💡 LoRA微调说明")
+    st.markdown("""
+    - LoRA（Low-Rank Adaptation）是一种参数高效的微调方法，仅需更新少量参数
+    - 微调参数：r=8, alpha=16, dropout=0.1, target_modules=all linear layers
+    - 训练设置：batch_size=4, learning_rate=2e-4, warmup_steps=100, max_steps=1000
+    - 优化器：AdamW，调度器：CosineAnnealingLR
+    """)
+    
+    # 参数配置
+    st.subheader("⚙️ LoRA参数配置")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        r_value = st.slider("秩大小 (r)", 1, 16, 8)
+        alpha_value = st.slider("Alpha值", 8, 64, 16)
+        dropout_value = st.slider("Dropout", 0.0, 0.5, 0.1, 0.05)
+    
+    with col2:
+        batch_size = st.slider("批次大小", 1, 16, 4)
+        learning_rate = st.number_input("学习率", value=0.0002, format="%.6f")
+        warmup_steps = st.slider("预热步数", 0, 500, 100)
+    
+    # 训练设置
+    st.subheader("🎯 训练设置")
+    
+    max_steps = st.slider("最大步数", 100, 5000, 1000)
+    save_steps = st.slider("保存间隔", 100, 1000, 500)
+    gradient_accumulation_steps = st.slider("梯度累积步数", 1, 16, 1)
+    # 按类别训练的适配器保存到命名适配器目录，推理时按请求的类别自动切换
+    categories = sorted({case["category"] for case in tire_cases_data.values()})
+    category = st.selectbox("训练范围", ["全部类别（默认适配器）"] + categories, key="training_category")
+    category = "" if category not in categories else category
+    
+    # 开始训练按钮：训练在独立进程中运行，页面只负责展示进度
+    if st.button("开始微调训练", key="start_training"):
+        training_config = LoraTrainingConfig(
+            r=r_value,
+            lora_alpha=alpha_value,
+            lora_dropout=dropout_value,
+            batch_size=batch_size,
+            learning_rate=learning_rate,
+            warmup_steps=warmup_steps,
+            max_steps=max_steps,
+            save_steps=save_steps,
+            gradient_accumulation_steps=gradient_accumulation_steps,
+            category=category,
+        )
+        if category:
+            training_config.output_dir = os.path.join(EngineConfig.from_env().adapters_dir, category)
+        try:
+            start_training(training_config)
+            st.session_state.training_progress = 0
+            st.success("训练进程已启动!")
+        except RuntimeError as exc:
+            st.warning(str(exc))
+    
+    training_run = current_training()
+    if training_run is not None:
+        events = training_run.poll()
+        logs = [e for e in events if e["type"] == "log"]
+        statuses = [e for e in events if e["type"] == "status"]
+        done = next((e for e in events if e["type"] == "done"), None)
+        error = next((e for e in events if e["type"] == "error"), None)
+        
+        st.subheader("📈 训练进度")
+        total_steps = max(training_run.config.max_steps, 1)
+        current_step = logs[-1]["step"] if logs else 0
+        st.session_state.training_progress = int(current_step * 100 / total_steps)
+        st.progress(min(current_step / total_steps, 1.0))
+        if logs:
+            last = logs[-1]
+            st.text(
+                f"训练进度: {current_step}/{total_steps} 步 · 损失 {last['loss']:.4f} · "
+                f"{last['samples_per_second']:.1f} samples/s"
+            )
+            st.line_chart({"训练损失": [e["loss"] for e in logs]})
+        elif statuses:
+            st.text(statuses[-1]["message"])
+        
+        checkpoints = [e for e in events if e["type"] == "checkpoint"]
+        if checkpoints:
+            st.caption("已保存检查点：" + "，".join(f"第{e['step']}步" for e in checkpoints))
+        
+        if done:
+            st.success("训练完成!")
+            
+            # 训练结果
+            st.subheader("📊 训练结果")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.info(f"最终训练损失：{done['train_loss']:.4f}")
+                st.info(f"训练步数：{done['steps']}")
+                st.info(f"保存检查点：{len(done['checkpoints'])}个")
+                st.info(f"训练耗时：{done['seconds']:.0f}s")
+            
+            with col2:
+                st.success("模型保存成功!")
+                st.info(f"模型路径：{done['output_dir']}")
+                adapter_bytes = sum(
+                    os.path.getsize(os.path.join(done["output_dir"], name))
+                    for name in os.listdir(done["output_dir"])
+                    if name.startswith("adapter_model")
+                )
+                st.info(f"模型大小：{adapter_bytes / 1024 ** 2:.1f}MB")
+                st.info(f"微调参数：{done['trainable_parameters'] / 1e6:.2f}M")
+        elif error:
+            st.error(f"训练失败：{error['message']}")
+            with st.expander("错误详情"):
+                st.code(error["traceback"])
+        elif training_run.running:
+            if st.button("停止训练", key="stop_training"):
+                training_run.stop()
+                st.rerun()
+            # 训练进行中时每秒刷新一次进度
+            time.sleep(1)
+            st.rerun()
